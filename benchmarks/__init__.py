@@ -0,0 +1 @@
+# Offline benchmarks and budget checks for LunchGenie
@@ -0,0 +1,104 @@
+"""
+Import-time budget check for LunchGenie.
+Verifies that the CLI and agent modules start without pulling in heavy dependencies
+(langchain_openai, openai, requests, numpy), that `lunchgenie --help` imports no third-party
+package besides python-dotenv, and that it stays within a time budget over bare interpreter
+start-up. The timing is informational on busy machines; the import checks are exact.
+
+Usage (from the project root):
+    python -m benchmarks.import_budget [--budget-ms 100] [--runs 5]
+
+Exits non-zero when the budget is exceeded or a heavy module is imported eagerly.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("langchain_openai", "openai", "requests", "numpy")
+
+# The only packages outside the standard library `lunchgenie --help` may import
+HELP_ALLOWED_PACKAGES = ("lunchgenie", "tools", "dotenv")
+
+# Modules that must stay import-light; importing them must not load HEAVY_MODULES
+LIGHT_ENTRY_POINTS = ("lunchgenie.cli", "lunchgenie.agent", "lunchgenie.batch", "lunchgenie.server")
+
+# Allowed `lunchgenie --help` start-up time over a bare interpreter
+DEFAULT_BUDGET_MS = 100.0
+
+def _wall_ms(args, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def _eager_heavy_imports(module):
+    code = (
+        "import importlib, sys\n"
+        f"importlib.import_module({module!r})\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+def _help_imports():
+    """
+    Modules imported by `lunchgenie --help` beyond those of a bare interpreter.
+    """
+    code = (
+        "import contextlib, io, runpy, sys\n"
+        "before = set(sys.modules)\n"
+        "sys.argv = ['lunchgenie', '--help']\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    try:\n"
+        "        runpy.run_module('lunchgenie.cli', run_name='__main__')\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "print('\\n'.join(sorted(set(sys.modules) - before)))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return out.stdout.split()
+
+def _unexpected_help_imports():
+    """
+    Top-level packages imported by `lunchgenie --help` that are neither standard library
+    nor in HELP_ALLOWED_PACKAGES.
+    """
+    packages = {m.split(".")[0] for m in _help_imports()}
+    return sorted(p for p in packages
+                  if p not in sys.stdlib_module_names and p not in HELP_ALLOWED_PACKAGES)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"allowed `--help` start-up time over a bare interpreter (default: {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--runs", type=int, default=5, help="runs per measurement (median is used)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in LIGHT_ENTRY_POINTS:
+        heavy = _eager_heavy_imports(module)
+        status = "ok" if not heavy else f"FAIL (imports {', '.join(heavy)})"
+        failed |= bool(heavy)
+        print(f"import {module}: {status}")
+
+    unexpected = _unexpected_help_imports()
+    failed |= bool(unexpected)
+    print(f"lunchgenie --help imports: {'ok' if not unexpected else 'FAIL (' + ', '.join(unexpected) + ')'}")
+
+    baseline = _wall_ms([sys.executable, "-c", "pass"], args.runs)
+    cli_help = _wall_ms([sys.executable, "-m", "lunchgenie.cli", "--help"], args.runs)
+    overhead = cli_help - baseline
+    over_budget = overhead > args.budget_ms
+    failed |= over_budget
+    print(f"interpreter start-up: {baseline:.1f} ms")
+    print(f"lunchgenie --help:    {cli_help:.1f} ms (+{overhead:.1f} ms, budget {args.budget_ms:.0f} ms)"
+          f"{' FAIL' if over_budget else ''}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
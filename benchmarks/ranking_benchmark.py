@@ -0,0 +1,77 @@
+"""
+Ranking benchmark for LunchGenie.
+Scores synthetic candidate pools with lunchgenie.ranking and compares top-k selection
+against sorting the whole pool in Python, as the agent used to. The default (rating-only)
+weights are what the agent runs with unless RANKING_* is set, so their end-to-end time is
+reported against the sort they replace.
+
+Usage (from the project root):
+    python -m benchmarks.ranking_benchmark [--candidates 10000 100000] [--top-k 5] [--runs 20]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+CUISINES = ("chinese", "indian", "malaysian", "italian", "thai", "japanese", "greek", "mexican")
+
+def make_candidates(n, seed=7):
+    rng = random.Random(seed)
+    return [{
+        "id": f"c{i}",
+        "name": f"Candidate {i}",
+        "rating": round(rng.uniform(3.0, 5.0), 1),
+        "review_count": rng.randint(0, 5000),
+        "distance_m": rng.uniform(0, 5000),
+        "categories": [rng.choice(CUISINES), "restaurant"],
+    } for i in range(n)]
+
+def _median_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark candidate ranking.")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    from lunchgenie.ranking import Ranker, top_k_indices
+
+    weighted = Ranker(rating_weight=1.0, distance_weight=0.3, cuisine_weight=0.2, prior_count=50)
+    default = Ranker()
+    cuisines = ["thai", "indian"]
+    for n in args.candidates:
+        candidates = make_candidates(n)
+        k = args.top_k
+        # The default weights must reproduce the stable rating sort
+        expected = sorted(candidates, key=lambda x: x["rating"], reverse=True)[:k]
+        if default.top_k(candidates, k) != expected:
+            print(f"{n} candidates: default ranking differs from the rating sort", file=sys.stderr)
+            return 1
+        scores = weighted.score(candidates, cuisines)
+        report = {
+            "python sorted() by rating": _median_ms(
+                lambda: sorted(candidates, key=lambda x: x["rating"], reverse=True)[:k], args.runs),
+            "Ranker.top_k end to end, default weights": _median_ms(
+                lambda: default.top_k(candidates, k, cuisines), args.runs),
+            "score (dicts -> arrays), weighted": _median_ms(lambda: weighted.score(candidates, cuisines), args.runs),
+            "top-k on scores (argpartition)": _median_ms(lambda: top_k_indices(scores, k), args.runs),
+            "full argsort on scores": _median_ms(lambda: (-scores).argsort(kind="stable")[:k], args.runs),
+            "Ranker.top_k end to end, weighted": _median_ms(
+                lambda: weighted.top_k(candidates, k, cuisines), args.runs),
+        }
+        print(f"{n} candidates, top {k}:")
+        for name, ms in report.items():
+            print(f"    {name}: {ms:.2f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+End-to-end benchmark harness for LunchGenie, run entirely against local stub services.
+Drives Agent.recommend_lunch_places and the provider plugins, and reports p50/p95 latency,
+throughput and upstream call counts, so performance regressions can be measured offline.
+
+Usage (from the project root):
+    python -m benchmarks.run_benchmarks --provider google --iterations 20
+    python -m benchmarks.run_benchmarks --scenario plugin --latency-ms 80 --error-rate 0.05
+    python -m benchmarks.run_benchmarks --json   # machine-readable report
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.stub_servers import StubSettings, start_stubs
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def summarize(name, samples_s, wall_s, calls):
+    return {
+        "scenario": name,
+        "iterations": len(samples_s),
+        "p50_ms": round(percentile(samples_s, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples_s, 95) * 1000, 1),
+        "mean_ms": round(statistics.mean(samples_s) * 1000, 1) if samples_s else 0.0,
+        "throughput_per_s": round(len(samples_s) / wall_s, 2) if wall_s else 0.0,
+        "upstream_calls": calls,
+    }
+
+def _configure_env(stubs, args):
+    env = stubs.env()
+    env.update({
+        "RESTAURANT_PROVIDER": args.provider,
+        "ANALYSIS_CONCURRENCY": str(args.concurrency),
+        # Caches are off unless asked for, so every iteration exercises the full path
+        "ANALYSIS_CACHE_PATH": args.cache_path if args.with_cache else "",
+        "SEARCH_CACHE_PATH": args.cache_path if args.with_cache else "",
+        "REVIEW_CACHE_PATH": args.cache_path if args.with_cache else "",
+        # Rate limit state stays in-process so runs do not share budgets with other processes
+        "RATE_LIMIT_PATH": "",
+        "DEFAULT_LATITUDE": "-37.816375",
+        "DEFAULT_LONGITUDE": "144.960934",
+    })
+    os.environ.update(env)
+
+def _run(fn, iterations):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples, time.perf_counter() - start
+
+def bench_agent(stubs, args):
+    from lunchgenie.agent import Agent
+    from lunchgenie.config import Config
+
+    agent = Agent(Config(env_path=os.devnull))
+    search = lambda: agent.recommend_lunch_places(max_distance_m=args.radius)
+    # Warm-up runs pay one-off costs (lazy imports, client construction) and are not reported
+    for _ in range(args.warmup):
+        search()
+    stubs.reset_counts()
+    samples, wall = _run(search, args.iterations)
+    return summarize(f"agent.recommend_lunch_places[{args.provider}]", samples, wall, stubs.call_counts())
+
+def bench_plugin(stubs, args):
+    from lunchgenie.config import Config
+
+    cfg = Config(env_path=os.devnull)
+    if args.provider == "google":
+        from tools.google_places import GooglePlacesPlugin
+        plugin = GooglePlacesPlugin(cfg)
+    elif args.provider == "multi":
+        from lunchgenie.restaurant_provider.multi_provider import MultiProvider
+        plugin = MultiProvider(cfg)
+    else:
+        from tools.yelp import YelpPlugin
+        plugin = YelpPlugin(cfg)
+    criteria = {"categories": "chinese,indian,malaysian,italian", "min_rating": 4.0, "radius": args.radius}
+
+    def search():
+        plugin.search_restaurants("ambient places for team lunch", location="", criteria=criteria,
+                                  latitude=-37.816375, longitude=144.960934)
+
+    for _ in range(args.warmup):
+        search()
+    stubs.reset_counts()
+    samples, wall = _run(search, args.iterations)
+    name = getattr(plugin, "name", type(plugin).__name__)
+    return summarize(f"{name}.search_restaurants", samples, wall, stubs.call_counts())
+
+SCENARIOS = {"agent": bench_agent, "plugin": bench_plugin}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline LunchGenie benchmarks against local stubs.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS) + ["all"], default="all")
+    parser.add_argument("--provider", choices=("google", "yelp", "multi"), default="google")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1, help="unreported warm-up runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="ANALYSIS_CONCURRENCY for the agent")
+    parser.add_argument("--radius", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="provider stub latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="OpenAI stub latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub requests failing with 503")
+    parser.add_argument("--results", type=int, default=20, help="restaurants per search response")
+    parser.add_argument("--reviews", type=int, default=5, help="reviews per restaurant")
+    parser.add_argument("--review-chars", type=int, default=200, help="approximate characters per review")
+    parser.add_argument("--with-cache", action="store_true", help="enable the search and analysis caches")
+    parser.add_argument("--cache-path", default=".lunchgenie_bench_cache.sqlite3")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    settings = StubSettings(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, llm_latency_ms=args.llm_latency_ms,
+        error_rate=args.error_rate, results=args.results, reviews=args.reviews,
+        review_chars=args.review_chars,
+    )
+    stubs = start_stubs(settings)
+    try:
+        _configure_env(stubs, args)
+        names = sorted(SCENARIOS) if args.scenario == "all" else [args.scenario]
+        # Agent progress messages go to stderr so the report stays readable/parseable
+        with contextlib.redirect_stdout(sys.stderr):
+            reports = [SCENARIOS[name](stubs, args) for name in names]
+    finally:
+        stubs.stop()
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return 0
+    for r in reports:
+        print(f"{r['scenario']}: p50 {r['p50_ms']} ms, p95 {r['p95_ms']} ms, mean {r['mean_ms']} ms, "
+              f"{r['throughput_per_s']}/s over {r['iterations']} runs")
+        for route, count in sorted(r["upstream_calls"].items()):
+            print(f"    {route}: {count} calls ({count / max(r['iterations'], 1):.1f}/run)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+Local stand-in servers for the Yelp, Google Places and OpenAI endpoints used by LunchGenie.
+Each stub serves deterministic synthetic data with configurable latency, error rate and
+payload size, and counts the calls it receives per route.
+
+Usage:
+    from benchmarks.stub_servers import StubSettings, start_stubs
+
+    stubs = start_stubs(StubSettings(latency_ms=50, error_rate=0.02))
+    os.environ.update(stubs.env())   # point a Config at the stubs
+    ...
+    print(stubs.call_counts())
+    stubs.stop()
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+POSITIVE_SNIPPETS = (
+    "Lovely laksa and friendly staff.", "Great value lunch specials, quick service.",
+    "The dumplings were excellent and the room has a nice buzz.", "Spicy, fresh and generous portions.",
+    "Booked for a team lunch of twelve and they handled it well.", "Good vegetarian options.",
+)
+RED_FLAG_SNIPPETS = (
+    "Saw a cockroach near the counter.", "Two of us got food poisoning after the chicken.",
+    "The kitchen looked filthy and unhygienic.",
+)
+
+@dataclass
+class StubSettings:
+    latency_ms: float = 30.0        # mean added latency per request
+    jitter_ms: float = 10.0         # uniform +/- jitter around the mean
+    llm_latency_ms: float = 300.0   # mean latency of the OpenAI stub
+    error_rate: float = 0.0         # fraction of requests answered with HTTP 503
+    results: int = 20               # restaurants per search response
+    reviews: int = 5                # reviews per restaurant
+    review_chars: int = 200         # approximate characters per review
+    red_flag_rate: float = 0.2      # fraction of restaurants with a red-flag review
+    seed: int = 7
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, settings, latency_ms, routes):
+        self.settings = settings
+        self.latency_ms = latency_ms
+        self.routes = routes
+        self.counts = {}
+        self.counts_lock = threading.Lock()
+        self.rng = random.Random(settings.seed)
+        self.rng_lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        server = self.server
+        url = urlparse(self.path)
+        body = b""
+        if method == "POST":
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        for route_method, pattern, name, handler in server.routes:
+            match = re.fullmatch(pattern, url.path)
+            if route_method == method and match:
+                break
+        else:
+            self._send(404, {"error": f"no stub route for {method} {url.path}"})
+            return
+        with server.counts_lock:
+            server.counts[name] = server.counts.get(name, 0) + 1
+        with server.rng_lock:
+            delay = server.latency_ms + server.rng.uniform(-1, 1) * server.settings.jitter_ms
+            fail = server.rng.random() < server.settings.error_rate
+        time.sleep(max(delay, 0) / 1000.0)
+        if fail:
+            self._send(503, {"error": "injected stub failure"}, retry_after=0)
+            return
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self._send(200, handler(server.settings, match, params, body))
+
+    def _send(self, status, payload, retry_after=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+# --- synthetic data -------------------------------------------------------
+
+def _parse_point(value, default=(-37.816375, 144.960934)):
+    try:
+        lat, lon = (float(x) for x in value.split(","))
+        return lat, lon
+    except Exception:
+        return default
+
+def _restaurants(settings, lat, lon, radius):
+    """Deterministic restaurants spread within radius of (lat, lon)."""
+    places = []
+    for i in range(settings.results):
+        rng = random.Random(f"{settings.seed}:{i}")
+        distance = rng.uniform(0, radius)
+        bearing = rng.uniform(0, 2 * math.pi)
+        d_lat = distance * math.cos(bearing) / 111320.0
+        d_lon = distance * math.sin(bearing) / (111320.0 * math.cos(math.radians(lat)))
+        places.append({
+            "id": f"stub-{i}",
+            "name": f"Stub Kitchen {i}",
+            "rating": round(rng.choice([3.5, 4.0, 4.2, 4.4, 4.5, 4.6, 4.7, 4.8, 4.9]), 1),
+            "review_count": rng.randint(10, 3000),
+            "lat": lat + d_lat,
+            "lon": lon + d_lon,
+            "distance": distance,
+        })
+    return places
+
+def _reviews(settings, place_id):
+    rng = random.Random(f"{settings.seed}:reviews:{place_id}")
+    red_flag = rng.random() < settings.red_flag_rate
+    reviews = []
+    for j in range(settings.reviews):
+        text = ""
+        while len(text) < settings.review_chars:
+            text += rng.choice(POSITIVE_SNIPPETS) + " "
+        if red_flag and j == 0:
+            text = rng.choice(RED_FLAG_SNIPPETS) + " " + text
+        reviews.append(text.strip())
+    return reviews
+
+def _yelp_search(settings, match, params, body):
+    lat = float(params.get("latitude", -37.816375))
+    lon = float(params.get("longitude", 144.960934))
+    places = _restaurants(settings, lat, lon, float(params.get("radius", 1200)))
+    limit = int(params.get("limit", 20))
+    offset = int(params.get("offset", 0))
+    businesses = [{
+        "id": p["id"], "name": p["name"], "rating": p["rating"], "review_count": p["review_count"],
+        "categories": [{"alias": "asian", "title": "Asian"}],
+        "location": {"display_address": [f"{p['id']} Stub St", "Melbourne VIC 3000"]},
+        "coordinates": {"latitude": p["lat"], "longitude": p["lon"]},
+        "distance": p["distance"], "url": f"https://stub.example/yelp/{p['id']}",
+    } for p in places]
+    businesses.sort(key=lambda b: b["rating"], reverse=True)
+    return {"businesses": businesses[offset:offset + limit], "total": len(businesses)}
+
+def _yelp_reviews(settings, match, params, body):
+    return {"reviews": [{"text": t, "rating": 5} for t in _reviews(settings, match.group(1))]}
+
+GOOGLE_PAGE_SIZE = 20
+
+def _google_nearby(settings, match, params, body):
+    # Page tokens encode the search, so follow-up pages need only the token (as with Google)
+    token = params.get("pagetoken")
+    if token:
+        location, radius, offset = token.split("|")
+        params = {"location": location, "radius": radius}
+        offset = int(offset)
+    else:
+        offset = 0
+    lat, lon = _parse_point(params.get("location", ""))
+    places = _restaurants(settings, lat, lon, float(params.get("radius", 1200)))
+    page = places[offset:offset + GOOGLE_PAGE_SIZE]
+    response = {"status": "OK" if page else "ZERO_RESULTS", "results": [{
+        "place_id": p["id"], "name": p["name"], "rating": p["rating"],
+        "user_ratings_total": p["review_count"], "types": ["restaurant", "food"],
+        "geometry": {"location": {"lat": p["lat"], "lng": p["lon"]}},
+    } for p in page]}
+    if offset + GOOGLE_PAGE_SIZE < len(places):
+        response["next_page_token"] = f"{lat},{lon}|{params.get('radius', 1200)}|{offset + GOOGLE_PAGE_SIZE}"
+    return response
+
+def _google_details(settings, match, params, body):
+    place_id = params.get("place_id", "")
+    return {"status": "OK", "result": {
+        "formatted_address": f"{place_id} Stub St, Melbourne VIC 3000",
+        "url": f"https://stub.example/google/{place_id}",
+        "reviews": [{"text": t} for t in _reviews(settings, place_id)],
+    }}
+
+def _verdict(text):
+    flagged = [s for s in RED_FLAG_SNIPPETS if s in text]
+    if flagged:
+        return {"red_flags": flagged, "safe": False, "summary": "Reviews mention hygiene or food-safety issues."}
+    return {"red_flags": [], "safe": True, "summary": "No red flags found; it seems safe."}
+
+def _review_verdict(text):
+    flagged = [s for s in RED_FLAG_SNIPPETS if s in text]
+    return {"flagged": bool(flagged), "quote": flagged[0] if flagged else "",
+            "issue": "hygiene or food-safety problem" if flagged else ""}
+
+def _openai_chat(settings, match, params, body):
+    request = json.loads(body or b"{}")
+    prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+    sections = re.split(r"^Restaurant (R\d+):$", prompt, flags=re.MULTILINE)
+    review_sections = re.split(r"^Review (V\d+):$", prompt, flags=re.MULTILINE)
+    if len(review_sections) > 1:
+        # Per-review prompt: one verdict per review label
+        content = {label: _review_verdict(text) for label, text in zip(review_sections[1::2], review_sections[2::2])}
+    elif len(sections) > 1:
+        # Batch prompt: one verdict per restaurant label
+        content = {label: _verdict(text) for label, text in zip(sections[1::2], sections[2::2])}
+    else:
+        content = _verdict(prompt)
+    prompt_tokens = len(prompt) // 4 + 1
+    completion = json.dumps(content)
+    completion_tokens = len(completion) // 4 + 1
+    return {
+        "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": completion}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+YELP_ROUTES = [
+    ("GET", r"/v3/businesses/search", "yelp.search", _yelp_search),
+    ("GET", r"/v3/businesses/([^/]+)/reviews", "yelp.reviews", _yelp_reviews),
+]
+GOOGLE_ROUTES = [
+    ("GET", r"/maps/api/place/nearbysearch/json", "google.nearbysearch", _google_nearby),
+    ("GET", r"/maps/api/place/details/json", "google.details", _google_details),
+]
+OPENAI_ROUTES = [
+    ("POST", r"/v1/chat/completions", "openai.chat", _openai_chat),
+]
+
+class StubServices:
+    """The three running stub servers (Yelp, Google Places, OpenAI)."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.yelp = _StubServer(settings, settings.latency_ms, YELP_ROUTES)
+        self.google = _StubServer(settings, settings.latency_ms, GOOGLE_ROUTES)
+        self.openai = _StubServer(settings, settings.llm_latency_ms, OPENAI_ROUTES)
+        self._servers = (self.yelp, self.google, self.openai)
+        for server in self._servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def env(self):
+        """Environment variables that point a LunchGenie Config at the stubs."""
+        return {
+            "OPENAI_API_KEY": "stub-openai-key",
+            "YELP_API_KEY": "stub-yelp-key",
+            "GOOGLE_PLACES_API_KEY": "stub-google-key",
+            "YELP_API_BASE_URL": self.yelp.base_url,
+            "GOOGLE_PLACES_API_BASE_URL": self.google.base_url,
+            "OPENAI_BASE_URL": self.openai.base_url + "/v1",
+            # The stub honours page tokens immediately
+            "GOOGLE_PAGE_TOKEN_DELAY": "0",
+        }
+
+    def call_counts(self):
+        counts = {}
+        for server in self._servers:
+            with server.counts_lock:
+                counts.update(server.counts)
+        return counts
+
+    def reset_counts(self):
+        for server in self._servers:
+            with server.counts_lock:
+                server.counts.clear()
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+def start_stubs(settings=None):
+    return StubServices(settings or StubSettings())
@@ -7,26 +7,73 @@ Implements full agent workflow to recommend lunch places.
 from lunchgenie.config import Config, ConfigError
 from lunchgenie.review_analyzer import ReviewAnalyzer
 
-import requests
-import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+from contextlib import contextmanager
+from itertools import islice
 
-from lunchgenie.restaurant_provider.yelp_provider import YelpProvider
-from lunchgenie.restaurant_provider.google_provider import GoogleProvider
-from lunchgenie.llm_utils import test_llm
+from lunchgenie.restaurant_provider import load_provider
+from lunchgenie.restaurant_provider.cached_provider import CachedProvider
+from lunchgenie.cache_store import CacheStore
+from lunchgenie.deadline import Deadline, DeadlineExceeded, remaining
 from lunchgenie.location_utils import resolve_location
+from lunchgenie.metrics import metrics
+from lunchgenie.rate_limiter import RateLimitError
 from lunchgenie.review_fetcher import ReviewFetcher
+from lunchgenie.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class RecommendationResult(list):
+    """
+    The recommended places, best first. partial is True when the deadline passed before
+    every candidate that could have been recommended was verified, so the list may be short
+    or miss better-ranked places.
+    """
+
+    def __init__(self, places=(), partial=False):
+        super().__init__(places)
+        self.partial = partial
 
 class Agent:
-    def __init__(self, config=None):
+    def __init__(self, config=None, background_refresh=True):
+        """
+        background_refresh=False makes stale cached searches and reviews refresh before
+        they are used instead of in the background (see prewarm.py).
+        """
         self.cfg = config if config else Config()
         self.review_ai = ReviewAnalyzer(self.cfg)
-        self.review_fetcher = ReviewFetcher(self.cfg)
-        if self.cfg.restaurant_provider == "yelp":
-            self.provider = YelpProvider(self.cfg)
-        elif self.cfg.restaurant_provider == "google":
-            self.provider = GoogleProvider(self.cfg)
-        else:
-            raise ValueError(f"Unknown RESTAURANT_PROVIDER: {self.cfg.restaurant_provider}")
+        self.review_fetcher = ReviewFetcher(self.cfg, background_refresh=background_refresh)
+        self.analysis_memo = None
+        self._ranker = None
+        self.provider = load_provider(self.cfg.restaurant_provider, self.cfg)
+        if self.cfg.search_cache_path:
+            store = CacheStore(
+                self.cfg.search_cache_path,
+                namespace="search_results",
+                ttl_seconds=self.cfg.search_cache_ttl + self.cfg.search_cache_stale_ttl,
+                max_entries=1000
+            )
+            self.provider = CachedProvider(
+                self.provider,
+                store,
+                name=self.cfg.restaurant_provider,
+                ttl_seconds=self.cfg.search_cache_ttl,
+                stale_ttl_seconds=self.cfg.search_cache_stale_ttl,
+                precision=self.cfg.search_cache_precision,
+                background_refresh=background_refresh
+            )
+
+    @property
+    def ranker(self):
+        """
+        The Ranker (ranking.py), built on first use: NumPy is only imported once there
+        are results to rank.
+        """
+        if self._ranker is None:
+            from lunchgenie.ranking import Ranker
+            self._ranker = Ranker.from_config(self.cfg)
+        return self._ranker
 
     def recommend_lunch_places(self,
                                cuisine_list=("chinese", "indian", "malaysian","italian"),
@@ -34,10 +81,87 @@ class Agent:
                                max_distance_m=3000,
                                location="Melbourne",
                                latitude=None,
-                               longitude=None):
+                               longitude=None,
+                               top_k=5,
+                               deadline=None):
         """
         High-level workflow: searches, filters, and summarizes lunch options.
-        Returns clean recommendations for formatting/display.
+        Returns up to top_k clean recommendations, best rated first, for formatting/display,
+        as a RecommendationResult.
+        deadline: overall time budget in seconds (default RECOMMEND_DEADLINE; 0 = none).
+        Upstream calls get their timeouts from the time remaining; candidates not verified
+        in time are skipped and the result is flagged partial.
+        When the LLM is throttled or down (RateLimitError/CircuitOpenError), the places
+        verified so far are returned flagged partial, or an error message if there are none.
+        """
+        deadline = self._deadline(deadline)
+        with metrics.span("recommend"):
+            try:
+                results = self._search(cuisine_list, min_rating, max_distance_m, location, latitude, longitude,
+                                       deadline)
+            except DeadlineExceeded as err:
+                logger.warning("Search did not finish in time: %s", err)
+                metrics.inc("recommend_partial_total", stage="search")
+                return RecommendationResult(partial=True)
+            except Exception as err:
+                from tools.base import PluginError
+                if isinstance(err, PluginError):
+                    return f"Provider error: {err}"
+                else:
+                    return f"Unexpected provider error: {err}"
+            if not results:
+                return None
+            logger.info(f"Found {len(results)} high-rated options. Analyzing reviews...")
+
+            # Analyze reviews best-rated first and stop once top_k safe places are confirmed
+            status = {"partial": False}
+            good_places = RecommendationResult()
+            try:
+                for place in self._iter_safe_places(results, top_k, cuisine_list, deadline, status):
+                    good_places.append(place)
+            except RateLimitError as err:
+                logger.warning("Review analysis unavailable: %s", err)
+                if not good_places:
+                    return f"Review analysis unavailable: {err}"
+                status["partial"] = True
+            good_places.partial = status["partial"]
+            if good_places.partial:
+                metrics.inc("recommend_partial_total", stage="analysis")
+            return good_places
+
+    def iter_lunch_places(self,
+                          cuisine_list=("chinese", "indian", "malaysian","italian"),
+                          min_rating=4.0,
+                          max_distance_m=3000,
+                          location="Melbourne",
+                          latitude=None,
+                          longitude=None,
+                          top_k=5,
+                          deadline=None):
+        """
+        Streaming variant of recommend_lunch_places: yields each recommendation as soon as
+        it passes review analysis, in the same order recommend_lunch_places returns them.
+        Provider failures are raised (PluginError) instead of being returned as a message,
+        as are LLM rate limit and circuit breaker errors (RateLimitError).
+        When the deadline passes, the iteration simply ends.
+        """
+        deadline = self._deadline(deadline)
+        try:
+            results = self._search(cuisine_list, min_rating, max_distance_m, location, latitude, longitude, deadline)
+        except DeadlineExceeded as err:
+            logger.warning("Search did not finish in time: %s", err)
+            return
+        if not results:
+            return
+        logger.info(f"Found {len(results)} high-rated options. Analyzing reviews...")
+        yield from self._iter_safe_places(results, top_k, cuisine_list, deadline, stream=True)
+
+    def _deadline(self, deadline):
+        return Deadline.coerce(self.cfg.recommend_deadline if deadline is None else deadline)
+
+    def _search(self, cuisine_list, min_rating, max_distance_m, location, latitude, longitude, deadline=None):
+        """
+        Runs the provider search for the given criteria and location.
         """
         use_loc, use_lat, use_lon = resolve_location(self.cfg, location, latitude, longitude)
         criteria = {
@@ -45,42 +169,195 @@ class Agent:
             "min_rating": min_rating,
             "radius": max_distance_m
         }
-        try:
-            results = self.provider.search_restaurants(
+        with metrics.span("provider_search", provider=self.cfg.restaurant_provider):
+            return self.provider.search_restaurants(
                 query="ambient places for team lunch",
                 location=use_loc if use_loc else "",
                 criteria=criteria,
                 latitude=use_lat,
-                longitude=use_lon
+                longitude=use_lon,
+                deadline=deadline
             )
-        except Exception as err:
-            from tools.base import PluginError
-            if isinstance(err, PluginError):
-                return f"Provider error: {err}"
-            else:
-                return f"Unexpected provider error: {err}"
-        if not results:
+
+    def _iter_safe_places(self, results, top_k, cuisine_list=(), deadline=None, status=None, stream=False):
+        """
+        Yields up to top_k entries that pass review analysis, best ranked first (see ranking.py;
+        by default descending rating). Candidates are analyzed lazily in rank order, in waves
+        just large enough to fill the remaining slots (at least ANALYSIS_CONCURRENCY), so
+        lower-ranked places are only analyzed when needed. Ties keep provider order, so the
+        output is the same as analyzing every result and taking the top_k best-ranked safe ones.
+        With a deadline, no wave starts after it has passed and candidates not verified in
+        time are skipped; status["partial"] is then set to True.
+        With stream=True, each wave's best-ranked candidate (the next place to yield) is
+        analyzed on its own alongside the rest of the wave, so it is yielded as soon as its
+        verdict is in instead of when the whole batch is, at the cost of one more LLM call.
+        """
+        ranked = self.ranker.iter_ranked(results, cuisines=cuisine_list,
+                                         first=max(top_k, self.cfg.analysis_concurrency))
+        found = 0
+        while found < top_k:
+            wave_size = max(top_k - found, self.cfg.analysis_concurrency)
+            wave = list(islice(ranked, wave_size))
+            if not wave:
+                return
+            if deadline is not None and deadline.expired():
+                if status is not None:
+                    status["partial"] = True
+                return
+            analyzed = self._analyze_head_first(wave, deadline) if stream else self._analyze_entries(wave, deadline)
+            for entry, analysis in analyzed:
+                if analysis is None:
+                    # Not verified before the deadline
+                    if status is not None:
+                        status["partial"] = True
+                    continue
+                safe = analysis.get("safe", False)
+                if safe:
+                    summary = analysis.get("summary", "") if analysis.get("summary", "") else "No reviews to analyze."
+                    entry["review_summary"] = summary
+                    yield entry
+                    found += 1
+                    if found >= top_k:
+                        return
+
+    def _analyze_head_first(self, entries, deadline=None):
+        """
+        Yields (entry, analysis) pairs in input order, like _analyze_entries, with the first
+        entry analyzed on its own while the others are analyzed in the background.
+        """
+        if len(entries) <= 1:
+            yield from self._analyze_entries(entries, deadline)
+            return
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        rest = pool.submit(self._analyze_entries, entries[1:], deadline)
+        try:
+            yield from self._analyze_entries(entries[:1], deadline)
+            yield from rest.result()
+        finally:
+            # A consumer that stops early does not wait for the rest of the wave
+            pool.shutdown(wait=False)
+
+    def _fetch_reviews(self, entry, deadline=None):
+        """
+        Fetch the reviews of a single restaurant entry.
+        """
+        name = entry.get('name', '?')
+        logger.info(f"Analyzing reviews for {name} ...")
+        with metrics.span("review_fetch"):
+            return self.review_fetcher.get_reviews(entry, deadline=deadline)
+
+    @contextmanager
+    def shared_analysis(self):
+        """
+        Within this block each restaurant (by provider and id) is fetched and analyzed at
+        most once, even across concurrent queries; later queries reuse the first verdict.
+        """
+        previous = self.analysis_memo
+        self.analysis_memo = SingleFlight(keep_results=True)
+        try:
+            yield
+        finally:
+            self.analysis_memo = previous
+
+    def _entry_key(self, entry):
+        if not entry.get("id"):
+            return None
+        return f"{entry.get('source', self.cfg.restaurant_provider)}:{entry['id']}"
+
+    def _analyze_entries(self, entries, deadline=None):
+        """
+        Returns (entry, analysis) pairs in input order; analysis is None for entries not
+        verified before the deadline.
+        Inside shared_analysis(), restaurants already analyzed (or in flight) in another
+        query are not analyzed again.
+        """
+        memo = self.analysis_memo
+        if memo is None:
+            return self._analyze_uncached(entries, deadline)
+        keys = [self._entry_key(entry) for entry in entries]
+        claims = [memo.claim(key) if key else (None, True) for key in keys]
+        mine = [i for i, (_, owner) in enumerate(claims) if owner]
+        try:
+            owned = self._analyze_uncached([entries[i] for i in mine], deadline)
+        except BaseException as err:
+            for i in mine:
+                if keys[i]:
+                    memo.fail(keys[i], err)
+            raise
+        analyses = {}
+        for i, (_, analysis) in zip(mine, owned):
+            analyses[i] = analysis
+            if keys[i]:
+                if analysis is None:
+                    # Not memoized, so another query with more time left analyzes it
+                    memo.fail(keys[i], DeadlineExceeded("Not analyzed before the deadline"))
+                else:
+                    memo.resolve(keys[i], analysis)
+        return [
+            (entry, analyses[i] if i in analyses else self._shared_result(claims[i][0], deadline))
+            for i, entry in enumerate(entries)
+        ]
+
+    @staticmethod
+    def _shared_result(future, deadline):
+        """
+        The analysis another query is computing; None if it is not ready by our deadline or
+        was cut short by its own.
+        """
+        try:
+            return future.result(timeout=remaining(deadline))
+        except (TimeoutError, DeadlineExceeded):
             return None
-        # Analyze reviews and filter
-        good_places = []
-        
-        print(f"Found {len(results)} high-rated options. Analyzing reviews...")
-
-        for entry in results:
-            name = entry.get('name', '?')
-            print(f"Analyzing reviews for {name} ...")
-            reviews = self.review_fetcher.get_reviews(entry)
-            analysis = self.review_ai.detect_red_flags(reviews)
-            safe = analysis.get("safe", False)
-            if safe:
-                summary = analysis.get("summary", "") if analysis.get("summary", "") else "No reviews to analyze."
-                entry["review_summary"] = summary
-                good_places.append(entry)
-            time.sleep(0.7)
-        if not good_places:
+
+    def _analyze_uncached(self, entries, deadline=None):
+        """
+        Returns (entry, analysis) pairs in input order.
+        Reviews are fetched on a bounded thread pool when ANALYSIS_CONCURRENCY > 1
+        (otherwise one at a time), then analyzed with the batch API so several restaurants
+        share a single LLM call. Upstream request pacing is left to the shared rate limiter.
+        With a deadline, restaurants whose reviews or verdict are not ready in time get
+        analysis None.
+        """
+        if not entries:
             return []
-        good_places = sorted(good_places, key=lambda x: x["rating"], reverse=True)[:5]
-        return good_places
+        workers = min(self.cfg.analysis_concurrency, len(entries))
+        if deadline is not None:
+            review_sets = self._fetch_before_deadline(entries, workers, deadline)
+        elif workers <= 1:
+            review_sets = [self._fetch_reviews(entry) for entry in entries]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map() preserves input order, so output matches the sequential mode
+                review_sets = list(pool.map(self._fetch_reviews, entries))
+        with metrics.span("review_analysis"):
+            analyses = self.review_ai.detect_red_flags_batch(
+                {str(i): reviews for i, reviews in enumerate(review_sets) if reviews is not None},
+                max_workers=self.cfg.analysis_concurrency,
+                restaurant_ids={str(i): self._entry_key(entry) for i, entry in enumerate(entries)},
+                deadline=deadline
+            )
+        return [(entry, analyses.get(str(i))) for i, entry in enumerate(entries)]
+
+    def _fetch_before_deadline(self, entries, workers, deadline):
+        """
+        Fetches reviews on up to workers threads; fetches not finished by the deadline are
+        abandoned and give None.
+        """
+        pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        futures = [pool.submit(self._fetch_reviews, entry, deadline) for entry in entries]
+        wait(futures, timeout=deadline.remaining())
+        pool.shutdown(wait=False, cancel_futures=True)
+        review_sets = []
+        for future in futures:
+            if not future.done() or future.cancelled():
+                review_sets.append(None)
+            elif future.exception() is not None:
+                if not isinstance(future.exception(), DeadlineExceeded) and not deadline.expired():
+                    raise future.exception()
+                review_sets.append(None)
+            else:
+                review_sets.append(future.result())
+        return review_sets
 
 def recommend_lunch_places(
     cuisine_list=("chinese", "indian", "malaysian","italian"),
@@ -88,7 +365,9 @@ def recommend_lunch_places(
     max_distance_m=3000,
     location="Melbourne",
     latitude=None,
-    longitude=None
+    longitude=None,
+    top_k=5,
+    deadline=None
 ):
     agent = Agent()
     recommendations = agent.recommend_lunch_places(
@@ -97,7 +376,31 @@ def recommend_lunch_places(
         max_distance_m=max_distance_m,
         location=location,
         latitude=latitude,
-        longitude=longitude
+        longitude=longitude,
+        top_k=top_k,
+        deadline=deadline
     )
     # Formatting/printing responsibility no longer in core agent
     return recommendations
+
+def iter_lunch_places(
+    cuisine_list=("chinese", "indian", "malaysian","italian"),
+    min_rating=4.0,
+    max_distance_m=3000,
+    location="Melbourne",
+    latitude=None,
+    longitude=None,
+    top_k=5,
+    deadline=None
+):
+    agent = Agent()
+    yield from agent.iter_lunch_places(
+        cuisine_list=cuisine_list,
+        min_rating=min_rating,
+        max_distance_m=max_distance_m,
+        location=location,
+        latitude=latitude,
+        longitude=longitude,
+        top_k=top_k,
+        deadline=deadline
+    )
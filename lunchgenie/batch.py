@@ -0,0 +1,92 @@
+"""
+Batch recommendation mode for LunchGenie.
+Runs many query specs (one JSON object per line) on a worker pool sharing one Agent,
+its provider clients and caches, and streams results out as JSON lines.
+
+Query spec fields (all optional):
+    {"location": "Melbourne", "latitude": -37.81, "longitude": 144.96,
+     "cuisines": ["indian", "thai"], "min_rating": 4.2, "radius": 1500, "top_k": 5,
+     "deadline": 5.0}
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from lunchgenie.result_formatter import place_record
+
+def load_queries(path):
+    """
+    Reads query specs from a JSON-lines file (blank lines and '#' comments are skipped).
+    """
+    queries = []
+    with open(path, encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as err:
+                raise ValueError(f"{path}:{line_no}: invalid JSON query spec: {err}")
+            if not isinstance(spec, dict):
+                raise ValueError(f"{path}:{line_no}: query spec must be a JSON object")
+            queries.append(spec)
+    return queries
+
+def query_kwargs(spec):
+    """
+    Maps a query spec onto Agent.recommend_lunch_places keyword arguments.
+    """
+    kwargs = {}
+    cuisines = spec.get("cuisines")
+    if cuisines:
+        if isinstance(cuisines, str):
+            cuisines = [c.strip() for c in cuisines.split(",") if c.strip()]
+        kwargs["cuisine_list"] = tuple(cuisines)
+    if "min_rating" in spec:
+        kwargs["min_rating"] = float(spec["min_rating"])
+    radius = spec.get("radius", spec.get("max_distance_m"))
+    if radius is not None:
+        kwargs["max_distance_m"] = int(radius)
+    if "location" in spec:
+        kwargs["location"] = spec["location"]
+    latitude = spec.get("latitude", spec.get("lat"))
+    longitude = spec.get("longitude", spec.get("lon"))
+    if latitude is not None and longitude is not None:
+        kwargs["latitude"] = float(latitude)
+        kwargs["longitude"] = float(longitude)
+    if "top_k" in spec:
+        kwargs["top_k"] = int(spec["top_k"])
+    if spec.get("deadline") is not None:
+        kwargs["deadline"] = float(spec["deadline"])
+    return kwargs
+
+def _run_query(agent, index, spec):
+    record = {"index": index, "query": spec}
+    try:
+        result = agent.recommend_lunch_places(**query_kwargs(spec))
+    except Exception as err:
+        record["error"] = f"{type(err).__name__}: {err}"
+        return record
+    if isinstance(result, str):
+        # recommend_lunch_places reports provider and LLM availability failures as a message
+        record["error"] = result
+    else:
+        record["results"] = [place_record(p) for p in result or []]
+        if getattr(result, "partial", False):
+            record["partial"] = True
+    return record
+
+def run_batch(agent, queries, workers=4):
+    """
+    Runs all queries on a pool of `workers` threads sharing `agent`.
+    Each restaurant is fetched and analyzed at most once per run.
+    Yields one result record per query as it completes:
+    {"index": ..., "query": ..., "results": [...]} or {"index": ..., "query": ..., "error": "..."},
+    with "partial": true when the query's deadline cut its analysis short.
+    """
+    with agent.shared_analysis():
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [pool.submit(_run_query, agent, i, spec) for i, spec in enumerate(queries)]
+            for future in as_completed(futures):
+                yield future.result()
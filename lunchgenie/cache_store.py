@@ -0,0 +1,166 @@
+"""
+Persistent key/value cache for LunchGenie.
+SQLite-backed store with TTL expiry, size-based (least recently used) eviction and hit/miss counters,
+plus a helper refreshing stale entries in the background.
+
+Usage:
+    from lunchgenie.cache_store import CacheStore
+
+    store = CacheStore(".lunchgenie_cache.sqlite3", namespace="review_analysis", ttl_seconds=3600)
+    store.set("key", {"safe": True})
+    store.get("key")  # -> {"safe": True}
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from lunchgenie.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class CacheStore:
+    def __init__(self,
+                 path: str = ":memory:",
+                 namespace: str = "default",
+                 ttl_seconds: float = 86400,
+                 max_entries: int = 5000):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", namespace):
+            raise ValueError(f"Invalid cache namespace: {namespace!r}")
+        self.path = path
+        self.namespace = namespace
+        self.table = f"cache_{namespace}"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        if path != ":memory:":
+            # WAL keeps reads cheap and lets several processes share the file
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def get_with_age(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Returns (value, age_seconds) for a live entry, or None on a miss/expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                metrics.inc("cache_misses_total", cache=self.namespace)
+                return None
+            with self._conn:
+                self._conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+        metrics.inc("cache_hits_total", cache=self.namespace)
+        return json.loads(row[0]), now - row[1]
+
+    def get(self, key: str) -> Any:
+        """
+        Returns the cached value, or None on a miss/expired entry.
+        """
+        entry = self.get_with_age(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any):
+        """
+        Stores a JSON-serializable value, evicting expired and least recently used entries.
+        """
+        now = time.time()
+        payload = json.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        cur = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE stored_at < ?", (now - self.ttl_seconds,)
+        )
+        self.evictions += max(cur.rowcount, 0)
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += max(cur.rowcount, 0)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and the current entry count."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+class BackgroundRefresher:
+    """
+    Runs refresh callables on daemon threads, at most one at a time per key, so a stale
+    cache entry can keep being served while it is refreshed.
+    """
+
+    def __init__(self):
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, refresh: Callable[[], Any]) -> bool:
+        """
+        Starts refresh() unless one is already running for key; returns whether it started.
+        Errors are logged and swallowed (the stale entry stays; the next stale hit retries).
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                refresh()
+            except Exception as err:
+                logger.debug("Background refresh of %s failed: %s", key, err)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
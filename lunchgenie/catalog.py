@@ -0,0 +1,234 @@
+"""
+Offline restaurant catalog for LunchGenie.
+A local store of restaurants gathered from provider searches, answering radius queries in
+milliseconds without the network.
+
+Snapshot format (a directory):
+    meta.json              current version, grid cell size and covered regions (replaced atomically)
+    index-<version>.npy    structured array sorted by grid cell: cell key, lat, lon, rating,
+                           review_count and the byte offset/length of the record; loaded memory-mapped
+    records-<version>.jsonl one JSON restaurant entry per line, read only for query matches
+
+Spatial index: points are bucketed into CELL_DEG x CELL_DEG grid cells and sorted by cell key, so
+a radius query is a few binary searches (one per cell row of its bounding box) followed by
+vectorized haversine and rating filters over the candidates.
+
+Usage:
+    catalog = RestaurantCatalog.from_entries(results)
+    catalog.save(".lunchgenie_catalog")
+    catalog = RestaurantCatalog.load(".lunchgenie_catalog")
+    catalog.query(-37.8164, 144.9609, radius_m=1500, min_rating=4.0, cuisines=["thai"])
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from lunchgenie.location_utils import haversine_m
+from lunchgenie.ranking import cuisine_match
+
+SNAPSHOT_VERSION = 1
+CELL_DEG = 0.01                 # ~1.1 km of latitude
+COL_SPAN = 1 << 20              # cell key = row * COL_SPAN + col
+METERS_PER_DEG = 111320.0
+INDEX_DTYPE = np.dtype([
+    ("key", "<i8"), ("lat", "<f8"), ("lon", "<f8"), ("rating", "<f4"),
+    ("review_count", "<i4"), ("offset", "<i8"), ("length", "<i4"),
+])
+
+def haversine_array(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances in meters from one point to arrays of points."""
+    phi1, phi2 = np.radians(lat), np.radians(lats)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(lons - lon)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * 6371000 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def _cells(lat, lon, cell_deg):
+    rows = np.floor((np.asarray(lat) + 90.0) / cell_deg).astype(np.int64)
+    cols = np.floor((np.asarray(lon) + 180.0) / cell_deg).astype(np.int64)
+    return rows, cols
+
+def entry_key(entry: Dict[str, Any]) -> str:
+    """Identity of a catalog entry: provider and id, or name and rounded position."""
+    if entry.get("id"):
+        return f"{entry.get('source', '')}:{entry['id']}"
+    return f"{entry.get('name', '')}@{round(entry['latitude'], 5)},{round(entry['longitude'], 5)}"
+
+class RestaurantCatalog:
+    def __init__(self, index: np.ndarray, records=None, records_path: str = None,
+                 regions: List[Dict[str, Any]] = None, cell_deg: float = CELL_DEG):
+        self.index = index
+        self.cell_deg = cell_deg
+        self.regions = list(regions or [])
+        # Either the records in memory (freshly built) or the snapshot's records file
+        self._records = records
+        self._records_path = records_path
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]], regions: List[Dict[str, Any]] = None,
+                     cell_deg: float = CELL_DEG) -> "RestaurantCatalog":
+        """
+        Builds a catalog from provider results; entries without coordinates are skipped and
+        the last entry wins for duplicate keys (keeping the union of their cuisine_tags).
+        """
+        unique = {}
+        for entry in entries:
+            if entry.get("latitude") is None or entry.get("longitude") is None:
+                continue
+            record = {k: v for k, v in entry.items() if k != "distance_m"}
+            key = entry_key(record)
+            if key in unique and unique[key].get("cuisine_tags"):
+                tags = unique[key]["cuisine_tags"] + (record.get("cuisine_tags") or [])
+                record["cuisine_tags"] = sorted(set(tags))
+            unique[key] = record
+        records = list(unique.values())
+        lats = np.fromiter((r["latitude"] for r in records), dtype=np.float64, count=len(records))
+        lons = np.fromiter((r["longitude"] for r in records), dtype=np.float64, count=len(records))
+        rows, cols = _cells(lats, lons, cell_deg)
+        index = np.zeros(len(records), dtype=INDEX_DTYPE)
+        index["key"] = rows * COL_SPAN + cols
+        index["lat"], index["lon"] = lats, lons
+        index["rating"] = [r.get("rating") or 0 for r in records]
+        index["review_count"] = [r.get("review_count") or 0 for r in records]
+        order = np.argsort(index["key"], kind="stable")
+        return cls(index[order], records=[records[i] for i in order], regions=regions, cell_deg=cell_deg)
+
+    @classmethod
+    def load(cls, path: str) -> "RestaurantCatalog":
+        """
+        Opens a snapshot directory; the index is memory-mapped, records are read on demand.
+        Returns an empty catalog when there is no snapshot yet.
+        """
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return cls(np.zeros(0, dtype=INDEX_DTYPE), records=[])
+        with open(meta_path, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("format") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot format: {meta.get('format')!r}")
+        version = meta["version"]
+        index = np.load(os.path.join(path, f"index-{version}.npy"), mmap_mode="r")
+        return cls(index, records_path=os.path.join(path, f"records-{version}.jsonl"),
+                   regions=meta.get("regions"), cell_deg=meta.get("cell_deg", CELL_DEG))
+
+    def save(self, path: str):
+        """
+        Writes a new snapshot version, then switches meta.json to it (atomic for readers)
+        and removes older versions once they are a minute old, so readers that have just
+        read the previous meta.json can still open its files.
+        """
+        os.makedirs(path, exist_ok=True)
+        version = f"{int(time.time() * 1000)}-{os.getpid()}"
+        index = np.array(self.index, dtype=INDEX_DTYPE)
+        lengths = []
+        with open(os.path.join(path, f"records-{version}.jsonl"), "wb") as fh:
+            for record in self.records():
+                line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                fh.write(line)
+                lengths.append(len(line))
+        index["length"] = lengths
+        index["offset"] = np.cumsum(index["length"], dtype=np.int64) - index["length"]
+        np.save(os.path.join(path, f"index-{version}.npy"), index)
+        meta = {"format": SNAPSHOT_VERSION, "version": version, "cell_deg": self.cell_deg,
+                "count": len(index), "regions": self.regions}
+        tmp = os.path.join(path, f"meta.json.{version}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+        for name in os.listdir(path):
+            if name.startswith(("index-", "records-")) and version not in name:
+                try:
+                    if time.time() - os.path.getmtime(os.path.join(path, name)) > 60:
+                        os.remove(os.path.join(path, name))
+                except OSError:
+                    pass
+
+    def _read(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        if self._records is not None:
+            return [dict(self._records[i]) for i in positions]
+        records = []
+        with open(self._records_path, "rb") as fh:
+            for i in positions:
+                fh.seek(int(self.index[i]["offset"]))
+                records.append(json.loads(fh.read(int(self.index[i]["length"]))))
+        return records
+
+    def records(self) -> List[Dict[str, Any]]:
+        """All entries, in index order."""
+        return self._read(range(len(self.index)))
+
+    def upsert(self, entries: Iterable[Dict[str, Any]], region: Dict[str, Any] = None,
+               max_age_seconds: float = None) -> "RestaurantCatalog":
+        """
+        Returns a new catalog with entries added or replaced (by entry_key) and, optionally,
+        a newly covered region recorded. Regions older than max_age_seconds are dropped.
+        """
+        now = time.time()
+        regions = [r for r in self.regions
+                   if max_age_seconds is None or now - r.get("refreshed_at", 0) <= max_age_seconds]
+        regions += [region] if region else []
+        return RestaurantCatalog.from_entries(list(self.records()) + list(entries), regions, self.cell_deg)
+
+    def query(self, latitude: float, longitude: float, radius_m: float,
+              min_rating: float = 0, cuisines: Sequence[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Entries within radius_m of the point and rated at least min_rating (and matching one
+        of the cuisines, if given), nearest first, with distance_m set.
+        """
+        if not len(self.index):
+            return []
+        d_lat = radius_m / METERS_PER_DEG
+        d_lon = radius_m / (METERS_PER_DEG * max(np.cos(np.radians(latitude)), 1e-6))
+        (row_lo, row_hi), (col_lo, col_hi) = _cells([latitude - d_lat, latitude + d_lat],
+                                                    [longitude - d_lon, longitude + d_lon], self.cell_deg)
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64)
+        keys = self.index["key"]
+        starts = np.searchsorted(keys, rows * COL_SPAN + col_lo, side="left")
+        ends = np.searchsorted(keys, rows * COL_SPAN + col_hi, side="right")
+        candidates = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)] or [np.empty(0, np.int64)])
+        if not len(candidates):
+            return []
+        rows_data = self.index[candidates]
+        distances = haversine_array(latitude, longitude, rows_data["lat"], rows_data["lon"])
+        keep = (distances <= radius_m) & (rows_data["rating"] >= np.float32(min_rating or 0))
+        positions, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        results = self._read(positions[order])
+        for entry, distance in zip(results, distances[order]):
+            entry["distance_m"] = int(distance)
+        if cuisines:
+            # cuisine_tags records the cuisine searches that returned an entry, for providers
+            # (like Google) whose categories do not name the cuisine
+            wanted = {c.strip().lower() for c in cuisines if c and c.strip()}
+            matches = cuisine_match(results, cuisines)
+            results = [entry for entry, match in zip(results, matches)
+                       if match or wanted & set(entry.get("cuisine_tags") or ())]
+        return results
+
+    def covers(self, latitude: float, longitude: float, radius_m: float, cuisines: Sequence[str] = (),
+               min_rating: float = 0, max_age_seconds: float = None) -> bool:
+        """
+        True when a recorded region (refreshed within max_age_seconds) contains the whole
+        query circle and was searched for all of the query's cuisines at a rating floor no
+        higher than min_rating.
+        """
+        now = time.time()
+        wanted = {c.strip().lower() for c in cuisines if c and c.strip()}
+        for region in self.regions:
+            if max_age_seconds is not None and now - region.get("refreshed_at", 0) > max_age_seconds:
+                continue
+            if region.get("min_rating", 0) > (min_rating or 0):
+                continue
+            if region.get("cuisines") and not wanted <= set(region["cuisines"]):
+                continue
+            distance = haversine_m(latitude, longitude, region["latitude"], region["longitude"])
+            if distance + radius_m <= region["radius_m"]:
+                return True
+        return False
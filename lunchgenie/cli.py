@@ -1,18 +1,147 @@
 """
 Command-line interface for LunchGenie.
+
+    python -m lunchgenie.cli                      # test LLM connectivity
+    python -m lunchgenie.cli recommend            # stream recommendations for the default location
+    python -m lunchgenie.cli batch queries.jsonl  # run many queries, JSON lines on stdout
+    python -m lunchgenie.cli serve                # keep a warm agent serving HTTP on localhost
+    python -m lunchgenie.cli prewarm              # fill the caches for the configured sites
 """
 
-from lunchgenie.agent import recommend_lunch_places
-from lunchgenie.llm_utils import test_llm
+import argparse
+import contextlib
+import json
+import logging
+import sys
+
+# Only light modules at import time: the agent, providers and LLM client are
+# imported inside the command that needs them, so `--help` stays fast.
 from lunchgenie.config import ConfigError
-from lunchgenie.result_formatter import print_recommendations
+from tools.base import PluginError
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="lunchgenie", description="Agentic team lunch recommendations.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("recommend", help="recommend lunch places for the default location")
+    batch = commands.add_parser("batch", help="run many query specs from a JSON-lines file")
+    batch.add_argument("queries", help="path to a JSON-lines file of query specs")
+    batch.add_argument("--workers", type=int, default=4, help="queries run concurrently (default: 4)")
+    serve = commands.add_parser("serve", help="run the local recommendation service")
+    serve.add_argument("--host", help="bind address (default: SERVICE_HOST or 127.0.0.1)")
+    serve.add_argument("--port", type=int, help="port (default: SERVICE_PORT or 8765)")
+    serve.add_argument("--prewarm", action="store_true",
+                       help="also pre-warm the configured sites every PREWARM_INTERVAL seconds")
+    prewarm = commands.add_parser("prewarm", help="run searches and review analysis ahead of time")
+    prewarm.add_argument("--sites", help="JSON-lines file of site query specs (default: PREWARM_SITES)")
+    prewarm.add_argument("--workers", type=int, default=4, help="sites warmed concurrently (default: 4)")
+    prewarm.add_argument("--loop", action="store_true", help="repeat every PREWARM_INTERVAL seconds")
+    return parser
+
+def run_recommend_command():
+    from lunchgenie.agent import iter_lunch_places
+    from lunchgenie.rate_limiter import RateLimitError
+    from lunchgenie.result_formatter import print_recommendations_stream
+
+    # Stream each place as soon as it passes review analysis
+    try:
+        print_recommendations_stream(iter_lunch_places())
+    except RateLimitError as err:
+        print(f"Review analysis unavailable: {err}")
+
+def run_batch_command(path, workers):
+    from lunchgenie.agent import Agent
+    from lunchgenie.batch import load_queries, run_batch
+
+    queries = load_queries(path)
+    out = sys.stdout
+    # Keep stdout clean for JSON lines; progress messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        agent = Agent()
+        for record in run_batch(agent, queries, workers=workers):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+
+def run_serve_command(host, port, with_prewarm=False):
+    import threading
+    from lunchgenie.agent import Agent
+    from lunchgenie.server import make_server
+
+    agent = Agent()
+    if with_prewarm:
+        from lunchgenie.prewarm import load_sites, run_forever
+
+        warmer = Agent(agent.cfg, background_refresh=False)
+        sites = load_sites(agent.cfg)
+        threading.Thread(target=run_forever, args=(warmer, sites, agent.cfg.prewarm_interval),
+                         name="prewarm", daemon=True).start()
+    server = make_server(agent, host or agent.cfg.service_host, port or agent.cfg.service_port)
+    bound_host, bound_port = server.server_address[:2]
+    print(f"LunchGenie service listening on http://{bound_host}:{bound_port}/recommend")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
-def main():
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == "recommend":
-        recommendations = recommend_lunch_places()
-        print_recommendations(recommendations)
+def run_prewarm_command(sites_path, workers, loop):
+    from lunchgenie.agent import Agent
+    from lunchgenie.prewarm import load_sites, prewarm, run_forever
+
+    agent = Agent(background_refresh=False)
+    sites = load_sites(agent.cfg, sites_path)
+    if loop:
+        try:
+            run_forever(agent, sites, agent.cfg.prewarm_interval, workers)
+        except KeyboardInterrupt:
+            pass
+        return True
+    records = prewarm(agent, sites, workers)
+    return all("error" not in record for record in records)
+
+def export_run_metrics():
+    from lunchgenie.config import Config
+    from lunchgenie.metrics import export_metrics
+
+    try:
+        export_metrics(Config())
+    except (ConfigError, OSError) as err:
+        print(f"Metrics export error: {err}", file=sys.stderr)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Progress messages and metrics are logged to stderr
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "recommend":
+        try:
+            run_recommend_command()
+        except PluginError as pe:
+            print(f"Provider error: {pe}")
+        export_run_metrics()
+    elif args.command == "batch":
+        try:
+            run_batch_command(args.queries, args.workers)
+        except (ConfigError, PluginError, OSError, ValueError) as err:
+            print(f"Batch error: {err}", file=sys.stderr)
+            sys.exit(1)
+        export_run_metrics()
+    elif args.command == "serve":
+        try:
+            run_serve_command(args.host, args.port, args.prewarm)
+        except (ConfigError, PluginError, OSError) as err:
+            print(f"Service error: {err}", file=sys.stderr)
+            sys.exit(1)
+    elif args.command == "prewarm":
+        try:
+            ok = run_prewarm_command(args.sites, args.workers, args.loop)
+        except (ConfigError, PluginError, OSError, ValueError) as err:
+            print(f"Pre-warm error: {err}", file=sys.stderr)
+            sys.exit(1)
+        export_run_metrics()
+        if not ok:
+            sys.exit(1)
     else:
+        from lunchgenie.llm_utils import test_llm
         try:
             print("Testing LangChain + OpenAI integration...")
             result = test_llm()
@@ -14,6 +14,35 @@ from dotenv import load_dotenv
 class ConfigError(Exception):
     pass
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be an integer, got {value!r}")
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be a number, got {value!r}")
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    value = value.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise ConfigError(f"{name} must be true/false, got {value!r}")
+
 class Config:
     def __init__(self, env_path: str = ".env"):
         # Load environment variables from .env (if exists)
@@ -28,12 +57,128 @@ class Config:
         self.yelp_api_key = os.getenv("YELP_API_KEY")
         self.google_places_api_key = os.getenv("GOOGLE_PLACES_API_KEY")
 
+        # API endpoints (override to point at local stub services, e.g. for benchmarks)
+        self.yelp_api_base_url = os.getenv("YELP_API_BASE_URL", "https://api.yelp.com").rstrip("/")
+        self.google_places_api_base_url = os.getenv("GOOGLE_PLACES_API_BASE_URL", "https://maps.googleapis.com").rstrip("/")
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL") or None
+
         # Geolocation defaults
         self.default_latitude = os.getenv("DEFAULT_LATITUDE")
         self.default_longitude = os.getenv("DEFAULT_LONGITUDE")
 
-        # Restaurant provider selection: 'yelp' or 'google'
+        # Restaurant provider selection: 'yelp', 'google', 'multi' (MULTI_PROVIDERS queried concurrently)
+        # or 'catalog' (offline catalog refreshed from CATALOG_SOURCE)
         self.restaurant_provider = os.getenv("RESTAURANT_PROVIDER", "yelp").strip().lower()
+        self.multi_providers = os.getenv("MULTI_PROVIDERS", "yelp,google")
+        self.multi_provider_deadline = _env_float("MULTI_PROVIDER_DEADLINE", 8.0)
+        self.multi_provider_match_m = _env_float("MULTI_PROVIDER_MATCH_M", 100.0)
+        # Offline catalog: snapshot directory, provider it is refreshed from, and region max age (seconds)
+        self.catalog_path = os.getenv("CATALOG_PATH", ".lunchgenie_catalog").strip()
+        self.catalog_source = os.getenv("CATALOG_SOURCE", "yelp")
+        self.catalog_max_age = _env_float("CATALOG_MAX_AGE", 7 * 86400)
+
+        # Review analysis: how many restaurants are fetched/analyzed at once (1 = sequential)
+        self.analysis_concurrency = max(1, _env_int("ANALYSIS_CONCURRENCY", 4))
+
+        # Persistent cache of review analysis verdicts (set ANALYSIS_CACHE_PATH empty to disable)
+        self.analysis_cache_path = os.getenv("ANALYSIS_CACHE_PATH", ".lunchgenie_cache.sqlite3").strip()
+        self.analysis_cache_ttl = _env_float("ANALYSIS_CACHE_TTL", 86400)
+        self.analysis_cache_max_entries = _env_int("ANALYSIS_CACHE_MAX_ENTRIES", 5000)
+
+        # Approximate prompt token budget for analyzing several restaurants in one LLM call (0 = one call each)
+        self.analysis_batch_token_budget = _env_int("ANALYSIS_BATCH_TOKEN_BUDGET", 6000)
+
+        # Local keyword pre-screen: clearly clean review sets are marked safe without an LLM call
+        self.review_prescreen = _env_bool("REVIEW_PRESCREEN", False)
+        self.review_prescreen_threshold = _env_float("REVIEW_PRESCREEN_THRESHOLD", 0.5)
+
+        # Google Places: concurrent Place Details requests per search
+        self.google_details_concurrency = _env_int("GOOGLE_DETAILS_CONCURRENCY", 8)
+        # Nearbysearch pages read per search (Google serves at most 3 x 20 results; each further
+        # page costs GOOGLE_PAGE_TOKEN_DELAY of wall time), the pause before a next_page_token
+        # becomes valid, and the Details calls made per search
+        self.google_max_pages = _env_int("GOOGLE_MAX_PAGES", 1)
+        self.google_page_token_delay = _env_float("GOOGLE_PAGE_TOKEN_DELAY", 2.0)
+        self.google_max_details = _env_int("GOOGLE_MAX_DETAILS", 20)
+
+        # Yelp: concurrent search requests (one per category and offset page), businesses per
+        # page (at most 50), pages per category, and candidates after which paging stops
+        self.yelp_search_concurrency = _env_int("YELP_SEARCH_CONCURRENCY", 8)
+        self.yelp_page_size = _env_int("YELP_PAGE_SIZE", 20)
+        self.yelp_max_pages = _env_int("YELP_MAX_PAGES", 2)
+        self.yelp_max_results = _env_int("YELP_MAX_RESULTS", 20)
+
+        # Shared HTTP transport: retries (with exponential backoff) and keep-alive connections per host
+        self.http_max_retries = _env_int("HTTP_MAX_RETRIES", 2)
+        self.http_backoff_factor = _env_float("HTTP_BACKOFF_FACTOR", 0.5)
+        self.http_pool_maxsize = _env_int("HTTP_POOL_MAXSIZE", 16)
+
+        # Rate limits shared by all processes using RATE_LIMIT_PATH (empty = this process only):
+        # requests per second per upstream (0 = unlimited) and burst size
+        self.rate_limit_path = os.getenv("RATE_LIMIT_PATH", ".lunchgenie_cache.sqlite3").strip()
+        self.yelp_rate_limit = _env_float("YELP_RATE_LIMIT", 10.0)
+        self.google_rate_limit = _env_float("GOOGLE_RATE_LIMIT", 50.0)
+        self.openai_rate_limit = _env_float("OPENAI_RATE_LIMIT", 5.0)
+        self.rate_limit_burst = max(1.0, _env_float("RATE_LIMIT_BURST", 20.0))
+        self.rate_limit_max_wait = _env_float("RATE_LIMIT_MAX_WAIT", 30.0)
+        # Circuit breaker: consecutive failures that open it, and seconds before retrying
+        self.circuit_breaker_threshold = max(1, _env_int("CIRCUIT_BREAKER_THRESHOLD", 5))
+        self.circuit_breaker_cooldown = _env_float("CIRCUIT_BREAKER_COOLDOWN", 30.0)
+
+        # Cache of reviews fetched per restaurant (set REVIEW_CACHE_PATH empty to disable): seconds
+        # fresh, and how much longer stale reviews are served while refreshed in the background
+        self.review_cache_path = os.getenv("REVIEW_CACHE_PATH", ".lunchgenie_cache.sqlite3").strip()
+        self.review_cache_ttl = _env_float("REVIEW_CACHE_TTL", 21600)
+        self.review_cache_stale_ttl = _env_float("REVIEW_CACHE_STALE_TTL", 7 * 86400)
+
+        # Pre-warm job (python -m lunchgenie.cli prewarm): JSON-lines file of sites as batch
+        # query specs (empty = the default location) and seconds between runs with --loop
+        self.prewarm_sites = os.getenv("PREWARM_SITES", "").strip()
+        self.prewarm_interval = _env_float("PREWARM_INTERVAL", 1800)
+
+        # Overall time budget of a recommendation in seconds (0 = none), and seconds after which
+        # a slow review fetch is re-issued (hedged) (0 = never)
+        self.recommend_deadline = _env_float("RECOMMEND_DEADLINE", 0)
+        self.hedge_after = _env_float("HEDGE_AFTER", 0)
+
+        # Model cascade for review analysis: ANALYSIS_FAST_MODEL screens every review set and
+        # flagged or unparseable verdicts are escalated to ANALYSIS_STRONG_MODEL
+        # (empty = the analyzer's regular model)
+        self.analysis_cascade = _env_bool("ANALYSIS_CASCADE", False)
+        self.analysis_fast_model = os.getenv("ANALYSIS_FAST_MODEL", "gpt-4o-mini").strip()
+        self.analysis_strong_model = os.getenv("ANALYSIS_STRONG_MODEL", "gpt-4o").strip()
+
+        # Search result cache, shared by nearby search points (set SEARCH_CACHE_PATH empty to disable)
+        self.search_cache_path = os.getenv("SEARCH_CACHE_PATH", ".lunchgenie_cache.sqlite3").strip()
+        self.search_cache_ttl = _env_float("SEARCH_CACHE_TTL", 3600)
+        self.search_cache_stale_ttl = _env_float("SEARCH_CACHE_STALE_TTL", 86400)
+        self.search_cache_precision = _env_int("SEARCH_CACHE_PRECISION", 7)
+
+        # Local recommendation service (python -m lunchgenie.cli serve)
+        self.service_host = os.getenv("SERVICE_HOST", "127.0.0.1")
+        self.service_port = _env_int("SERVICE_PORT", 8765)
+
+        # Ranking weights (see ranking.py); the defaults rank by rating alone
+        self.ranking_rating_weight = _env_float("RANKING_RATING_WEIGHT", 1.0)
+        self.ranking_distance_weight = _env_float("RANKING_DISTANCE_WEIGHT", 0.0)
+        self.ranking_cuisine_weight = _env_float("RANKING_CUISINE_WEIGHT", 0.0)
+        self.ranking_prior_count = _env_float("RANKING_PRIOR_COUNT", 0.0)
+        self.ranking_prior_mean = _env_float("RANKING_PRIOR_MEAN", 3.5)
+        self.ranking_distance_scale_m = _env_float("RANKING_DISTANCE_SCALE_M", 1000.0)
+
+        # Incremental analysis: per-review verdicts stored per restaurant, so only new reviews
+        # are sent to the LLM (stored in the analysis cache file)
+        self.analysis_incremental = _env_bool("ANALYSIS_INCREMENTAL", False)
+        self.review_verdict_ttl = _env_float("REVIEW_VERDICT_TTL", 30 * 86400)
+
+        # Prompt compaction: per-restaurant review token budget (0 = no sentence extraction)
+        # and the shingle similarity at which a review counts as a near-duplicate (0 = keep all)
+        self.analysis_prompt_token_budget = _env_int("ANALYSIS_PROMPT_TOKEN_BUDGET", 1500)
+        self.analysis_dedup_threshold = _env_float("ANALYSIS_DEDUP_THRESHOLD", 0.8)
+
+        # Metrics export after CLI runs: 'none', 'json' (log lines) or 'prometheus' (text format)
+        self.metrics_exporter = os.getenv("METRICS_EXPORTER", "none")
+        self.metrics_path = os.getenv("METRICS_PATH") or None
 
         # Application environment (default: development)
         self.app_env = os.getenv("APP_ENV", "development")
@@ -0,0 +1,96 @@
+"""
+Time budgets for LunchGenie requests.
+A Deadline is created once per recommendation and passed down to every stage, which derives
+each upstream call's timeout from the time remaining instead of a fixed per-call value.
+hedged() re-issues a slow idempotent call and takes whichever answer arrives first.
+
+Usage:
+    from lunchgenie.deadline import Deadline, timeout_for
+
+    deadline = Deadline.coerce(5.0)           # 5 seconds from now (None = no deadline)
+    http.get(url, timeout=timeout_for(deadline, 8))
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Optional
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def coerce(cls, value) -> Optional["Deadline"]:
+        """
+        None (or a budget <= 0) means no deadline; a number is seconds from now.
+        """
+        if value is None or isinstance(value, Deadline):
+            return value
+        value = float(value)
+        return cls(value) if value > 0 else None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, default: float) -> float:
+        """
+        Timeout for one call: default, capped by the time remaining.
+        Raises DeadlineExceeded when no time is left.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.seconds:.1f}s exceeded")
+        return min(default, remaining)
+
+def timeout_for(deadline: Optional[Deadline], default: float) -> float:
+    """default without a deadline, else default capped by the time remaining."""
+    return default if deadline is None else deadline.timeout(default)
+
+def remaining(deadline: Optional[Deadline]) -> Optional[float]:
+    """Seconds left, or None without a deadline (for wait(timeout=...))."""
+    return None if deadline is None else deadline.remaining()
+
+def _start(fn: Callable[[], Any]) -> Future:
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn())
+        except BaseException as err:
+            future.set_exception(err)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def hedged(fn: Callable[[], Any], hedge_after: float, deadline: Optional[Deadline] = None) -> Any:
+    """
+    Calls fn(); if it has not returned after hedge_after seconds (and there is time left),
+    starts a second identical call and returns the first result. fn must be idempotent.
+    The slower call is abandoned, not cancelled. hedge_after <= 0 calls fn() directly.
+    Raises DeadlineExceeded when neither call finishes before the deadline.
+    """
+    if hedge_after <= 0:
+        return fn()
+    first = _start(fn)
+    done, _ = wait([first], timeout=hedge_after if deadline is None else min(hedge_after, deadline.remaining()))
+    if done:
+        return first.result()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded(f"Deadline of {deadline.seconds:.1f}s exceeded")
+    futures = [first, _start(fn)]
+    while futures:
+        done, _ = wait(futures, timeout=remaining(deadline), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded(f"Deadline of {deadline.seconds:.1f}s exceeded")
+        for future in done:
+            futures.remove(future)
+            if future.exception() is None or not futures:
+                return future.result()
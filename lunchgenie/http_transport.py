@@ -0,0 +1,193 @@
+"""
+Shared HTTP transport for LunchGenie.
+One pooled requests.Session for all provider plugins and the review fetcher: per-host keep-alive
+connection pools, gzip, retries with exponential backoff that honour Retry-After (but never wait
+past the caller's deadline), and per-host stats.
+Requests to known upstreams (Yelp, Google) also go through the shared rate limiter and circuit
+breaker (see rate_limiter.py); their 429 answers are retried through the limiter, so the shared
+bucket pauses for Retry-After before the retry.
+
+Usage:
+    from lunchgenie.http_transport import get_transport
+
+    http = get_transport(config)
+    resp = http.get(url, params=params, timeout=7, deadline=deadline)  # deadline is optional
+    print(http.stats())
+"""
+
+import threading
+import time
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+from lunchgenie.deadline import timeout_for
+from lunchgenie.metrics import metrics
+from lunchgenie.rate_limiter import get_rate_limiter, parse_retry_after
+
+# Answers retried by HttpTransport.get()
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+class HttpTransport:
+    def __init__(self,
+                 max_retries: int = 2,
+                 backoff_factor: float = 0.5,
+                 pool_maxsize: int = 16,
+                 pool_connections: int = 8,
+                 limiter=None,
+                 upstreams: Dict[str, str] = None):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self.pool_connections = pool_connections
+        self.limiter = limiter
+        # host -> upstream name used by the rate limiter
+        self.upstreams = dict(upstreams or {})
+        self._session = None
+        self._stats = {}
+        # Connection errors and timeouts worth retrying, set once requests is imported
+        self._retry_errors = ()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The pooled requests.Session, built (and requests imported) on first use.
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._retry_errors = (requests.ConnectionError, requests.Timeout)
+        # pool_connections = number of hosts kept, pool_maxsize = keep-alive connections per host.
+        # No retries in urllib3: its Retry-After sleeps know nothing of the deadline, so get() retries.
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, max_retries=0)
+        session = requests.Session()
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get(self, url: str, deadline=None, **kwargs):
+        """
+        requests.get() over the pooled session, recording per-host request count and latency.
+        With a deadline (deadline.py), the timeout and any rate limit wait are capped by the
+        time remaining, and DeadlineExceeded is raised when none is left. Requests cut short
+        by the deadline do not count towards the upstream's circuit breaker.
+        Raises RateLimitError/CircuitOpenError (rate_limiter.py) when the upstream is throttled
+        or down.
+        429/5xx answers, connection errors and timeouts are retried (up to max_retries times) after
+        an exponential backoff or the answer's Retry-After. For a 429 from a rate-limited upstream
+        the limiter, which every process shares, does the waiting. A retry whose wait would outlast
+        the deadline is not made: the last answer is returned (or its error raised) instead.
+        """
+        host = urlparse(url).netloc
+        upstream = self.upstreams.get(host) if self.limiter is not None else None
+        timeout = kwargs.pop("timeout", None)
+        for attempt in range(self.max_retries + 1):
+            if deadline is not None:
+                kwargs["timeout"] = timeout_for(deadline, timeout or 30)
+            elif timeout is not None:
+                kwargs["timeout"] = timeout
+            try:
+                resp = self._get_once(url, host, upstream, deadline, kwargs)
+            except self._retry_errors:
+                delay = None if attempt == self.max_retries else self._retry_delay(attempt, None, deadline)
+                if delay is None:
+                    raise
+                metrics.inc("http_retries_total", host=host, status="error")
+                time.sleep(delay)
+                continue
+            if resp.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                return resp
+            if upstream and resp.status_code == 429:
+                delay = 0.0  # acquire() waits out the Retry-After reported to the limiter
+            else:
+                delay = self._retry_delay(attempt, resp.headers.get("Retry-After"), deadline)
+                if delay is None:
+                    return resp
+            metrics.inc("http_retries_total", host=host, status=str(resp.status_code))
+            resp.close()
+            time.sleep(delay)
+        return resp
+
+    def _retry_delay(self, attempt: int, retry_after, deadline):
+        """
+        Seconds to wait before the next attempt: Retry-After when given, exponential backoff
+        otherwise. None when the wait would not leave any of the deadline for the retry.
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff_factor * (2 ** attempt)
+        if deadline is not None and delay >= deadline.remaining():
+            return None
+        return delay
+
+    def _get_once(self, url: str, host: str, upstream, deadline, kwargs):
+        if upstream:
+            self.limiter.acquire(upstream, max_wait=None if deadline is None else deadline.remaining())
+        start = time.perf_counter()
+        status = "error"
+        retry_after = None
+        try:
+            resp = self.session.get(url, **kwargs)
+            status = str(resp.status_code)
+            retry_after = resp.headers.get("Retry-After")
+            return resp
+        finally:
+            elapsed = time.perf_counter() - start
+            self._record(host, elapsed, status == "error" or int(status) >= 400)
+            metrics.inc("http_requests_total", host=host, status=status)
+            metrics.observe("http_request_seconds", elapsed, host=host)
+            if upstream and (status != "error" or deadline is None or not deadline.expired()):
+                self.limiter.report(upstream, None if status == "error" else int(status), retry_after)
+
+    def _record(self, host: str, elapsed: float, error: bool):
+        with self._lock:
+            s = self._stats.setdefault(host, {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            s["requests"] += 1
+            s["errors"] += int(error)
+            s["total_seconds"] += elapsed
+            s["max_seconds"] = max(s["max_seconds"], elapsed)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns per-host request/error counts and mean/max latency in seconds."""
+        with self._lock:
+            return {
+                host: dict(s, mean_seconds=s["total_seconds"] / s["requests"] if s["requests"] else 0.0)
+                for host, s in self._stats.items()
+            }
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport(config=None) -> HttpTransport:
+    """
+    Returns the process-wide HttpTransport, creating it from config on first use.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            if config is None:
+                _transport = HttpTransport()
+            else:
+                _transport = HttpTransport(
+                    max_retries=config.http_max_retries,
+                    backoff_factor=config.http_backoff_factor,
+                    pool_maxsize=config.http_pool_maxsize,
+                    limiter=get_rate_limiter(config),
+                    upstreams={
+                        urlparse(config.yelp_api_base_url).netloc: "yelp",
+                        urlparse(config.google_places_api_base_url).netloc: "google",
+                    }
+                )
+        return _transport
@@ -4,18 +4,20 @@ Handles OpenAI/LangChain integration.
 """
 
 from lunchgenie.config import Config, ConfigError
-from langchain_openai import ChatOpenAI
 
 def test_llm():
     """
     Sanity check for LangChain + OpenAI configuration.
     Runs a 'Hello, LunchGenie!' prompt via ChatOpenAI.
     """
+    from langchain_openai import ChatOpenAI  # heavy import, deferred until an LLM is needed
+
     cfg = Config()
     llm = ChatOpenAI(
         openai_api_key=cfg.openai_api_key,
         model_name="gpt-3.5-turbo",
         temperature=0.2,
+        openai_api_base=cfg.openai_base_url,
     )
     prompt = "Hello, LunchGenie! Reply with 'Hello, world!' if you are working."
     response = llm.invoke(prompt)
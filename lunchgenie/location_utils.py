@@ -1,8 +1,11 @@
 """
 Location resolution utilities for LunchGenie.
-Decides location/latitude/longitude to use given user input and config.
+Decides location/latitude/longitude to use given user input and config,
+and provides geo helpers (haversine distance, geohash cells) shared by providers and caches.
 """
 
+import math
+
 def resolve_location(config, location, latitude, longitude):
     """
     Prefer explicit lat/lon, then config defaults if not overridden.
@@ -21,3 +24,66 @@ def resolve_location(config, location, latitude, longitude):
             except Exception:
                 pass
     return use_loc, use_lat, use_lon
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in meters between two points.
+    """
+    R = 6371000  # meters
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = (math.sin(d_phi / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return R * c
+
+def geohash_encode(latitude, longitude, precision=7):
+    """
+    Encode a point as a geohash string; nearby points share a prefix.
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+def geohash_bounds(geohash):
+    """
+    Returns (min_lat, min_lon, max_lat, max_lon) of a geohash cell.
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for ch in geohash:
+        value = _GEOHASH_BASE32.index(ch)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+def geohash_cell(geohash):
+    """
+    Returns (center_lat, center_lon, half_diagonal_m) of a geohash cell.
+    """
+    min_lat, min_lon, max_lat, max_lon = geohash_bounds(geohash)
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    return center_lat, center_lon, haversine_m(center_lat, center_lon, max_lat, max_lon)
@@ -0,0 +1,150 @@
+"""
+Instrumentation for LunchGenie: counters and per-stage timing spans, with pluggable exporters.
+
+Usage:
+    from lunchgenie.metrics import metrics
+
+    with metrics.span("provider_search", provider="google"):
+        ...
+    metrics.inc("llm_calls_total", model="gpt-3.5-turbo")
+
+    print(PrometheusExporter().render(metrics))   # Prometheus text exposition format
+    JsonLogExporter().export(metrics)             # one JSON log line per metric
+
+Stage timings are recorded as the `stage_seconds` summary, labelled by stage.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Metrics:
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._timings: Dict[Tuple[str, Labels], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Adds value to a counter."""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Records one duration in a timing summary (count, sum, max)."""
+        key = (name, _labels(labels))
+        with self._lock:
+            t = self._timings.setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+            t["count"] += 1
+            t["sum"] += seconds
+            t["max"] = max(t["max"], seconds)
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """
+        Times the enclosed block as stage_seconds{stage=...}; exceptions also count
+        towards errors_total{stage=...} and are re-raised.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("errors_total", stage=stage)
+            raise
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def snapshot(self):
+        """Returns (counters, timings) copies keyed by (name, labels)."""
+        with self._lock:
+            return dict(self._counters), {k: dict(v) for k, v in self._timings.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+# Process-wide registry used by all LunchGenie components
+metrics = Metrics()
+
+class JsonLogExporter:
+    """Emits one JSON log line per metric on the 'lunchgenie.metrics' logger."""
+
+    def __init__(self, log=None):
+        self.log = log or logger
+
+    def export(self, registry: Metrics = metrics):
+        counters, timings = registry.snapshot()
+        for (name, labels), value in sorted(counters.items()):
+            self.log.info(json.dumps({"metric": name, "labels": dict(labels), "value": value}))
+        for (name, labels), t in sorted(timings.items()):
+            self.log.info(json.dumps({"metric": name, "labels": dict(labels), **t}))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class PrometheusExporter:
+    """Renders metrics in the Prometheus text exposition format, optionally to a file."""
+
+    def __init__(self, path: str = None, prefix: str = "lunchgenie_"):
+        self.path = path
+        self.prefix = prefix
+
+    @staticmethod
+    def _format_labels(labels: Labels) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+    def render(self, registry: Metrics = metrics) -> str:
+        counters, timings = registry.snapshot()
+        lines = []
+        for name in sorted({n for n, _ in counters}):
+            lines.append(f"# TYPE {self.prefix}{name} counter")
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{self.prefix}{name}{self._format_labels(labels)} {value:g}")
+        for name in sorted({n for n, _ in timings}):
+            lines.append(f"# TYPE {self.prefix}{name} summary")
+            for (n, labels), t in sorted(timings.items()):
+                if n == name:
+                    lines.append(f"{self.prefix}{name}_count{self._format_labels(labels)} {t['count']:g}")
+                    lines.append(f"{self.prefix}{name}_sum{self._format_labels(labels)} {t['sum']:.6f}")
+            lines.append(f"# TYPE {self.prefix}{name}_max gauge")
+            for (n, labels), t in sorted(timings.items()):
+                if n == name:
+                    lines.append(f"{self.prefix}{name}_max{self._format_labels(labels)} {t['max']:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, registry: Metrics = metrics):
+        text = self.render(registry)
+        if self.path:
+            with open(self.path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+        else:
+            logger.info(text)
+
+EXPORTERS = {"json": JsonLogExporter, "prometheus": PrometheusExporter}
+
+def export_metrics(config, registry: Metrics = metrics):
+    """
+    Exports metrics with the exporter selected by METRICS_EXPORTER ('json', 'prometheus' or 'none').
+    """
+    name = (config.metrics_exporter or "none").lower()
+    if name == "none":
+        return
+    if name not in EXPORTERS:
+        logger.warning("Unknown METRICS_EXPORTER %r; metrics not exported", name)
+        return
+    exporter = PrometheusExporter(config.metrics_path) if name == "prometheus" else JsonLogExporter()
+    exporter.export(registry)
@@ -0,0 +1,59 @@
+"""
+Pre-warm job for LunchGenie.
+Runs the full recommendation pipeline (provider search, review fetch, review analysis) for
+the configured sites ahead of the lunch rush, so the caches it fills (search results, reviews,
+analysis verdicts) turn lunchtime queries into cache reads, refreshed in the background.
+
+Sites are batch query specs (see batch.py), read from the PREWARM_SITES JSON-lines file.
+Without one, the default query is warmed: DEFAULT_LATITUDE/DEFAULT_LONGITUDE and the
+`recommend` command's criteria. A site spec must use the same criteria as the lunchtime
+queries it warms, since cache keys include them.
+
+Usage:
+    python -m lunchgenie.cli prewarm                 # once, e.g. from cron at 11:30
+    python -m lunchgenie.cli prewarm --loop          # every PREWARM_INTERVAL seconds
+"""
+
+import logging
+import time
+
+from lunchgenie.batch import load_queries, run_batch
+from lunchgenie.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def load_sites(config, path=None):
+    """
+    Query specs to warm: from path (or PREWARM_SITES), else the default query.
+    """
+    path = path or config.prewarm_sites
+    if path:
+        return load_queries(path)
+    return [{}]
+
+def prewarm(agent, sites, workers=4):
+    """
+    Runs every site query once on agent and returns the batch result records.
+    The agent should be created with background_refresh=False, so stale cache entries are
+    refreshed now rather than left for the lunchtime query.
+    """
+    records = []
+    with metrics.span("prewarm"):
+        for record in run_batch(agent, sites, workers=workers):
+            metrics.inc("prewarm_sites_total", outcome="error" if "error" in record else "ok")
+            if "error" in record:
+                logger.warning("Pre-warm of %s failed: %s", record["query"] or "default site", record["error"])
+            else:
+                logger.info("Pre-warmed %s: %d recommendations", record["query"] or "default site",
+                            len(record["results"]))
+            records.append(record)
+    return sorted(records, key=lambda r: r["index"])
+
+def run_forever(agent, sites, interval, workers=4):
+    """
+    Pre-warms every interval seconds (measured from the start of each run) until interrupted.
+    """
+    while True:
+        started = time.monotonic()
+        prewarm(agent, sites, workers)
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
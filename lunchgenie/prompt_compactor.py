@@ -0,0 +1,174 @@
+"""
+Prompt compaction for review analysis.
+Shrinks a restaurant's review set to a token budget before it is sent to the LLM:
+near-duplicate reviews are dropped (word shingles, Jaccard similarity), and when the
+remaining text is still over budget, the sentences most relevant to safety (scored with
+the pre-screen term lists) are kept, in their original order.
+
+Usage:
+    compactor = PromptCompactor(token_budget=1200, model_name="gpt-3.5-turbo")
+    reviews, stats = compactor.compact(reviews)
+    print(stats["tokens_saved"])
+"""
+
+import re
+import threading
+from typing import Dict, List, Tuple
+
+from lunchgenie.review_prescreen import ReviewPrescreener
+
+SHINGLE_WORDS = 3
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+ELLIPSIS = "..."
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting prompts (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+class TokenCounter:
+    """
+    Counts tokens with the model's tiktoken encoding when it is available, falling back to
+    estimate_tokens (tiktoken not installed, or its encoding files cannot be downloaded).
+    """
+
+    def __init__(self, model_name: str = "gpt-3.5-turbo"):
+        self.model_name = model_name
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if not self._loaded:
+                try:
+                    import tiktoken
+                    self._encoding = tiktoken.encoding_for_model(self.model_name)
+                except Exception:
+                    self._encoding = None
+                self._loaded = True
+
+    def __call__(self, text: str) -> int:
+        if not self._loaded:
+            self._load()
+        if self._encoding is None:
+            return estimate_tokens(text)
+        return len(self._encoding.encode(text))
+
+def _shingles(text: str) -> frozenset:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class PromptCompactor:
+    def __init__(self, token_budget: int = 1200, dedup_threshold: float = 0.8,
+                 model_name: str = "gpt-3.5-turbo", count_tokens=None):
+        self.token_budget = token_budget
+        self.dedup_threshold = dedup_threshold
+        self.count_tokens = count_tokens or TokenCounter(model_name)
+        self._scorer = ReviewPrescreener()
+
+    def deduplicate(self, reviews: List[str]) -> List[str]:
+        """
+        Drops reviews whose word-shingle Jaccard similarity to an earlier kept review
+        reaches dedup_threshold. Review sets are small (<= 10), so pairs are compared exactly.
+        """
+        kept, kept_shingles = [], []
+        for review in reviews:
+            shingles = _shingles(review)
+            if any(_jaccard(shingles, seen) >= self.dedup_threshold for seen in kept_shingles):
+                continue
+            kept.append(review)
+            kept_shingles.append(shingles)
+        return kept
+
+    def _extract(self, reviews: List[str], budget: int) -> Tuple[List[str], int]:
+        """
+        Keeps the highest-scoring sentences (then each review's opening sentence, then the
+        rest in review order) until the budget is used. Returns the reviews rebuilt from the
+        kept sentences and the number of sentences dropped.
+        """
+        candidates = []
+        sentences = [SENTENCE_SPLIT.split(review) for review in reviews]
+        for r, parts in enumerate(sentences):
+            for s, sentence in enumerate(parts):
+                score = self._scorer.score([sentence])
+                candidates.append((-score, s != 0, r, s))
+        candidates.sort()
+
+        kept, used = set(), 0
+        for _, _, r, s in candidates:
+            cost = self.count_tokens(sentences[r][s]) + 1
+            if used + cost <= budget:
+                kept.add((r, s))
+                used += cost
+        if not kept and candidates:
+            # Even the best sentence is over budget: keep a truncated prefix of it
+            _, _, r, s = candidates[0]
+            sentences[r][s] = sentences[r][s][:max(budget, 1) * 4]
+            kept.add((r, s))
+
+        compacted = []
+        for r, parts in enumerate(sentences):
+            # Mark each run of dropped sentences with an ellipsis
+            pieces, gap = [], False
+            for s, sentence in enumerate(parts):
+                if (r, s) not in kept:
+                    gap = True
+                    continue
+                if gap:
+                    pieces.append(ELLIPSIS)
+                pieces.append(sentence)
+                gap = False
+            if pieces:
+                if gap:
+                    pieces.append(ELLIPSIS)
+                compacted.append(" ".join(pieces))
+        return compacted, len(candidates) - len(kept)
+
+    def compact_review(self, review: str, budget: int) -> Tuple[str, Dict[str, int]]:
+        """
+        Compacts a single review to its own token budget (no de-duplication), for prompts
+        that need one answer per review.
+        """
+        normalized = " ".join(review.split())
+        before = self.count_tokens(normalized)
+        dropped = 0
+        if budget > 0 and before > budget:
+            extracted, dropped = self._extract([normalized], budget)
+            normalized = extracted[0] if extracted else ""
+        after = self.count_tokens(normalized)
+        return normalized, {
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": before - after,
+            "duplicates_removed": 0,
+            "sentences_dropped": dropped,
+        }
+
+    def compact(self, reviews: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Returns the compacted reviews and stats for this call: tokens_before, tokens_after,
+        tokens_saved, duplicates_removed and sentences_dropped.
+        """
+        normalized = [" ".join(r.split()) for r in reviews]
+        normalized = [r for r in normalized if r]
+        before = sum(self.count_tokens(r) for r in normalized)
+        compacted = self.deduplicate(normalized) if self.dedup_threshold > 0 else normalized
+        duplicates = len(normalized) - len(compacted)
+        dropped = 0
+        if self.token_budget > 0 and sum(self.count_tokens(r) for r in compacted) > self.token_budget:
+            compacted, dropped = self._extract(compacted, self.token_budget)
+        after = sum(self.count_tokens(r) for r in compacted)
+        return compacted, {
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": before - after,
+            "duplicates_removed": duplicates,
+            "sentences_dropped": dropped,
+        }
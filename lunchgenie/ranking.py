@@ -0,0 +1,166 @@
+"""
+Multi-criteria ranking of restaurant candidates.
+Scores are computed with NumPy over the whole candidate pool as a weighted sum of:
+- a Bayesian-adjusted rating: (prior_count * prior_mean + review_count * rating) / (prior_count + review_count),
+  so a 5.0 from three reviews does not outrank a 4.7 from two thousand,
+- a distance decay exp(-distance_m / distance_scale_m),
+- a cuisine match (1 when a requested cuisine appears in the categories or name).
+Top-k selection uses np.argpartition, so only the selected candidates are sorted.
+
+With the default weights (rating only, no prior) the order is exactly the stable
+rating order the agent used before, and only the ratings are read from the candidates.
+
+Usage:
+    ranker = Ranker.from_config(config)
+    best = ranker.top_k(candidates, 5, cuisines=["thai", "indian"])
+    for entry in ranker.iter_ranked(candidates, cuisines=["thai"]):
+        ...
+"""
+
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+def _float(value, default: float) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+def _floats(candidates: Sequence[Dict[str, Any]], field: str, default: float) -> np.ndarray:
+    values = [c.get(field) for c in candidates]
+    try:
+        # Plain numbers convert in C; only a column holding None or junk takes the per-value path
+        return np.fromiter(values, dtype=np.float64, count=len(values))
+    except (TypeError, ValueError):
+        return np.fromiter((_float(v, default) for v in values), dtype=np.float64, count=len(values))
+
+def cuisine_match(candidates: Sequence[Dict[str, Any]], cuisines: Sequence[str]) -> np.ndarray:
+    match = np.zeros(len(candidates), dtype=np.float64)
+    wanted = [c.strip().lower() for c in cuisines if c and c.strip()]
+    if not wanted or not len(candidates):
+        return match
+    try:
+        texts = [c.get("name", "") + " " + " ".join(c.get("categories") or ()) for c in candidates]
+    except TypeError:  # a missing name or non-string categories
+        texts = [f"{c.get('name') or ''} {' '.join(map(str, c.get('categories') or ()))}" for c in candidates]
+    # One substring scan over all names/categories; match offsets map back to candidates
+    ends = np.cumsum(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)) + 1)
+    text = "\n".join(texts).lower()
+    if len(text) != ends[-1] - 1:
+        # Lower-casing changed some lengths (e.g. "İ"), so the offsets need per-text lengths
+        texts = [t.lower() for t in texts]
+        ends = np.cumsum(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)) + 1)
+        text = "\n".join(texts)
+    starts = []
+    for word in wanted:
+        start = text.find(word)
+        while start != -1:
+            starts.append(start)
+            start = text.find(word, start + 1)
+    match[np.searchsorted(ends, np.asarray(starts, dtype=np.int64), side="right")] = 1.0
+    return match
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first. Ties keep input order (like a stable sort),
+    including ties at the k-th place.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order][:k]
+
+class Ranker:
+    def __init__(self,
+                 rating_weight: float = 1.0,
+                 distance_weight: float = 0.0,
+                 cuisine_weight: float = 0.0,
+                 prior_count: float = 0.0,
+                 prior_mean: float = 3.5,
+                 distance_scale_m: float = 1000.0):
+        self.rating_weight = rating_weight
+        self.distance_weight = distance_weight
+        self.cuisine_weight = cuisine_weight
+        self.prior_count = prior_count
+        self.prior_mean = prior_mean
+        self.distance_scale_m = distance_scale_m
+
+    @classmethod
+    def from_config(cls, config) -> "Ranker":
+        return cls(
+            rating_weight=config.ranking_rating_weight,
+            distance_weight=config.ranking_distance_weight,
+            cuisine_weight=config.ranking_cuisine_weight,
+            prior_count=config.ranking_prior_count,
+            prior_mean=config.ranking_prior_mean,
+            distance_scale_m=config.ranking_distance_scale_m
+        )
+
+    def score_arrays(self,
+                     rating: np.ndarray,
+                     review_count: np.ndarray = None,
+                     distance_m: np.ndarray = None,
+                     cuisine_match: np.ndarray = None) -> np.ndarray:
+        """
+        Scores candidates given as arrays; rating is on the 0-5 scale.
+        """
+        scores = np.zeros(len(rating), dtype=np.float64)
+        if self.rating_weight:
+            adjusted = rating
+            if self.prior_count > 0 and review_count is not None:
+                counts = np.maximum(review_count, 0)
+                adjusted = (self.prior_count * self.prior_mean + counts * rating) / (self.prior_count + counts)
+            scores += self.rating_weight * adjusted / 5.0
+        if self.distance_weight and distance_m is not None:
+            scores += self.distance_weight * np.exp(-np.maximum(distance_m, 0) / max(self.distance_scale_m, 1.0))
+        if self.cuisine_weight and cuisine_match is not None:
+            scores += self.cuisine_weight * cuisine_match
+        return scores
+
+    @property
+    def rating_only(self) -> bool:
+        """True for the default weights, where the score is just the rating."""
+        return not self.distance_weight and not self.cuisine_weight and self.prior_count <= 0
+
+    def score(self, candidates: Sequence[Dict[str, Any]], cuisines: Sequence[str] = ()) -> np.ndarray:
+        """
+        Scores candidate dicts (rating, review_count, distance_m, categories, name).
+        Only the fields the weights use are read.
+        """
+        if self.rating_only:
+            return _floats(candidates, "rating", 0.0) * (self.rating_weight / 5.0)
+        return self.score_arrays(
+            _floats(candidates, "rating", 0.0) if self.rating_weight else np.zeros(len(candidates)),
+            _floats(candidates, "review_count", 0.0) if self.rating_weight and self.prior_count > 0 else None,
+            _floats(candidates, "distance_m", 0.0) if self.distance_weight else None,
+            cuisine_match(candidates, cuisines) if self.cuisine_weight and cuisines else None
+        )
+
+    def top_k(self, candidates: Sequence[Dict[str, Any]], k: int, cuisines: Sequence[str] = ()) -> List[Dict[str, Any]]:
+        """Returns the k best-scoring candidates, best first."""
+        return [candidates[i] for i in top_k_indices(self.score(candidates, cuisines), k)]
+
+    def iter_ranked(self, candidates: Sequence[Dict[str, Any]], cuisines: Sequence[str] = (),
+                    first: int = 8) -> Iterator[Dict[str, Any]]:
+        """
+        Yields candidates best first. Scores are computed once; the ranking is extended
+        with partial selections of doubling size, so consumers that stop early never pay
+        for sorting the whole pool.
+        """
+        scores = self.score(candidates, cuisines)
+        done, size = 0, max(first, 1)
+        while done < len(candidates):
+            order = top_k_indices(scores, size)
+            for i in order[done:]:
+                yield candidates[i]
+            done = len(order)
+            size *= 2
@@ -0,0 +1,209 @@
+"""
+Cross-process rate limiting and circuit breaking for LunchGenie's upstreams (Yelp, Google, OpenAI).
+
+Each upstream has a token bucket (rate per second, burst) whose state lives in SQLite, so every
+process using the same file shares one budget. A 429 answer empties the bucket and blocks the
+upstream until its Retry-After has passed; consecutive failures (5xx, connection errors) open a
+circuit breaker that fails fast for a cool-down period, after which calls are let through again
+and the first success closes it.
+
+Usage:
+    from lunchgenie.rate_limiter import RateLimiter
+
+    limiter = RateLimiter(".lunchgenie_cache.sqlite3", rates={"yelp": (5, 10)})
+    limiter.acquire("yelp")            # waits for a token; raises CircuitOpenError when open
+    limiter.report("yelp", 429, retry_after=2)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from lunchgenie.metrics import metrics
+
+class RateLimitError(Exception):
+    pass
+
+class CircuitOpenError(RateLimitError):
+    pass
+
+def parse_retry_after(value) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header value (delta-seconds or an HTTP date).
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    def __init__(self,
+                 path: str = ":memory:",
+                 rates: Dict[str, Tuple[float, float]] = None,
+                 failure_threshold: int = 5,
+                 cooldown_seconds: float = 30.0,
+                 max_wait_seconds: float = 30.0,
+                 default_retry_after: float = 5.0):
+        self.path = path
+        self.rates = dict(rates or {})
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.default_retry_after = default_retry_after
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "upstream TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                "blocked_until REAL NOT NULL DEFAULT 0, failures INTEGER NOT NULL DEFAULT 0, "
+                "open_until REAL NOT NULL DEFAULT 0)"
+            )
+
+    @classmethod
+    def from_config(cls, config) -> "RateLimiter":
+        burst = config.rate_limit_burst
+        rates = {
+            "yelp": (config.yelp_rate_limit, burst),
+            "google": (config.google_rate_limit, burst),
+            "openai": (config.openai_rate_limit, burst),
+        }
+        return cls(
+            config.rate_limit_path or ":memory:",
+            rates={name: rate for name, rate in rates.items() if rate[0] > 0},
+            failure_threshold=config.circuit_breaker_threshold,
+            cooldown_seconds=config.circuit_breaker_cooldown,
+            max_wait_seconds=config.rate_limit_max_wait
+        )
+
+    def _transaction(self, upstream: str, update):
+        """
+        Runs update(state, now) -> result on the upstream's row inside one write transaction,
+        so concurrent processes see a consistent bucket. state is a mutable dict of the row.
+        """
+        rate, burst = self.rates.get(upstream, (0.0, 1.0))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at, blocked_until, failures, open_until "
+                    "FROM rate_limits WHERE upstream = ?", (upstream,)
+                ).fetchone()
+                if row is None:
+                    state = {"tokens": burst, "blocked_until": 0.0, "failures": 0, "open_until": 0.0}
+                else:
+                    tokens, updated_at, blocked_until, failures, open_until = row
+                    state = {
+                        "tokens": min(burst, tokens + max(0.0, now - updated_at) * rate),
+                        "blocked_until": blocked_until, "failures": failures, "open_until": open_until,
+                    }
+                result = update(state, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits "
+                    "(upstream, tokens, updated_at, blocked_until, failures, open_until) VALUES (?, ?, ?, ?, ?, ?)",
+                    (upstream, state["tokens"], now, state["blocked_until"], state["failures"], state["open_until"])
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def acquire(self, upstream: str, max_wait: float = None):
+        """
+        Takes one token for upstream, waiting as needed (at most max_wait_seconds, or
+        max_wait if shorter). Raises CircuitOpenError while the upstream's circuit is open,
+        and RateLimitError when no token becomes available in time. Upstreams without a
+        rate only go through the circuit breaker.
+        """
+        rate, _ = self.rates.get(upstream, (0.0, 1.0))
+        max_wait = self.max_wait_seconds if max_wait is None else min(max_wait, self.max_wait_seconds)
+        deadline = time.monotonic() + max_wait
+        waited = 0.0
+
+        def take(state, now):
+            if state["open_until"] > now:
+                return "open", state["open_until"] - now
+            if state["blocked_until"] > now:
+                return "wait", state["blocked_until"] - now
+            if rate <= 0:
+                return "ok", 0.0
+            if state["tokens"] >= 1:
+                state["tokens"] -= 1
+                return "ok", 0.0
+            return "wait", (1 - state["tokens"]) / rate
+
+        while True:
+            outcome, delay = self._transaction(upstream, take)
+            if outcome == "ok":
+                if waited:
+                    metrics.observe("rate_limit_wait_seconds", waited, upstream=upstream)
+                return
+            if outcome == "open":
+                metrics.inc("circuit_open_rejections_total", upstream=upstream)
+                raise CircuitOpenError(f"{upstream} is unavailable (circuit open for another {delay:.1f}s)")
+            remaining = deadline - time.monotonic()
+            if delay > remaining:
+                metrics.inc("errors_total", stage="rate_limit", upstream=upstream)
+                raise RateLimitError(f"{upstream} rate limit: no request slot within {max_wait:.0f}s")
+            time.sleep(delay)
+            waited += delay
+
+    def report(self, upstream: str, status, retry_after=None):
+        """
+        Records the outcome of a call: an HTTP status code, or None for a connection error.
+        429 blocks the upstream for Retry-After (or default_retry_after) seconds; 5xx and
+        errors count towards the circuit breaker; any other answer closes it.
+        """
+        delay = parse_retry_after(retry_after)
+
+        def record(state, now):
+            if status == 429:
+                state["tokens"] = 0.0
+                state["blocked_until"] = max(state["blocked_until"], now + (delay if delay is not None else self.default_retry_after))
+                metrics.inc("rate_limited_total", upstream=upstream)
+            elif status is None or status >= 500:
+                state["failures"] += 1
+                if state["failures"] >= self.failure_threshold:
+                    if state["open_until"] <= now:
+                        metrics.inc("circuit_opened_total", upstream=upstream)
+                    state["open_until"] = now + self.cooldown_seconds
+            else:
+                state["failures"] = 0
+                state["open_until"] = 0.0
+
+        self._transaction(upstream, record)
+
+    def state(self, upstream: str) -> Dict[str, float]:
+        """Returns the upstream's current bucket and breaker state."""
+        return self._transaction(upstream, lambda state, now: dict(state))
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter(config=None) -> RateLimiter:
+    """
+    Returns the process-wide RateLimiter, creating it from config on first use.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter() if config is None else RateLimiter.from_config(config)
+        return _limiter
@@ -1,5 +1,33 @@
+import importlib
 from abc import ABC, abstractmethod
 
+# RESTAURANT_PROVIDER -> (module, class); only the selected provider (and its plugin) is imported
+PROVIDERS = {
+    "yelp": ("lunchgenie.restaurant_provider.yelp_provider", "YelpProvider"),
+    "google": ("lunchgenie.restaurant_provider.google_provider", "GoogleProvider"),
+    "multi": ("lunchgenie.restaurant_provider.multi_provider", "MultiProvider"),
+    "catalog": ("lunchgenie.restaurant_provider.catalog_provider", "CatalogProvider"),
+}
+
+def load_provider(name, config):
+    """
+    Imports and instantiates the RestaurantProvider registered under name.
+    """
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown RESTAURANT_PROVIDER: {name}")
+    module_name, class_name = PROVIDERS[name]
+    return getattr(importlib.import_module(module_name), class_name)(config)
+
+class SearchResults(list):
+    """
+    A provider's results. partial is True when a deadline cut the search short and late
+    results were dropped, so the list must not be cached as the answer to the search.
+    """
+
+    def __init__(self, results=(), partial=False):
+        super().__init__(results)
+        self.partial = partial
+
 class RestaurantProvider(ABC):
     @abstractmethod
     def search_restaurants(
@@ -8,9 +36,12 @@ class RestaurantProvider(ABC):
         location: str,
         criteria: dict,
         latitude: float = None,
-        longitude: float = None
+        longitude: float = None,
+        deadline=None
     ):
         """
         Returns a list of restaurant dicts based on searching with given parameters.
+        deadline (lunchgenie.deadline.Deadline, optional) bounds the whole search; providers
+        raise DeadlineExceeded when it passes first.
         """
         pass
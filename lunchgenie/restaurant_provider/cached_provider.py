@@ -0,0 +1,103 @@
+import math
+
+from lunchgenie.cache_store import BackgroundRefresher, CacheStore
+from lunchgenie.location_utils import geohash_encode, geohash_cell, haversine_m
+from lunchgenie.restaurant_provider import RestaurantProvider
+
+RADIUS_BUCKET_M = 250
+RATING_BUCKET = 0.5
+
+class CachedProvider(RestaurantProvider):
+    """
+    Caching wrapper around any RestaurantProvider.
+
+    Searches are keyed by a geohash cell of the search point and normalized criteria
+    (sorted categories, radius rounded up to RADIUS_BUCKET_M, rating floored to RATING_BUCKET),
+    so nearby users share one upstream query. The upstream is searched from the cell center
+    with the radius widened by the cell's half diagonal; exact distance and rating filters are
+    then re-applied locally for each caller.
+    Entries older than ttl_seconds are served stale for up to stale_ttl_seconds while a
+    background refresh runs; with background_refresh=False (pre-warming) they are refreshed
+    before returning. Results cut short by a deadline (flagged partial, or returned once the
+    deadline had passed) are returned but never cached.
+    """
+
+    def __init__(self, provider, store: CacheStore, name: str = "",
+                 ttl_seconds: float = 3600, stale_ttl_seconds: float = 86400, precision: int = 7,
+                 background_refresh: bool = True):
+        self.provider = provider
+        self.store = store
+        self.name = name or type(provider).__name__
+        self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.precision = precision
+        self.background_refresh = background_refresh
+        self._refresher = BackgroundRefresher()
+
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
+        criteria = criteria or {}
+        radius = criteria.get("radius", 1200)
+        min_rating = criteria.get("min_rating", 0) or 0
+        categories = sorted(c.strip().lower() for c in criteria.get("categories", "").split(",") if c.strip())
+        radius_bucket = int(math.ceil(radius / RADIUS_BUCKET_M) * RADIUS_BUCKET_M)
+        rating_bucket = math.floor(min_rating / RATING_BUCKET) * RATING_BUCKET
+
+        if latitude is not None and longitude is not None:
+            cell = geohash_encode(float(latitude), float(longitude), self.precision)
+            center_lat, center_lon, half_diagonal = geohash_cell(cell)
+            upstream = dict(location="", latitude=center_lat, longitude=center_lon)
+            upstream_radius = radius_bucket + int(math.ceil(half_diagonal))
+            place_key = f"geo:{cell}"
+        else:
+            upstream = dict(location=location, latitude=None, longitude=None)
+            upstream_radius = radius_bucket
+            place_key = f"loc:{(location or '').strip().lower()}"
+
+        upstream_criteria = dict(criteria, categories=",".join(categories),
+                                 radius=upstream_radius, min_rating=rating_bucket)
+        key = "|".join([self.name, place_key, ",".join(categories), str(radius_bucket),
+                        str(rating_bucket), (query or "").strip().lower()])
+
+        def fetch(deadline=None):
+            results = self.provider.search_restaurants(query=query, criteria=upstream_criteria,
+                                                       deadline=deadline, **upstream)
+            # Late pages, details or providers were dropped: caching the rest would serve
+            # the truncated list as fresh to every later search of the cell
+            if not getattr(results, "partial", False) and (deadline is None or not deadline.expired()):
+                self.store.set(key, results)
+            return results
+
+        cached = self.store.get_with_age(key)
+        if cached is None:
+            results = fetch(deadline)
+        else:
+            results, age = cached
+            if age > self.ttl_seconds:
+                if self.background_refresh:
+                    # The refresh is not bound by this caller's deadline
+                    self._refresher.submit(key, fetch)
+                else:
+                    results = fetch(deadline)
+        return self._filter(results, latitude, longitude, radius, min_rating)
+
+    @staticmethod
+    def _filter(results, latitude, longitude, radius, min_rating):
+        """
+        Re-applies the caller's exact distance and rating filters to cached results. Without a
+        search point, the provider's distance_m (from the searched location) is used.
+        """
+        filtered = []
+        for entry in results or []:
+            if (entry.get("rating") or 0) < min_rating:
+                continue
+            entry = dict(entry)
+            if latitude is not None and longitude is not None and entry.get("latitude") is not None:
+                entry["distance_m"] = int(haversine_m(float(latitude), float(longitude),
+                                                      entry["latitude"], entry["longitude"]))
+                if entry["distance_m"] > radius:
+                    continue
+            elif entry.get("distance_m") is not None and entry["distance_m"] > radius:
+                # Text-location searches are cached with the radius rounded up to RADIUS_BUCKET_M
+                continue
+            filtered.append(entry)
+        return filtered
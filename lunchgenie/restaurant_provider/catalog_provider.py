@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+from lunchgenie.catalog import RestaurantCatalog
+from lunchgenie.deadline import DeadlineExceeded, remaining
+from lunchgenie.metrics import metrics
+from lunchgenie.restaurant_provider import RestaurantProvider, load_provider
+from lunchgenie.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class CatalogProvider(RestaurantProvider):
+    """
+    Answers searches from the offline catalog (see catalog.py), using the network only to
+    refresh it.
+
+    A search inside a region the catalog already covers (same or broader cuisines, lower or
+    equal rating floor, refreshed within CATALOG_MAX_AGE) runs locally. Otherwise the
+    CATALOG_SOURCE provider is searched, its results are added to the catalog with the
+    search region, and the snapshot is saved for other processes. Searches by text location
+    (no coordinates) always go to the source provider.
+
+    Refreshes run outside the catalog lock, so covered searches are never held up by one,
+    and concurrent searches of the same uncovered region share a single refresh.
+    """
+
+    def __init__(self, config, source=None, path: str = None, max_age_seconds: float = None):
+        if source is None:
+            name = config.catalog_source.strip().lower()
+            if name == "catalog":
+                raise ValueError("CATALOG_SOURCE cannot be 'catalog'")
+            source = load_provider(name, config)
+            self.source_name = name
+        else:
+            self.source_name = getattr(source, "name", type(source).__name__)
+        self.source = source
+        self.path = path if path is not None else config.catalog_path
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else config.catalog_max_age
+        # _lock guards self.catalog; _save_lock keeps snapshot writes in order
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._refreshes = SingleFlight()
+        self._loaded_mtime = None
+        self.catalog = RestaurantCatalog.from_entries([])
+        self._reload()
+
+    def _meta_mtime(self):
+        try:
+            return os.path.getmtime(os.path.join(self.path, "meta.json"))
+        except OSError:
+            return None
+
+    def _reload(self):
+        """Picks up a snapshot written by another process since the last load."""
+        if not self.path:
+            return
+        mtime = self._meta_mtime()
+        if mtime is not None and mtime != self._loaded_mtime:
+            self.catalog = RestaurantCatalog.load(self.path)
+            self._loaded_mtime = mtime
+
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
+        criteria = criteria or {}
+        if latitude is None or longitude is None:
+            return self.source.search_restaurants(query=query, location=location, criteria=criteria,
+                                                  deadline=deadline)
+        radius = criteria.get("radius", 1200)
+        min_rating = criteria.get("min_rating", 0)
+        cuisines = [c.strip().lower() for c in (criteria.get("categories") or "").split(",") if c.strip()]
+
+        with self._lock:
+            self._reload()
+            covered = self.catalog.covers(latitude, longitude, radius, cuisines, min_rating, self.max_age_seconds)
+        if not covered:
+            region = (round(latitude, 5), round(longitude, 5), radius, tuple(sorted(cuisines)), min_rating)
+            self._refresh_once(region, query, criteria, latitude, longitude, deadline)
+        with self._lock:
+            catalog = self.catalog
+        with metrics.span("catalog_query"):
+            results = catalog.query(latitude, longitude, radius, min_rating, cuisines)
+        for entry in results:
+            entry.pop("cuisine_tags", None)
+        return results
+
+    def _refresh_once(self, region, query, criteria, latitude, longitude, deadline=None):
+        """Runs refresh() unless one for the same region is in flight, then waits for it."""
+        future, owner = self._refreshes.claim(region)
+        if not owner:
+            try:
+                return future.result(timeout=remaining(deadline))
+            except TimeoutError:
+                raise DeadlineExceeded(f"Catalog refresh did not finish within {deadline.seconds:.1f}s")
+        try:
+            self.refresh(query, criteria, latitude, longitude, deadline)
+        except BaseException as err:
+            self._refreshes.fail(region, err)
+            raise
+        self._refreshes.resolve(region, None)
+
+    def refresh(self, query, criteria, latitude, longitude, deadline=None):
+        """
+        Searches the source provider around the point and folds the results into the catalog.
+        A search cut short by the deadline may be incomplete, so its region is not recorded
+        as covered.
+        """
+        cuisines = sorted({c.strip().lower() for c in (criteria.get("categories") or "").split(",") if c.strip()})
+        metrics.inc("catalog_refreshes_total", provider=self.source_name)
+        with metrics.span("provider_search", provider=self.source_name):
+            results = self.source.search_restaurants(
+                query=query, location="", criteria=criteria, latitude=latitude, longitude=longitude,
+                deadline=deadline
+            )
+        entries = []
+        for entry in results:
+            entry = dict(entry)
+            entry.setdefault("source", self.source_name)
+            # Lets the review fetcher find the listing's reviews at the source provider
+            entry.setdefault("source_ids", {entry["source"]: entry.get("id")})
+            if cuisines:
+                entry["cuisine_tags"] = cuisines
+            entries.append(entry)
+        region = {
+            "latitude": latitude, "longitude": longitude, "radius_m": criteria.get("radius", 1200),
+            "cuisines": cuisines, "min_rating": criteria.get("min_rating", 0), "refreshed_at": time.time(),
+        }
+        if deadline is not None and deadline.expired():
+            region = None
+        while True:
+            # Rebuilt outside the lock; retried if another refresh swapped the catalog meanwhile
+            with self._lock:
+                base = self.catalog
+            updated = base.upsert(entries, region, self.max_age_seconds)
+            with self._lock:
+                if self.catalog is base:
+                    self.catalog = updated
+                    break
+        total = len(updated)
+        if self.path:
+            with self._save_lock:
+                # The latest catalog is saved, so a slower concurrent refresh cannot overwrite it
+                with self._lock:
+                    catalog = self.catalog
+                try:
+                    catalog.save(self.path)
+                    mtime = self._meta_mtime()
+                    with self._lock:
+                        if self.catalog is catalog:
+                            self._loaded_mtime = mtime
+                except OSError as err:
+                    logger.warning("Could not save the restaurant catalog to %s: %s", self.path, err)
+        logger.info("Catalog refreshed from %s: %d places (%d total)", self.source_name, len(entries), total)
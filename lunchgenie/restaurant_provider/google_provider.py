@@ -5,12 +5,13 @@ class GoogleProvider(RestaurantProvider):
     def __init__(self, config):
         self.plugin = GooglePlacesPlugin(config)
 
-    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None):
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
         # This wraps the GooglePlacesPlugin search
         return self.plugin.search_restaurants(
             query=query,
             location=location,
             criteria=criteria,
             latitude=latitude,
-            longitude=longitude
+            longitude=longitude,
+            deadline=deadline
         )
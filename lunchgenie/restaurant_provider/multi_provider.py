@@ -0,0 +1,152 @@
+import logging
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from lunchgenie.deadline import Deadline, DeadlineExceeded
+from lunchgenie.location_utils import haversine_m
+from lunchgenie.metrics import metrics
+from lunchgenie.restaurant_provider import RestaurantProvider, SearchResults, load_provider
+from tools.base import PluginError
+
+logger = logging.getLogger(__name__)
+
+# Words that often differ between listings of the same place ("The Laksa King Restaurant")
+NAME_STOPWORDS = frozenset({"the", "and", "restaurant", "cafe", "bar", "kitchen", "eatery", "co"})
+
+def normalize_name(name: str) -> str:
+    """
+    Lower-cased, accent-free name without punctuation or NAME_STOPWORDS.
+    """
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    words = re.findall(r"[a-z0-9]+", text.replace("&", " and "))
+    return " ".join(w for w in words if w not in NAME_STOPWORDS)
+
+def _names_match(a: str, b: str) -> bool:
+    if not a or not b:
+        return False
+    if a == b or (min(len(a), len(b)) >= 4 and (a in b or b in a)):
+        return True
+    wa, wb = set(a.split()), set(b.split())
+    return len(wa & wb) / len(wa | wb) >= 0.6
+
+class MultiProvider(RestaurantProvider):
+    """
+    Queries several providers concurrently under one deadline and merges their results.
+
+    The same restaurant listed by several providers (matching normalized name, within
+    match_distance_m of each other) becomes one entry: the first provider's listing is kept,
+    missing fields are filled from the others, ratings are review-count weighted, and the
+    reviews of all listings are combined. Entries carry 'source' (provider name) and
+    'source_ids' ({provider name: id}). Providers that fail or miss the deadline are skipped
+    (the results are then flagged partial when the deadline dropped one, see SearchResults);
+    only when none answers is a PluginError raised (DeadlineExceeded if the caller's
+    deadline, which also caps the providers' deadline, ran out first).
+    """
+
+    def __init__(self, config=None, providers=None, deadline_seconds: float = None, match_distance_m: float = None):
+        if providers is None:
+            names = [n.strip().lower() for n in config.multi_providers.split(",") if n.strip()]
+            if "multi" in names:
+                raise ValueError("MULTI_PROVIDERS cannot include 'multi'")
+            providers = {name: load_provider(name, config) for name in names}
+        if not providers:
+            raise ValueError("MultiProvider needs at least one provider")
+        self.providers = providers
+        self.deadline_seconds = deadline_seconds if deadline_seconds is not None else config.multi_provider_deadline
+        self.match_distance_m = match_distance_m if match_distance_m is not None else config.multi_provider_match_m
+        # Spare workers so a provider still running past a deadline does not delay the next search
+        self._pool = ThreadPoolExecutor(max_workers=2 * len(providers), thread_name_prefix="provider")
+
+    def _search_one(self, name, provider, kwargs):
+        with metrics.span("provider_search", provider=name):
+            return provider.search_restaurants(**kwargs)
+
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
+        timeout = self.deadline_seconds if deadline is None else min(self.deadline_seconds, deadline.remaining())
+        # Providers get the shared deadline too, so a straggler gives up (and frees its worker)
+        # instead of running on with its own timeouts and retries
+        kwargs = dict(query=query, location=location, criteria=criteria, latitude=latitude,
+                      longitude=longitude, deadline=Deadline(timeout))
+        futures = {
+            self._pool.submit(self._search_one, name, provider, kwargs): name
+            for name, provider in self.providers.items()
+        }
+        done, late = wait(futures, timeout=timeout)
+        for future in late:
+            # Results arriving after the deadline are dropped
+            future.cancel()
+            metrics.inc("errors_total", stage="provider_deadline", provider=futures[future])
+            logger.warning("Provider %s missed the %.1fs deadline", futures[future], timeout)
+
+        by_provider, errors = {}, []
+        for future in done:
+            name = futures[future]
+            try:
+                by_provider[name] = future.result()
+            except Exception as err:
+                errors.append(f"{name}: {err}")
+                logger.warning("Provider %s failed: %s", name, err)
+        if not by_provider:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(f"No provider answered within {deadline.seconds:.1f}s")
+            reasons = errors + [f"{futures[f]}: deadline exceeded" for f in late]
+            raise PluginError("All providers failed (" + "; ".join(reasons) + ")")
+        # Merge in configured order, so the first provider's listing wins
+        merged = self.merge([(name, by_provider[name]) for name in self.providers if name in by_provider])
+        return SearchResults(merged, partial=bool(late))
+
+    def merge(self, results_by_provider):
+        """
+        Merges [(provider name, results)] into one de-duplicated list, in first-seen order.
+        """
+        merged = []
+        for name, results in results_by_provider:
+            for entry in results or []:
+                entry = dict(entry, source=name, source_ids={name: entry.get("id")})
+                match = self._find_match(merged, entry)
+                if match is None:
+                    entry["_name_key"] = normalize_name(entry.get("name", ""))
+                    merged.append(entry)
+                else:
+                    self._combine(match, entry)
+                    metrics.inc("provider_duplicates_total")
+        for entry in merged:
+            entry.pop("_name_key", None)
+        return merged
+
+    def _find_match(self, merged, entry):
+        if entry.get("latitude") is None or entry.get("longitude") is None:
+            return None
+        name_key = normalize_name(entry.get("name", ""))
+        for other in merged:
+            if other.get("latitude") is None or other.get("longitude") is None:
+                continue
+            if entry["source"] in other["source_ids"]:
+                continue  # never merge two listings from the same provider
+            if not _names_match(name_key, other["_name_key"]):
+                continue
+            distance = haversine_m(entry["latitude"], entry["longitude"], other["latitude"], other["longitude"])
+            if distance <= self.match_distance_m:
+                return other
+        return None
+
+    @staticmethod
+    def _combine(target, entry):
+        """
+        Folds a duplicate listing into target (the listing kept).
+        """
+        target["source_ids"].update(entry["source_ids"])
+        count_a, count_b = target.get("review_count") or 0, entry.get("review_count") or 0
+        if target.get("rating") is not None and entry.get("rating") is not None and count_a + count_b > 0:
+            target["rating"] = round((target["rating"] * count_a + entry["rating"] * count_b) / (count_a + count_b), 2)
+        elif target.get("rating") is None:
+            target["rating"] = entry.get("rating")
+        target["review_count"] = count_a + count_b
+        target["categories"] = list(dict.fromkeys((target.get("categories") or []) + (entry.get("categories") or [])))
+        target["reviews"] = list(dict.fromkeys((target.get("reviews") or []) + (entry.get("reviews") or [])))
+        if len(entry.get("address") or "") > len(target.get("address") or ""):
+            target["address"] = entry["address"]
+        for field, value in entry.items():
+            if field not in target or target[field] in (None, "", []):
+                target[field] = value
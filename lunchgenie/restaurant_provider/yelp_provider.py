@@ -5,7 +5,7 @@ class YelpProvider(RestaurantProvider):
     def __init__(self, config):
         self.plugin = YelpPlugin(config)
 
-    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None):
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
         # This simply wraps the YelpPlugin search
         # Note: YelpPlugin expects categories as a string, radius in meters, rating, etc.
         return self.plugin.search_restaurants(
@@ -13,5 +13,6 @@ class YelpProvider(RestaurantProvider):
             location=location,
             criteria=criteria,
             latitude=latitude,
-            longitude=longitude
+            longitude=longitude,
+            deadline=deadline
         )
@@ -2,19 +2,48 @@
 Result formatting and printing utilities for LunchGenie.
 """
 
+NO_RESULTS_MESSAGE = "All matched places have review red flags or could not be verified as safe."
+HEADER = "\nRecommended team lunch places (clean reviews, high rating, short walk):\n"
+
+def print_place(p):
+    """
+    Print the details of a single recommended place.
+    """
+    print(f"- {p['name']} ({', '.join(p['categories'])})")
+    print(f"  Rating: {p['rating']} from {p['review_count']} reviews; {p['distance_m']}m from point.")
+    print(f"  Address: {p['address']}")
+    print(f"  More: {p['url']}")
+    if "review_summary" in p:
+        print(f"  Review summary: {p['review_summary']}")
+    print("")
+
+def place_record(p):
+    """
+    JSON-ready copy of a recommended place (raw review text is an analysis input and is dropped).
+    """
+    return {k: v for k, v in p.items() if k != "reviews"}
+
 def print_recommendations(places):
     """
     Print formatted list of recommended places and their details.
     """
     if not places:
-        print("All matched places have review red flags or could not be verified as safe.")
+        print(NO_RESULTS_MESSAGE)
         return
-    print("\nRecommended team lunch places (clean reviews, high rating, short walk):\n")
+    print(HEADER)
+    for p in places:
+        print_place(p)
+
+def print_recommendations_stream(places):
+    """
+    Print recommended places as they arrive from an iterator (see Agent.iter_lunch_places).
+    Output matches print_recommendations once the iterator is exhausted.
+    """
+    count = 0
     for p in places:
-        print(f"- {p['name']} ({', '.join(p['categories'])})")
-        print(f"  Rating: {p['rating']} from {p['review_count']} reviews; {p['distance_m']}m from point.")
-        print(f"  Address: {p['address']}")
-        print(f"  More: {p['url']}")
-        if "review_summary" in p:
-            print(f"  Review summary: {p['review_summary']}")
-        print("")
+        if count == 0:
+            print(HEADER)
+        print_place(p)
+        count += 1
+    if count == 0:
+        print(NO_RESULTS_MESSAGE)
@@ -1,50 +1,630 @@
 """
 ReviewAnalyzer: Analyze recent restaurant reviews for red flags using LLM.
 Flags issues like food safety, hygiene, or severe service/hospitality problems.
+Verdicts are cached on disk (see cache_store.py) so unchanged reviews are not re-analyzed,
+and several restaurants can be analyzed in one LLM call with detect_red_flags_batch.
+Review text is compacted to a token budget before prompting (see prompt_compactor.py).
+With a restaurant id, verdicts are kept per review, so only reviews not seen before are
+sent to the LLM and the restaurant verdict is merged from the stored per-review verdicts.
+With a deadline, each LLM call's timeout comes from the time remaining, and restaurants not
+analyzed in time are left out of batch results.
+In cascade mode (ANALYSIS_CASCADE), a fast model screens every review set and only flagged
+or unparseable verdicts are escalated to a stronger model (see cascade_stats()).
 """
 
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial
 from typing import List, Tuple, Dict
-from langchain_openai import ChatOpenAI
 from lunchgenie.config import Config
+from lunchgenie.cache_store import CacheStore
+from lunchgenie.deadline import DeadlineExceeded
+from lunchgenie.metrics import metrics
+from lunchgenie.prompt_compactor import PromptCompactor
+from lunchgenie.rate_limiter import get_rate_limiter
+from lunchgenie.review_prescreen import ReviewPrescreener
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt or response schema changes, so cached verdicts are not reused.
+PROMPT_VERSION = 2
+
+# Longest single LLM call allowed under a deadline (seconds)
+LLM_TIMEOUT = 60.0
+
+ANALYSIS_INSTRUCTIONS = (
+    "You are an expert food & safety auditor. Analyze these customer reviews for this restaurant. "
+    "Identify and quote any that mention food safety, hygiene, rats/insects, food poisoning, "
+    "severe unhygienic conditions, or serious customer mistreatment. "
+    "If there are no such issues, reply that it seems safe. "
+)
+
+BATCH_INSTRUCTIONS = (
+    "You are an expert food & safety auditor. Analyze the customer reviews of each restaurant below "
+    "independently. For every restaurant, identify and quote any reviews that mention food safety, "
+    "hygiene, rats/insects, food poisoning, severe unhygienic conditions, or serious customer "
+    "mistreatment. If a restaurant has no such issues, its summary should say that it seems safe. "
+)
+
+REVIEW_INSTRUCTIONS = (
+    "You are an expert food & safety auditor. Judge each customer review below independently. "
+    "Flag a review if it mentions food safety, hygiene, rats/insects, food poisoning, "
+    "severe unhygienic conditions, or serious customer mistreatment. "
+)
+
+PRESCREEN_SUMMARY = (
+    "No mentions of food safety, hygiene, pests or customer mistreatment found in recent reviews "
+    "(local pre-screen). It seems safe."
+)
+
+PARSE_ERROR_VERDICT = {
+    "red_flags": [],
+    "safe": False,
+    "summary": "LLM response parse error or ambiguous result. Manual review recommended."
+}
+
+def _is_verdict(value) -> bool:
+    return isinstance(value, dict) and "safe" in value
+
+def _is_review_verdict(value) -> bool:
+    return isinstance(value, dict) and "flagged" in value
+
+def review_hash(review: str) -> str:
+    """Content address of a single review (whitespace-normalized)."""
+    return hashlib.sha256(" ".join(review.split()).encode("utf-8")).hexdigest()[:32]
+
+def _flagged(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "yes", "1")
+    return bool(value)
+
+def merge_review_verdicts(verdicts: List[Dict[str, any]]) -> Dict[str, any]:
+    """
+    Builds a restaurant verdict (detect_red_flags schema) from per-review verdicts
+    of the form {"flagged": bool, "quote": str, "issue": str}.
+    """
+    flagged = [v for v in verdicts if v.get("flagged")]
+    if not flagged:
+        return {
+            "red_flags": [],
+            "safe": True,
+            "summary": f"No red flags found in the {len(verdicts)} most recent reviews; it seems safe."
+        }
+    issues = "; ".join(v.get("issue") or "problem reported" for v in flagged)
+    return {
+        "red_flags": [v.get("quote") or v.get("issue") or "" for v in flagged],
+        "safe": False,
+        "summary": f"{len(flagged)} of {len(verdicts)} recent reviews raise concerns: {issues}."
+    }
+
+@contextmanager
+def _deadline_errors(deadline):
+    """
+    Re-raises errors of calls cut short by the deadline (e.g. the LLM client's timeout)
+    as DeadlineExceeded.
+    """
+    try:
+        yield
+    except DeadlineExceeded:
+        raise
+    except Exception as err:
+        if deadline is None or not deadline.expired():
+            raise
+        raise DeadlineExceeded(f"Reviews not analyzed within {deadline.seconds:.1f}s") from err
 
 class ReviewAnalyzer:
-    def __init__(self, config: Config = None, model_name: str = "gpt-3.5-turbo"):
+    def __init__(self, config: Config = None, model_name: str = "gpt-3.5-turbo", cache: CacheStore = None):
         self.config = config or Config()
-        self.llm = ChatOpenAI(
-            openai_api_key=self.config.openai_api_key,
-            model_name=model_name,
-            temperature=0.15
+        self.model_name = model_name
+        self.cascade = self.config.analysis_cascade
+        self.fast_model = self.config.analysis_fast_model
+        self.strong_model = self.config.analysis_strong_model or model_name
+        # Names the model(s) behind a verdict in cache keys, so cascade and single-model
+        # verdicts are not mixed up
+        self.model_label = f"{self.fast_model}>{self.strong_model}" if self.cascade else model_name
+        self._llms = {}
+        self._llm_lock = threading.Lock()
+        if cache is None and self.config.analysis_cache_path:
+            cache = CacheStore(
+                self.config.analysis_cache_path,
+                namespace="review_analysis",
+                ttl_seconds=self.config.analysis_cache_ttl,
+                max_entries=self.config.analysis_cache_max_entries
+            )
+        self.cache = cache
+        self.rate_limiter = get_rate_limiter(self.config)
+        self.batch_token_budget = self.config.analysis_batch_token_budget
+        self.prescreener = (
+            ReviewPrescreener(self.config.review_prescreen_threshold)
+            if self.config.review_prescreen else None
+        )
+        self.review_store = None
+        if self.config.analysis_incremental and self.config.analysis_cache_path:
+            self.review_store = CacheStore(
+                self.config.analysis_cache_path,
+                namespace="review_verdicts",
+                ttl_seconds=self.config.review_verdict_ttl,
+                max_entries=self.config.analysis_cache_max_entries
+            )
+        self.compactor = PromptCompactor(
+            token_budget=self.config.analysis_prompt_token_budget,
+            dedup_threshold=self.config.analysis_dedup_threshold,
+            model_name=model_name
         )
+        self._compaction = {"calls": 0, "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0,
+                            "duplicates_removed": 0, "sentences_dropped": 0}
+        self._compaction_lock = threading.Lock()
+        self._tiers = {tier: {"calls": 0, "seconds": 0.0} for tier in ("fast", "strong")}
+        self._screened = {"screened": 0, "escalated": 0}
+        self._cascade_lock = threading.Lock()
+
+    def _client(self, model: str):
+        """
+        The ChatOpenAI client for model, created (and langchain_openai imported) on first use,
+        so cache hits and empty review sets never pay for it.
+        """
+        client = self._llms.get(model)
+        if client is None:
+            with self._llm_lock:
+                client = self._llms.get(model)
+                if client is None:
+                    from langchain_openai import ChatOpenAI
+                    client = self._llms[model] = ChatOpenAI(
+                        openai_api_key=self.config.openai_api_key,
+                        model_name=model,
+                        temperature=0.15,
+                        openai_api_base=self.config.openai_base_url
+                    )
+        return client
+
+    @property
+    def llm(self):
+        """The client for model_name (the only model used outside cascade mode)."""
+        return self._client(self.model_name)
+
+    @llm.setter
+    def llm(self, client):
+        self._llms[self.model_name] = client
+
+    def _invoke(self, prompt: str, deadline=None, model: str = None, tier: str = None):
+        """
+        Sends one prompt to the LLM (model_name unless model is given), recording call count,
+        latency and token usage; cascade calls are also labelled and timed by tier.
+        Calls go through the shared 'openai' rate limiter and circuit breaker. With a
+        deadline, the request timeout is the time remaining (at most LLM_TIMEOUT); a call cut
+        short by the deadline is not counted as an upstream failure.
+        """
+        model = model or self.model_name
+        labels = {"model": model} if tier is None else {"model": model, "tier": tier}
+        kwargs = {}
+        if deadline is not None:
+            kwargs["timeout"] = deadline.timeout(LLM_TIMEOUT)
+        self.rate_limiter.acquire("openai", max_wait=None if deadline is None else deadline.remaining())
+        started = time.perf_counter()
+        try:
+            with metrics.span("llm", **labels):
+                response = self._client(model).invoke(prompt, **kwargs)
+        except Exception as err:
+            # openai.APIStatusError carries the HTTP status and response headers
+            headers = getattr(getattr(err, "response", None), "headers", None) or {}
+            status = getattr(err, "status_code", None)
+            if status is not None or deadline is None or not deadline.expired():
+                self.rate_limiter.report("openai", status, headers.get("retry-after"))
+            raise
+        self.rate_limiter.report("openai", 200)
+        if tier is not None:
+            with self._cascade_lock:
+                self._tiers[tier]["calls"] += 1
+                self._tiers[tier]["seconds"] += time.perf_counter() - started
+        metrics.inc("llm_calls_total", **labels)
+        usage = getattr(response, "usage_metadata", None) or {}
+        token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("input_tokens", token_usage.get("prompt_tokens"))
+        completion_tokens = usage.get("output_tokens", token_usage.get("completion_tokens"))
+        if prompt_tokens:
+            metrics.inc("llm_prompt_tokens_total", prompt_tokens, model=model)
+        if completion_tokens:
+            metrics.inc("llm_completion_tokens_total", completion_tokens, model=model)
+        return response
+
+    def _cache_key(self, reviews: List[str]) -> str:
+        """
+        Content address for a review set: model label, prompt version and a hash of the
+        whitespace-normalized review text that would be sent to the LLM.
+        """
+        normalized = "\n".join(" ".join(r.split()) for r in reviews[:10])
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{self.model_label}:v{PROMPT_VERSION}:{digest}"
+
+    def _prescreen(self, reviews: List[str]):
+        """
+        Returns a safe verdict for review sets the local pre-screen clears, otherwise None.
+        """
+        if self.prescreener is not None and self.prescreener.is_clearly_clean(reviews[:10]):
+            return {"red_flags": [], "safe": True, "summary": PRESCREEN_SUMMARY}
+        return None
+
+    def _prompt_reviews(self, reviews: List[str]) -> Tuple[str, Dict[str, int]]:
+        """
+        Compacts up to the 10 latest reviews to the prompt token budget and formats them
+        for the prompt. Returns the text and the compaction stats.
+        """
+        compacted, stats = self.compactor.compact(reviews[:10])
+        return "\n\n".join(f"- {r}" for r in compacted), stats
+
+    def _format_reviews(self, reviews: List[str]) -> str:
+        return self._prompt_reviews(reviews)[0]
+
+    def _record_compaction(self, call_stats: List[Dict[str, int]]):
+        """
+        Records the compaction stats of one LLM call (summed over its restaurants).
+        """
+        totals = {k: sum(s[k] for s in call_stats) for k in call_stats[0]}
+        logger.debug("Prompt compaction: %s", totals)
+        metrics.inc("prompt_review_tokens_before_total", totals["tokens_before"])
+        metrics.inc("prompt_review_tokens_saved_total", totals["tokens_saved"])
+        metrics.inc("prompt_duplicate_reviews_total", totals["duplicates_removed"])
+        with self._compaction_lock:
+            self._compaction["calls"] += 1
+            for k, v in totals.items():
+                self._compaction[k] += v
+
+    def compaction_stats(self) -> Dict[str, float]:
+        """Returns cumulative prompt compaction stats over all LLM calls so far."""
+        with self._compaction_lock:
+            stats = dict(self._compaction)
+        stats["saved_fraction"] = stats["tokens_saved"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+        return stats
 
-    def detect_red_flags(self, reviews: List[str]) -> Dict[str, any]:
+    def detect_red_flags(self, reviews: List[str], restaurant_id: str = None, deadline=None) -> Dict[str, any]:
         """
         Analyzes reviews and returns a dict with findings:
         - 'red_flags': List of flagged review excerpts (if any)
         - 'safe': bool
         - 'summary': 2-3 sentence summary of concerns or OK
+        With a restaurant_id (e.g. "yelp:<id>"), only reviews not analyzed before for that
+        restaurant are sent to the LLM. Raises DeadlineExceeded if the deadline passes first,
+        including when it cuts an LLM call short.
         """
         if not reviews:
             return {"red_flags": [], "safe": True, "summary": "No reviews to analyze."}
-        # Compose prompt
-        review_text = "\n\n".join(f"- {r.strip()}" for r in reviews[:10])  # Up to 10 latest reviews
-        prompt = (
-            "You are an expert food & safety auditor. Analyze these customer reviews for this restaurant. "
-            "Identify and quote any that mention food safety, hygiene, rats/insects, food poisoning, "
-            "severe unhygienic conditions, or serious customer mistreatment. "
-            "If there are no such issues, reply that it seems safe. "
-            "Reply in JSON as {\"red_flags\": ..., \"safe\": ..., \"summary\": ...}\n\n"
-            f"Reviews:\n{review_text}"
-        )
+        if restaurant_id and self.review_store is not None:
+            key = str(restaurant_id)
+            with _deadline_errors(deadline):
+                verdicts = self.detect_red_flags_batch({key: reviews}, restaurant_ids={key: key}, deadline=deadline)
+            if key not in verdicts:
+                raise DeadlineExceeded(f"Reviews not analyzed within {deadline.seconds:.1f}s")
+            return verdicts[key]
+        cleared = self._prescreen(reviews)
+        if cleared is not None:
+            return cleared
+        if self.cache is not None:
+            cached = self.cache.get(self._cache_key(reviews))
+            if cached is not None:
+                return cached
+        with _deadline_errors(deadline):
+            verdict = self._analyze_batch([("_", reviews)], deadline).get("_")
+        if verdict is None:
+            raise DeadlineExceeded(f"Reviews not analyzed within {deadline.seconds:.1f}s")
+        return verdict
+
+    def detect_red_flags_batch(self,
+                               review_sets: Dict[str, List[str]],
+                               max_workers: int = 1,
+                               restaurant_ids: Dict[str, str] = None,
+                               deadline=None) -> Dict[str, Dict[str, any]]:
+        """
+        Analyzes the reviews of several restaurants, packing as many as fit into the
+        token budget (ANALYSIS_BATCH_TOKEN_BUDGET) into a single LLM prompt.
+        Takes {restaurant_key: reviews} and returns {restaurant_key: verdict} in the
+        detect_red_flags schema. Restaurants whose verdicts cannot be parsed from a
+        batch response are retried one by one. Batches run on up to max_workers threads.
+        Restaurants with an entry in restaurant_ids ({restaurant_key: provider id}) are
+        analyzed incrementally, review by review.
+        With a deadline, LLM calls still running when it passes are abandoned and the
+        restaurants they covered are missing from the result.
+        """
+        verdicts = {}
+        pending = []
+        incremental = {}
+        for key, reviews in review_sets.items():
+            if not reviews:
+                verdicts[key] = self.detect_red_flags(reviews)
+                continue
+            cleared = self._prescreen(reviews)
+            if cleared is not None:
+                verdicts[key] = cleared
+                continue
+            restaurant_id = (restaurant_ids or {}).get(key)
+            if restaurant_id and self.review_store is not None:
+                incremental[key] = (restaurant_id, reviews)
+                continue
+            cached = self.cache.get(self._cache_key(reviews)) if self.cache is not None else None
+            if cached is not None:
+                verdicts[key] = cached
+            else:
+                pending.append((key, reviews))
+
+        if incremental:
+            verdicts.update(self._analyze_incremental(incremental, max_workers, deadline))
+        analyze = partial(self._analyze_batch, deadline=deadline)
+        verdicts.update(self._run_batches(analyze, self._plan_batches(pending), max_workers, deadline))
+        return {key: verdicts[key] for key in review_sets if key in verdicts}
+
+    @staticmethod
+    def _run_batches(analyze, batches, max_workers: int, deadline=None) -> Dict[str, any]:
+        results = {}
+        if deadline is not None and batches:
+            # Batches still queued or running at the deadline are dropped
+            pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches))))
+            futures = [pool.submit(analyze, batch) for batch in batches]
+            done, late = wait(futures, timeout=deadline.remaining())
+            pool.shutdown(wait=False, cancel_futures=True)
+            for future in futures:
+                if future not in done:
+                    continue
+                try:
+                    results.update(future.result())
+                except Exception:
+                    if not deadline.expired():
+                        raise
+                    late.add(future)
+            if late:
+                metrics.inc("errors_total", len(late), stage="analysis_deadline")
+            return results
+        if max_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+                for result in pool.map(analyze, batches):
+                    results.update(result)
+        else:
+            for batch in batches:
+                results.update(analyze(batch))
+        return results
+
+    def _plan_batches(self, pending: List[Tuple[str, List[str]]]) -> List[List[Tuple[str, List[str]]]]:
+        """
+        Greedily groups restaurants so each batch prompt stays within the token budget.
+        A restaurant that exceeds the budget on its own gets a batch of its own.
+        """
+        if self.batch_token_budget <= 0:
+            return [[item] for item in pending]
+        count_tokens = self.compactor.count_tokens
+        budget = self.batch_token_budget - count_tokens(BATCH_INSTRUCTIONS)
+        batches, current, used = [], [], 0
+        for key, reviews in pending:
+            cost = count_tokens(self._format_reviews(reviews)) + 8
+            if current and used + cost > budget:
+                batches.append(current)
+                current, used = [], 0
+            current.append((key, reviews))
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
 
-        response = self.llm.invoke(prompt)
-        import json
+    def _analyze_batch(self, batch: List[Tuple[str, List[str]]], deadline=None) -> Dict[str, Dict[str, any]]:
+        """
+        Verdicts for [(key, reviews)]. In cascade mode the fast model screens the batch and
+        the sets it flags or whose verdicts cannot be parsed go to the strong model. Entries
+        missing from the final model's multi-restaurant response are retried on their own.
+        Final verdicts are cached; entries without one get PARSE_ERROR_VERDICT (not cached),
+        or are left out once the deadline has passed.
+        """
+        if self.cascade:
+            verdicts = self._ask_sets(batch, self.fast_model, "fast", deadline)
+            doubtful = [(key, reviews) for key, reviews in batch if not verdicts.get(key, {}).get("safe")]
+            unparsed = sum(1 for key, _ in doubtful if key not in verdicts)
+            self._record_screening("set", len(batch), len(doubtful) - unparsed, unparsed)
+            # A flagged fast verdict is only final once the strong model confirms it
+            final = {key: verdicts[key] for key, _ in batch if key in verdicts and verdicts[key].get("safe")}
+            asked, model, tier = doubtful, self.strong_model, "strong"
+            if doubtful and (deadline is None or not deadline.expired()):
+                final.update(self._ask_sets(doubtful, model, tier, deadline))
+        else:
+            asked, model, tier = batch, self.model_name, None
+            final = self._ask_sets(batch, model, tier, deadline)
+        for key, reviews in asked:
+            if key not in final and len(asked) > 1 and (deadline is None or not deadline.expired()):
+                # Missing or malformed entry in the batch response: retry on its own
+                final.update(self._ask_sets([(key, reviews)], model, tier, deadline))
+
+        verdicts = {}
+        for key, reviews in batch:
+            if key in final:
+                if self.cache is not None:
+                    self.cache.set(self._cache_key(reviews), final[key])
+                verdicts[key] = final[key]
+            elif deadline is None or not deadline.expired():
+                verdicts[key] = dict(PARSE_ERROR_VERDICT)
+        return verdicts
+
+    def _ask_sets(self, batch: List[Tuple[str, List[str]]], model: str, tier: str = None,
+                  deadline=None) -> Dict[str, Dict[str, any]]:
+        """
+        One LLM call on model for [(key, reviews)]; returns {key: verdict} for the entries
+        whose verdicts could be parsed.
+        """
+        if len(batch) == 1:
+            key, reviews = batch[0]
+            review_text, stats = self._prompt_reviews(reviews)
+            self._record_compaction([stats])
+            prompt = (
+                f"{ANALYSIS_INSTRUCTIONS}"
+                "Reply in JSON as {\"red_flags\": ..., \"safe\": ..., \"summary\": ...}\n\n"
+                f"Reviews:\n{review_text}"
+            )
+            parsed = {key: self._parse(self._invoke(prompt, deadline, model, tier))}
+            labels = {key: key}
+        else:
+            # Short labels keep the prompt compact and independent of provider ids
+            labels = {f"R{i + 1}": key for i, (key, _) in enumerate(batch)}
+            formatted = [self._prompt_reviews(reviews) for _, reviews in batch]
+            sections = "\n\n".join(f"Restaurant {label}:\n{text}" for label, (text, _) in zip(labels, formatted))
+            self._record_compaction([stats for _, stats in formatted])
+            prompt = (
+                f"{BATCH_INSTRUCTIONS}"
+                "Reply in JSON as an object keyed by restaurant label, e.g. "
+                "{\"R1\": {\"red_flags\": ..., \"safe\": ..., \"summary\": ...}, ...}\n\n"
+                f"{sections}"
+            )
+            parsed = self._parse(self._invoke(prompt, deadline, model, tier))
+            if not isinstance(parsed, dict):
+                parsed = {}
+        return {key: parsed[label] for label, key in labels.items() if _is_verdict(parsed.get(label))}
+
+    @staticmethod
+    def _parse(response):
         try:
-            parsed = json.loads(response.content)
-            return parsed
+            return json.loads(response.content)
         except Exception:
-            # Fallback: just include summary and fallback parsing
-            return {
-                "red_flags": [],
-                "safe": False,
-                "summary": "LLM response parse error or ambiguous result. Manual review recommended."
-            }
+            metrics.inc("errors_total", stage="llm_parse")
+            return None
+
+    def _record_screening(self, kind: str, screened: int, flagged: int, unparsed: int):
+        """Records how many items the fast tier screened and why some were escalated."""
+        metrics.inc("analysis_screened_total", screened, kind=kind)
+        if flagged:
+            metrics.inc("analysis_escalated_total", flagged, kind=kind, reason="flagged")
+        if unparsed:
+            metrics.inc("analysis_escalated_total", unparsed, kind=kind, reason="parse_error")
+        with self._cascade_lock:
+            self._screened["screened"] += screened
+            self._screened["escalated"] += flagged + unparsed
+
+    def cascade_stats(self) -> Dict[str, float]:
+        """
+        Returns cumulative cascade stats: calls, total and mean latency per tier, and the
+        share of screened items (review sets or single reviews) escalated to the strong model.
+        """
+        with self._cascade_lock:
+            stats = dict(self._screened)
+            for tier, totals in self._tiers.items():
+                stats[f"{tier}_calls"] = totals["calls"]
+                stats[f"{tier}_seconds"] = totals["seconds"]
+                stats[f"{tier}_mean_seconds"] = totals["seconds"] / totals["calls"] if totals["calls"] else 0.0
+        stats["escalation_rate"] = stats["escalated"] / stats["screened"] if stats["screened"] else 0.0
+        return stats
+
+    def _store_key(self, restaurant_id: str) -> str:
+        return f"{self.model_label}:v{PROMPT_VERSION}:{restaurant_id}"
+
+    def _analyze_incremental(self, items: Dict[str, Tuple[str, List[str]]], max_workers: int,
+                             deadline=None) -> Dict[str, Dict[str, any]]:
+        """
+        Analyzes {restaurant_key: (restaurant_id, reviews)} against the per-restaurant store
+        of per-review verdicts: only reviews without a stored verdict go to the LLM, then each
+        restaurant verdict is merged from the verdicts of its current reviews.
+        """
+        records, new, reused = {}, {}, 0
+        for key, (restaurant_id, reviews) in items.items():
+            store_key = self._store_key(restaurant_id)
+            record = self.review_store.get(store_key) or {}
+            hashes = list(dict.fromkeys(review_hash(r) for r in reviews[:10]))
+            for h, review in zip((review_hash(r) for r in reviews[:10]), reviews[:10]):
+                if h in record:
+                    reused += 1
+                elif h not in new:
+                    new[h] = review
+            records[key] = (store_key, hashes, record)
+        metrics.inc("review_verdicts_reused_total", reused)
+        metrics.inc("review_verdicts_new_total", len(new))
+        fresh = self._judge_reviews(new, max_workers, deadline) if new else {}
+
+        verdicts = {}
+        for key, (store_key, hashes, record) in records.items():
+            current = {h: record.get(h) or fresh.get(h) for h in hashes}
+            current = {h: v for h, v in current.items() if v is not None}
+            # Only the verdicts of the current reviews are kept, so records stay small
+            if current != record:
+                self.review_store.set(store_key, current)
+            if len(current) < len(hashes):
+                if deadline is not None and deadline.expired():
+                    continue  # not judged in time: left out, not reported as a parse error
+                verdicts[key] = dict(PARSE_ERROR_VERDICT)
+            else:
+                verdicts[key] = merge_review_verdicts([current[h] for h in hashes])
+        return verdicts
+
+    def _judge_reviews(self, reviews: Dict[str, str], max_workers: int, deadline=None) -> Dict[str, Dict[str, any]]:
+        """
+        Gets a verdict for each {review_hash: review}, packing reviews into prompts up to the
+        batch token budget. In cascade mode, reviews the fast model flags or misses go to the strong
+        model. Reviews missing from the final model's multi-review response are retried on their own.
+        """
+        # The prompt budget covers 10 reviews, so each review gets a tenth of it
+        per_review = self.compactor.token_budget // 10 if self.compactor.token_budget > 0 else 0
+        items = [(h, *self.compactor.compact_review(review, per_review)) for h, review in reviews.items()]
+        if not self.cascade:
+            judge = partial(self._judge_batch, deadline=deadline)
+            verdicts = self._run_batches(judge, self._plan_review_batches(items), max_workers, deadline)
+            return self._retry_missing(judge, items, verdicts, max_workers, deadline)
+
+        judge = partial(self._judge_batch, model=self.fast_model, tier="fast", deadline=deadline)
+        verdicts = self._run_batches(judge, self._plan_review_batches(items), max_workers, deadline)
+        doubtful = [item for item in items if verdicts.get(item[0], {}).get("flagged", True)]
+        unparsed = sum(1 for item in doubtful if item[0] not in verdicts)
+        self._record_screening("review", len(items), len(doubtful) - unparsed, unparsed)
+        # Flagged fast verdicts are dropped (not stored) unless the strong model confirms them
+        for item in doubtful:
+            verdicts.pop(item[0], None)
+        if doubtful and (deadline is None or not deadline.expired()):
+            judge = partial(self._judge_batch, model=self.strong_model, tier="strong", deadline=deadline)
+            verdicts.update(self._run_batches(judge, self._plan_review_batches(doubtful), max_workers, deadline))
+            verdicts = self._retry_missing(judge, doubtful, verdicts, max_workers, deadline)
+        return verdicts
+
+    def _retry_missing(self, judge, items, verdicts, max_workers: int, deadline=None) -> Dict[str, Dict[str, any]]:
+        """
+        Retries on their own the items judged in a multi-review prompt whose verdicts are missing.
+        """
+        missing = [[item] for item in items if item[0] not in verdicts]
+        if missing and len(items) > 1 and (deadline is None or not deadline.expired()):
+            verdicts.update(self._run_batches(judge, missing, max_workers, deadline))
+        return verdicts
+
+    def _plan_review_batches(self, items: List[Tuple[str, str, Dict[str, int]]]):
+        if self.batch_token_budget <= 0:
+            return [[item] for item in items]
+        budget = self.batch_token_budget - self.compactor.count_tokens(REVIEW_INSTRUCTIONS)
+        batches, current, used = [], [], 0
+        for item in items:
+            cost = self.compactor.count_tokens(item[1]) + 6
+            if current and used + cost > budget:
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _judge_batch(self, batch: List[Tuple[str, str, Dict[str, int]]], model: str = None, tier: str = None,
+                     deadline=None) -> Dict[str, Dict[str, any]]:
+        labels = {f"V{i + 1}": item for i, item in enumerate(batch)}
+        sections = "\n\n".join(f"Review {label}:\n{text}" for label, (_, text, _) in labels.items())
+        self._record_compaction([stats for _, _, stats in batch])
+        prompt = (
+            f"{REVIEW_INSTRUCTIONS}"
+            "Reply in JSON as an object keyed by review label, e.g. "
+            "{\"V1\": {\"flagged\": ..., \"quote\": ..., \"issue\": ...}, ...}, where quote is the "
+            "problematic passage and issue a one-line description (both empty if not flagged).\n\n"
+            f"{sections}"
+        )
+        parsed = self._parse(self._invoke(prompt, deadline, model, tier))
+        if not isinstance(parsed, dict):
+            parsed = {}
+        verdicts = {}
+        for label, (h, _, _) in labels.items():
+            verdict = parsed.get(label)
+            if _is_review_verdict(verdict):
+                verdicts[h] = {
+                    "flagged": _flagged(verdict.get("flagged")),
+                    "quote": str(verdict.get("quote") or ""),
+                    "issue": str(verdict.get("issue") or ""),
+                }
+        return verdicts
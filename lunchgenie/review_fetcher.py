@@ -1,34 +1,92 @@
 """
 Review fetching and enrichment logic for LunchGenie.
 Handles review retrieval from API results, including Yelp review detail, with fallback as needed.
+Entries merged from several providers get the reviews of every listing.
+Fetched reviews are cached (REVIEW_CACHE_PATH); stale entries are served while they are
+refreshed in the background.
 """
 
-import requests
+from lunchgenie.cache_store import BackgroundRefresher, CacheStore
+from lunchgenie.deadline import DeadlineExceeded, hedged
+from lunchgenie.http_transport import get_transport
+from lunchgenie.metrics import metrics
 
-YELP_BUSINESS_DETAIL_URL = "https://api.yelp.com/v3/businesses/{id}/reviews"
+YELP_REVIEWS_PATH = "/v3/businesses/{id}/reviews"
 
 class ReviewFetcher:
-    def __init__(self, config):
+    def __init__(self, config, cache: CacheStore = None, background_refresh: bool = True):
         self.config = config
+        self.http = get_transport(config)
+        review_cache_path = getattr(config, "review_cache_path", "")
+        if cache is None and review_cache_path:
+            cache = CacheStore(
+                review_cache_path,
+                namespace="reviews",
+                ttl_seconds=config.review_cache_ttl + config.review_cache_stale_ttl,
+                max_entries=5000
+            )
+        self.cache = cache
+        # False (pre-warming): stale reviews are re-fetched before returning
+        self.background_refresh = background_refresh
+        self._refresher = BackgroundRefresher()
 
-    def get_reviews(self, entry):
+    def get_reviews(self, entry, deadline=None):
         """
         Returns a list of reviews for a restaurant entry, using provider reviews if available,
-        or fetching from Yelp API as fallback if configured.
+        or fetching from Yelp API as fallback for Yelp listings (by the entry's 'source', e.g. for
+        catalog results, else the configured provider). Entries with a Yelp listing in
+        'source_ids' (multi-provider results) also get that listing's Yelp reviews.
+        A Yelp fetch still unanswered after HEDGE_AFTER seconds is re-issued (if set), and
+        with a deadline DeadlineExceeded is raised if the reviews cannot be fetched in time.
         """
-        provider = getattr(self.config, "restaurant_provider", None)
-        reviews = []
-        if "reviews" in entry and entry["reviews"]:
-            reviews = entry["reviews"]
-        elif provider == "yelp":
-            # Fetch reviews via Yelp API
-            try:
-                detail_url = YELP_BUSINESS_DETAIL_URL.format(id=entry["id"])
-                headers = {"Authorization": f"Bearer {self.config.yelp_api_key}"}
-                resp = requests.get(detail_url, headers=headers, timeout=7)
-                resp.raise_for_status()
-                reviews = [r["text"] for r in resp.json().get("reviews", [])]
-            except Exception:
-                reviews = []
+        provider = entry.get("source") or getattr(self.config, "restaurant_provider", None)
+        reviews = list(entry.get("reviews") or [])
+        yelp_id = (entry.get("source_ids") or {}).get("yelp")
+        if yelp_id is None and not reviews and provider == "yelp":
+            yelp_id = entry.get("id")
+        if yelp_id:
+            reviews += [r for r in self._cached_yelp_reviews(yelp_id, deadline) if r not in reviews]
         # Could add more provider-specific logic if desired
         return reviews
+
+    def _cached_yelp_reviews(self, business_id, deadline=None):
+        """
+        Yelp reviews from the cache when present, fetching (and caching) them otherwise.
+        Failed fetches are not cached.
+        """
+        hedge_after = getattr(self.config, "hedge_after", 0)
+
+        def fetch(deadline=None):
+            fetched = hedged(lambda: self._fetch_yelp_reviews(business_id, deadline), hedge_after, deadline)
+            if fetched is not None and self.cache is not None:
+                self.cache.set(key, fetched)
+            return fetched
+
+        key = f"yelp:{business_id}"
+        cached = self.cache.get_with_age(key) if self.cache is not None else None
+        if cached is None:
+            return fetch(deadline) or []
+        reviews, age = cached
+        if age > self.config.review_cache_ttl:
+            if self.background_refresh:
+                self._refresher.submit(key, fetch)
+            else:
+                reviews = fetch(deadline) or reviews
+        return reviews
+
+    def _fetch_yelp_reviews(self, business_id, deadline=None):
+        """
+        Fetch reviews via Yelp API; returns None on any failure (raises DeadlineExceeded
+        once the deadline has passed).
+        """
+        try:
+            with metrics.span("yelp_reviews"):
+                detail_url = self.config.yelp_api_base_url + YELP_REVIEWS_PATH.format(id=business_id)
+                headers = {"Authorization": f"Bearer {self.config.yelp_api_key}"}
+                resp = self.http.get(detail_url, headers=headers, timeout=7, deadline=deadline)
+                resp.raise_for_status()
+                return [r["text"] for r in resp.json().get("reviews", [])]
+        except Exception:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(f"Reviews of {business_id} not fetched within {deadline.seconds:.1f}s")
+            return None
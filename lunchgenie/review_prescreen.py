@@ -0,0 +1,85 @@
+"""
+Local lexical pre-screen for restaurant reviews.
+Scores a review set against compiled patterns for hygiene, pest, food-safety and mistreatment
+terms, so clearly clean sets can be marked safe without an LLM call. Anything scoring at or
+above the threshold (by default: any single match, weak or strong) is left for ReviewAnalyzer's
+LLM analysis.
+"""
+
+import re
+import threading
+from typing import Dict, List
+
+from lunchgenie.metrics import metrics
+
+# Terms that on their own justify a closer (LLM) look
+STRONG_TERMS = (
+    "food poisoning", "poisoned", "salmonella", "e. coli", "e coli", "norovirus", "listeria",
+    "cockroach", "cockroaches", "roach", "roaches", "rat", "rats", "mice", "mouse", "rodent", "rodents",
+    "vermin", "maggot", "maggots", "infestation", "infested", "pest", "pests",
+    "health inspector", "health inspection", "health department", "shut down", "closed down",
+    "vomit", "vomited", "vomiting", "threw up", "diarrhea", "diarrhoea", "hospital", "hospitalised",
+    "hospitalized", "got sick", "get sick", "made me sick", "made us sick", "fell sick", "fell ill",
+    "got ill", "food sickness", "undercooked chicken", "raw chicken", "raw meat", "hair", "hairs",
+    "bug in", "bugs",
+    "insect", "insects", "fly in", "mould", "mouldy", "mold", "moldy", "rotten", "expired", "spoiled",
+    "unhygienic", "unsanitary", "filthy", "contaminated", "cross contamination",
+    "racist", "racism", "discriminated", "discrimination", "harassed", "harassment", "assaulted",
+    "abusive", "threatened",
+)
+
+# Terms that are often harmless on their own ("sick food", "a bit dirty outside"); they still
+# escalate at the default threshold, but rank below strong terms in prompt compaction
+WEAK_TERMS = (
+    "dirty", "sick", "ill", "stomach", "gross", "disgusting", "smelly", "stale", "greasy",
+    "rude", "yelled", "screamed", "flies", "sticky", "unclean",
+)
+
+STRONG_WEIGHT = 1.0
+WEAK_WEIGHT = 0.5
+
+def _compile(terms) -> "re.Pattern":
+    # Longest first so multi-word phrases win over their prefixes
+    alternatives = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE)
+
+class ReviewPrescreener:
+    def __init__(self, threshold: float = WEAK_WEIGHT):
+        self.threshold = threshold
+        self._strong = _compile(STRONG_TERMS)
+        self._weak = _compile(WEAK_TERMS)
+        self.screened = 0
+        self.cleared = 0
+        self._lock = threading.Lock()
+
+    def score(self, reviews: List[str]) -> float:
+        """
+        Weighted count of red-flag term matches across the review set.
+        """
+        score = 0.0
+        for review in reviews:
+            score += STRONG_WEIGHT * len(self._strong.findall(review))
+            score += WEAK_WEIGHT * len(self._weak.findall(review))
+        return score
+
+    def is_clearly_clean(self, reviews: List[str]) -> bool:
+        """
+        True when the review set scores below the threshold and can skip the LLM.
+        """
+        clean = self.score(reviews) < self.threshold
+        with self._lock:
+            self.screened += 1
+            self.cleared += int(clean)
+        metrics.inc("prescreen_total", outcome="cleared" if clean else "escalated")
+        return clean
+
+    def stats(self) -> Dict[str, float]:
+        """Returns how many review sets were screened, cleared locally and escalated to the LLM."""
+        with self._lock:
+            screened, cleared = self.screened, self.cleared
+        return {
+            "screened": screened,
+            "cleared": cleared,
+            "escalated": screened - cleared,
+            "llm_calls_avoided_fraction": (cleared / screened) if screened else 0.0,
+        }
@@ -0,0 +1,118 @@
+"""
+Local recommendation service for LunchGenie.
+Keeps one Agent warm (config, LLM client, provider plugin, caches, HTTP pools) and serves
+recommend_lunch_places over HTTP on a local socket. Identical concurrent queries share one
+execution, and overlapping restaurants in concurrent queries are analyzed once.
+
+Endpoints:
+    GET  /health
+    GET  /metrics   (Prometheus text exposition format)
+    GET  /recommend?cuisines=indian,thai&min_rating=4.2&radius=1500&lat=-37.81&lon=144.96&top_k=5&deadline=5
+    POST /recommend  with a JSON query spec body (same fields as batch mode)
+Responses carry "partial": true when the deadline passed before all candidates were verified.
+"""
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from lunchgenie.batch import query_kwargs
+from lunchgenie.metrics import PrometheusExporter
+from lunchgenie.result_formatter import place_record
+from lunchgenie.singleflight import SingleFlight
+
+class RecommendationService:
+    def __init__(self, agent):
+        self.agent = agent
+        # Concurrent queries for the same restaurant share one review fetch/analysis
+        self.agent.analysis_memo = SingleFlight()
+        self.inflight = SingleFlight()
+        self.executions = 0
+        self.coalesced = 0
+
+    def recommend(self, spec):
+        """
+        Returns the response body for a query spec. Raises ValueError for invalid specs.
+        """
+        kwargs = query_kwargs(spec)
+        key = json.dumps(kwargs, sort_keys=True)
+        future, owner = self.inflight.claim(key)
+        if not owner:
+            self.coalesced += 1
+            return future.result()
+        try:
+            self.executions += 1
+            body = self._execute(kwargs)
+        except BaseException as err:
+            self.inflight.fail(key, err)
+            raise
+        self.inflight.resolve(key, body)
+        return body
+
+    def _execute(self, kwargs):
+        result = self.agent.recommend_lunch_places(**kwargs)
+        if isinstance(result, str):
+            return {"error": result}
+        return {"results": [place_record(p) for p in result or []], "partial": getattr(result, "partial", False)}
+
+    def stats(self):
+        return {"executions": self.executions, "coalesced": self.coalesced}
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._reply(200, dict(status="ok", **self.service.stats()))
+        elif url.path == "/metrics":
+            self._reply_text(200, PrometheusExporter().render(), "text/plain; version=0.0.4")
+        elif url.path == "/recommend":
+            spec = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._recommend(spec)
+        else:
+            self._reply(404, {"error": f"Unknown path: {url.path}"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/recommend":
+            self._reply(404, {"error": f"Unknown path: {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            spec = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as err:
+            self._reply(400, {"error": f"Invalid JSON body: {err}"})
+            return
+        if not isinstance(spec, dict):
+            self._reply(400, {"error": "Query spec must be a JSON object"})
+            return
+        self._recommend(spec)
+
+    def _recommend(self, spec):
+        try:
+            body = self.service.recommend(spec)
+        except ValueError as err:
+            self._reply(400, {"error": f"Invalid query: {err}"})
+            return
+        except Exception as err:
+            self._reply(500, {"error": f"{type(err).__name__}: {err}"})
+            return
+        self._reply(502 if "error" in body else 200, body)
+
+    def _reply(self, status, body):
+        self._reply_text(status, json.dumps(body), "application/json")
+
+    def _reply_text(self, status, text, content_type):
+        payload = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def make_server(agent, host="127.0.0.1", port=8765):
+    """
+    Builds a threaded HTTP server around a warm agent; call serve_forever() to run it.
+    """
+    handler = type("RecommendationHandler", (_Handler,), {"service": RecommendationService(agent)})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,60 @@
+"""
+In-flight call coalescing for LunchGenie.
+Concurrent callers asking for the same key share one execution instead of repeating the work.
+
+Usage:
+    from lunchgenie.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    result = flight.do(key, lambda: expensive_call())
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+class SingleFlight:
+    def __init__(self, keep_results: bool = False):
+        """
+        keep_results=False coalesces only calls that overlap in time;
+        keep_results=True also memoizes successful results for the lifetime of the object.
+        """
+        self.keep_results = keep_results
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: Hashable) -> Tuple[Future, bool]:
+        """
+        Returns (future, owner). The owner must compute the value and call resolve() or fail();
+        everyone else waits on future.result().
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._futures[key] = future
+            return future, True
+
+    def resolve(self, key: Hashable, value: Any):
+        with self._lock:
+            future = self._futures[key] if self.keep_results else self._futures.pop(key)
+        future.set_result(value)
+
+    def fail(self, key: Hashable, error: BaseException):
+        # Failures are never memoized, so a later caller retries
+        with self._lock:
+            future = self._futures.pop(key)
+        future.set_exception(error)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        future, owner = self.claim(key)
+        if not owner:
+            return future.result()
+        try:
+            value = fn()
+        except BaseException as err:
+            self.fail(key, err)
+            raise
+        self.resolve(key, value)
+        return value
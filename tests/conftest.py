@@ -0,0 +1,13 @@
+import pytest
+
+from lunchgenie import http_transport, rate_limiter
+
+@pytest.fixture
+def private_http(monkeypatch):
+    """
+    A fresh process-wide transport and rate limiter for the test, kept in memory
+    (no SQLite file in the working directory) and dropped afterwards.
+    """
+    monkeypatch.setenv("RATE_LIMIT_PATH", "")
+    monkeypatch.setattr(http_transport, "_transport", None)
+    monkeypatch.setattr(rate_limiter, "_limiter", None)
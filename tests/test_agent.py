@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+
+import pytest
+
+from benchmarks.stub_servers import StubSettings, start_stubs
+from lunchgenie.agent import Agent
+from lunchgenie.config import Config
+from lunchgenie.rate_limiter import CircuitOpenError, RateLimiter
+
+@pytest.fixture
+def stub_env(monkeypatch, tmp_path, private_http):
+    """Points Config at local stub services, with every on-disk cache off or in tmp_path."""
+    started = []
+
+    def start(**settings):
+        stubs = start_stubs(StubSettings(latency_ms=1, jitter_ms=0, llm_latency_ms=1, **settings))
+        started.append(stubs)
+        env = dict(stubs.env(), RESTAURANT_PROVIDER="yelp", ANALYSIS_CACHE_PATH="", SEARCH_CACHE_PATH="",
+                   REVIEW_CACHE_PATH="", RATE_LIMIT_PATH="", CATALOG_PATH=str(tmp_path / "catalog"),
+                   DEFAULT_LATITUDE="-37.816375", DEFAULT_LONGITUDE="144.960934", RECOMMEND_DEADLINE="0")
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return stubs
+
+    yield start
+    for stubs in started:
+        stubs.stop()
+
+def _agent():
+    agent = Agent(Config(env_path=os.devnull))
+    # A private limiter, so tests never share breaker state with each other
+    agent.review_ai.rate_limiter = RateLimiter()
+    return agent
+
+def test_open_llm_circuit_is_reported_not_raised(stub_env):
+    stub_env()
+    agent = _agent()
+    agent.review_ai.rate_limiter = RateLimiter(failure_threshold=1)
+    agent.review_ai.rate_limiter.report("openai", 503)
+    result = agent.recommend_lunch_places()
+    assert isinstance(result, str)
+    assert result.startswith("Review analysis unavailable")
+
+def test_streaming_raises_rate_limit_errors(stub_env):
+    stub_env()
+    agent = _agent()
+    agent.review_ai.rate_limiter = RateLimiter(failure_threshold=1)
+    agent.review_ai.rate_limiter.report("openai", 503)
+    with pytest.raises(CircuitOpenError):
+        list(agent.iter_lunch_places())
+
+def test_catalog_results_are_review_checked(stub_env, monkeypatch):
+    stubs = stub_env(red_flag_rate=1.0)
+    monkeypatch.setenv("RESTAURANT_PROVIDER", "catalog")
+    monkeypatch.setenv("CATALOG_SOURCE", "yelp")
+    agent = _agent()
+    # Every stub restaurant has a red-flag review, so nothing may be recommended
+    assert not agent.recommend_lunch_places()
+    counts = stubs.call_counts()
+    assert counts.get("yelp.reviews", 0) > 0
+    assert counts.get("openai.chat", 0) > 0
+
+def test_catalog_serves_repeat_searches_locally(stub_env, monkeypatch):
+    stubs = stub_env()
+    monkeypatch.setenv("RESTAURANT_PROVIDER", "catalog")
+    agent = _agent()
+    first = agent.recommend_lunch_places()
+    stubs.reset_counts()
+    second = _agent().recommend_lunch_places()
+    assert [p["name"] for p in first] == [p["name"] for p in second]
+    assert stubs.call_counts().get("yelp.search", 0) == 0
+
+def test_first_place_streams_before_the_rest_of_its_wave_is_analyzed(stub_env):
+    stub_env()
+    agent = _agent()
+    release = threading.Event()
+
+    def analyze(entries, deadline=None):
+        if len(entries) > 1:
+            release.wait(5)
+        return [(entry, {"safe": True, "summary": "ok"}) for entry in entries]
+
+    agent._analyze_uncached = analyze
+    places = agent.iter_lunch_places(top_k=3)
+    started = time.monotonic()
+    first = next(places)
+    assert time.monotonic() - started < 2.0
+    assert not release.is_set()
+    release.set()
+    rest = list(places)
+    assert [p["name"] for p in [first] + rest] == [p["name"] for p in agent.recommend_lunch_places(top_k=3)]
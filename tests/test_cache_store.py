@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from lunchgenie import cache_store
+from lunchgenie.cache_store import BackgroundRefresher, CacheStore
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_store.time, "time", clock)
+    return clock
+
+def test_get_returns_stored_value(clock):
+    store = CacheStore(ttl_seconds=60)
+    store.set("k", {"safe": True})
+    assert store.get("k") == {"safe": True}
+    assert store.get("missing") is None
+
+def test_entries_expire_after_ttl(clock):
+    store = CacheStore(ttl_seconds=60)
+    store.set("k", "v")
+    clock.now += 59
+    assert store.get_with_age("k") == ("v", 59)
+    clock.now += 2
+    assert store.get("k") is None
+
+def test_expired_entries_are_evicted_on_set(clock):
+    store = CacheStore(ttl_seconds=60)
+    store.set("old", 1)
+    clock.now += 61
+    store.set("new", 2)
+    assert len(store) == 1
+    assert store.evictions == 1
+
+def test_least_recently_used_entry_is_evicted(clock):
+    store = CacheStore(ttl_seconds=3600, max_entries=2)
+    store.set("a", 1)
+    clock.now += 1
+    store.set("b", 2)
+    clock.now += 1
+    store.get("a")  # a is now more recently used than b
+    clock.now += 1
+    store.set("c", 3)
+    assert store.get("b") is None
+    assert store.get("a") == 1
+    assert store.get("c") == 3
+
+def test_hit_and_miss_counters(clock):
+    store = CacheStore()
+    store.set("k", "v")
+    store.get("k")
+    store.get("k")
+    store.get("missing")
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+def test_namespaces_share_a_file_without_mixing(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    CacheStore(path, namespace="one").set("k", 1)
+    assert CacheStore(path, namespace="two").get("k") is None
+    assert CacheStore(path, namespace="one").get("k") == 1
+
+def test_invalid_namespace_is_rejected():
+    with pytest.raises(ValueError):
+        CacheStore(namespace="bad-name; DROP")
+
+def test_background_refresher_runs_one_refresh_per_key():
+    refresher = BackgroundRefresher()
+    release = threading.Event()
+    done = threading.Event()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        release.wait(5)
+        done.set()
+
+    assert refresher.submit("k", refresh) is True
+    assert refresher.submit("k", refresh) is False
+    release.set()
+    assert done.wait(5)
+    assert calls == [1]
+
+def test_background_refresher_allows_a_new_refresh_after_failure():
+    refresher = BackgroundRefresher()
+    failed = threading.Event()
+
+    def refresh():
+        failed.set()
+        raise RuntimeError("upstream down")
+
+    assert refresher.submit("k", refresh)
+    assert failed.wait(5)
+    for _ in range(100):
+        if "k" not in refresher._refreshing:
+            break
+        time.sleep(0.01)
+    assert refresher.submit("k", lambda: None) is True
@@ -0,0 +1,73 @@
+import time
+
+from lunchgenie.cache_store import CacheStore
+from lunchgenie.deadline import Deadline
+from lunchgenie.restaurant_provider import RestaurantProvider
+from lunchgenie.restaurant_provider.cached_provider import CachedProvider
+from lunchgenie.restaurant_provider.multi_provider import MultiProvider
+
+CBD = (-37.8164, 144.9609)
+
+def _place(name, lat=CBD[0], lon=CBD[1], **fields):
+    return dict(name=name, id=name, latitude=lat, longitude=lon, rating=4.5, review_count=10, **fields)
+
+class FakeProvider(RestaurantProvider):
+    """Answers with its places; under a deadline shorter than slow_seconds only the first arrives in time."""
+
+    def __init__(self, places, slow_seconds=0.0):
+        self.places = places
+        self.slow_seconds = slow_seconds
+        self.calls = 0
+
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
+        self.calls += 1
+        if deadline is not None and deadline.remaining() < self.slow_seconds:
+            time.sleep(deadline.remaining())
+            return [dict(self.places[0])]
+        time.sleep(self.slow_seconds)
+        return [dict(p) for p in self.places]
+
+class Straggler(FakeProvider):
+    """Ignores the deadline and answers after slow_seconds."""
+
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
+        return super().search_restaurants(query, location, criteria, latitude, longitude)
+
+def _cached(provider):
+    return CachedProvider(provider, CacheStore(), name="fake")
+
+def _names(results):
+    return sorted(r["name"] for r in results)
+
+def _search(provider, deadline=None, location="", latitude=CBD[0], longitude=CBD[1], radius=1000):
+    return provider.search_restaurants("lunch", location, {"radius": radius, "categories": "indian,thai"},
+                                       latitude=latitude, longitude=longitude, deadline=deadline)
+
+def test_results_cut_short_by_the_deadline_are_not_cached():
+    upstream = FakeProvider([_place("indian"), _place("thai")], slow_seconds=0.5)
+    cached = _cached(upstream)
+    assert _names(_search(cached, Deadline(0.1))) == ["indian"]
+    assert _names(_search(cached)) == ["indian", "thai"]
+    assert upstream.calls == 2
+
+def test_complete_results_are_cached():
+    upstream = FakeProvider([_place("indian"), _place("thai")])
+    cached = _cached(upstream)
+    _search(cached, Deadline(5.0))
+    assert _names(_search(cached)) == ["indian", "thai"]
+    assert upstream.calls == 1
+
+def test_provider_dropped_by_the_multi_deadline_is_not_cached():
+    fast = FakeProvider([_place("indian")])
+    slow = Straggler([_place("thai", lat=CBD[0] + 0.001)], slow_seconds=1.0)
+    cached = _cached(MultiProvider(providers={"fast": fast, "slow": slow}, deadline_seconds=0.2, match_distance_m=50))
+    assert _names(_search(cached)) == ["indian"]
+    slow.slow_seconds = 0.0
+    assert _names(_search(cached)) == ["indian", "thai"]
+
+def test_text_location_results_are_filtered_to_the_requested_radius():
+    upstream = FakeProvider([_place("near", distance_m=500), _place("edge", distance_m=950), _place("unknown")])
+    cached = _cached(upstream)
+    assert _names(_search(cached, location="Melbourne", latitude=None, longitude=None, radius=900)) == ["near", "unknown"]
+    assert _names(_search(cached, location="Melbourne", latitude=None, longitude=None, radius=1000)) == ["edge", "near", "unknown"]
+    assert upstream.calls == 1
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from lunchgenie.restaurant_provider import RestaurantProvider
+from lunchgenie.restaurant_provider.catalog_provider import CatalogProvider
+
+CBD = (-37.8164, 144.9609)
+SUBURB = (-37.8500, 145.0000)
+
+class SlowSource(RestaurantProvider):
+    name = "yelp"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.lock = threading.Lock()
+
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
+        with self.lock:
+            self.calls += 1
+        self.release.wait(5)
+        time.sleep(self.delay)
+        return [{"id": f"{latitude:.4f}-{i}", "name": f"Place {i}", "latitude": latitude + i * 1e-4,
+                 "longitude": longitude, "rating": 4.5, "review_count": 10, "categories": ["Thai"]}
+                for i in range(3)]
+
+def _search(provider, point):
+    return provider.search_restaurants("lunch", "", {"radius": 500, "categories": "thai"},
+                                       latitude=point[0], longitude=point[1])
+
+def test_refreshed_entries_carry_their_source_ids(tmp_path):
+    provider = CatalogProvider(None, source=SlowSource(), path=str(tmp_path), max_age_seconds=3600)
+    results = _search(provider, CBD)
+    assert len(results) == 3
+    assert all(r["source"] == "yelp" and r["source_ids"] == {"yelp": r["id"]} for r in results)
+
+def test_covered_search_does_not_wait_for_a_refresh(tmp_path):
+    source = SlowSource()
+    provider = CatalogProvider(None, source=source, path=str(tmp_path), max_age_seconds=3600)
+    _search(provider, CBD)
+    source.release.clear()
+    refresh = threading.Thread(target=_search, args=(provider, SUBURB))
+    refresh.start()
+    try:
+        deadline = time.monotonic() + 5
+        while source.calls < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        started = time.monotonic()
+        assert len(_search(provider, CBD)) == 3
+        assert time.monotonic() - started < 1.0
+    finally:
+        source.release.set()
+        refresh.join(5)
+
+def test_concurrent_searches_of_a_region_share_one_refresh(tmp_path):
+    source = SlowSource(delay=0.2)
+    provider = CatalogProvider(None, source=source, path=str(tmp_path), max_age_seconds=3600)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_search(provider, CBD))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert source.calls == 1
+    assert [len(r) for r in results] == [3] * 4
+
+def test_snapshot_is_shared_with_new_instances(tmp_path):
+    _search(CatalogProvider(None, source=SlowSource(), path=str(tmp_path), max_age_seconds=3600), CBD)
+    second = SlowSource()
+    assert len(_search(CatalogProvider(None, source=second, path=str(tmp_path), max_age_seconds=3600), CBD)) == 3
+    assert second.calls == 0
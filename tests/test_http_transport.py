@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lunchgenie.deadline import Deadline
+from lunchgenie.http_transport import HttpTransport
+from lunchgenie.rate_limiter import RateLimiter, RateLimitError
+
+class ScriptedServer(ThreadingHTTPServer):
+    """Answers each request with the next (status, headers, delay seconds) of a script."""
+
+    daemon_threads = True
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = 0
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), ScriptedHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            status, headers, delay = server.script[min(server.requests, len(server.script) - 1)]
+            server.requests += 1
+        time.sleep(delay)
+        data = json.dumps({"status": status}).encode("utf-8")
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass  # the client gave up
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(*script):
+        server = ScriptedServer(script)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def _transport(server, limiter=None, **kwargs):
+    host = server.url.split("/")[2]
+    return HttpTransport(limiter=limiter, upstreams={host: "yelp"} if limiter else None, **kwargs)
+
+def test_429_is_retried_after_the_limiter_pause(serve):
+    server = serve((429, {"Retry-After": "0.3"}, 0), (200, {}, 0))
+    limiter = RateLimiter()
+    http = _transport(server, limiter)
+    started = time.monotonic()
+    resp = http.get(server.url, timeout=5)
+    assert resp.status_code == 200
+    assert server.requests == 2
+    assert time.monotonic() - started >= 0.3
+
+def test_429_reaches_the_shared_limiter(serve):
+    server = serve((429, {"Retry-After": "5"}, 0))
+    limiter = RateLimiter(max_wait_seconds=0.5)
+    http = _transport(server, limiter)
+    # The first 429 blocks the bucket for everyone; the retry cannot wait that long
+    with pytest.raises(RateLimitError):
+        http.get(server.url, timeout=5)
+    assert server.requests == 1
+    assert limiter.state("yelp")["blocked_until"] > time.time() + 4
+
+def test_429_without_limiter_is_retried_after_retry_after(serve):
+    server = serve((429, {"Retry-After": "0.2"}, 0), (200, {}, 0))
+    http = _transport(server)
+    assert http.get(server.url, timeout=5).status_code == 200
+    assert server.requests == 2
+
+def test_429_retries_are_bounded(serve):
+    server = serve((429, {"Retry-After": "0"}, 0))
+    http = _transport(server, max_retries=2)
+    assert http.get(server.url, timeout=5).status_code == 429
+    assert server.requests == 3
+
+def test_timeout_cut_short_by_the_deadline_is_not_a_breaker_failure(serve):
+    server = serve((200, {}, 1.0))
+    limiter = RateLimiter(failure_threshold=1)
+    http = _transport(server, limiter, max_retries=0)
+    with pytest.raises(Exception):
+        http.get(server.url, timeout=5, deadline=Deadline(0.2))
+    assert limiter.state("yelp")["failures"] == 0
+    limiter.acquire("yelp")
+
+def test_upstream_timeout_without_deadline_is_a_breaker_failure(serve):
+    server = serve((200, {}, 1.0))
+    limiter = RateLimiter(failure_threshold=1)
+    http = _transport(server, limiter, max_retries=0)
+    with pytest.raises(Exception):
+        http.get(server.url, timeout=0.2)
+    assert limiter.state("yelp")["failures"] == 1
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_beyond_the_deadline_is_not_waited_for(serve, status):
+    server = serve((status, {"Retry-After": "4"}, 0), (200, {}, 0))
+    http = _transport(server)
+    started = time.monotonic()
+    assert http.get(server.url, timeout=5, deadline=Deadline(1.0)).status_code == status
+    assert time.monotonic() - started < 0.5
+    assert server.requests == 1
+
+def test_5xx_is_retried_after_backoff(serve):
+    server = serve((503, {}, 0), (502, {}, 0), (200, {}, 0))
+    http = _transport(server, backoff_factor=0.01)
+    assert http.get(server.url, timeout=5).status_code == 200
+    assert server.requests == 3
+
+def test_read_timeout_is_retried_within_the_deadline(serve):
+    server = serve((200, {}, 1.0), (200, {}, 0))
+    http = _transport(server, backoff_factor=0.01)
+    assert http.get(server.url, timeout=0.2, deadline=Deadline(2.0)).status_code == 200
+    assert server.requests == 2
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_budget import HEAVY_MODULES, LIGHT_ENTRY_POINTS, _eager_heavy_imports, _unexpected_help_imports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(autouse=True)
+def project_root(monkeypatch):
+    # The checks run in fresh interpreters, which must find the lunchgenie package
+    monkeypatch.chdir(ROOT)
+
+@pytest.mark.parametrize("module", LIGHT_ENTRY_POINTS)
+def test_entry_point_does_not_import_heavy_modules(module):
+    assert _eager_heavy_imports(module) == []
+
+def test_cli_help_imports_no_third_party_packages():
+    # Counting modules rather than timing start-up keeps the check exact on busy machines
+    assert _unexpected_help_imports() == []
+
+def test_agent_construction_does_not_import_heavy_modules():
+    code = (
+        "import os, sys\n"
+        "from lunchgenie.agent import Agent\n"
+        "from lunchgenie.config import Config\n"
+        "Agent(Config(env_path=os.devnull))\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    env = dict(os.environ, OPENAI_API_KEY="test-key", YELP_API_KEY="test-key", RESTAURANT_PROVIDER="yelp",
+               RATE_LIMIT_PATH="", ANALYSIS_CACHE_PATH="", SEARCH_CACHE_PATH="", REVIEW_CACHE_PATH="")
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True, env=env)
+    assert out.stdout.strip() == ""
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from lunchgenie.deadline import Deadline, DeadlineExceeded
+from lunchgenie.restaurant_provider import RestaurantProvider
+from lunchgenie.restaurant_provider.multi_provider import MultiProvider
+
+class FakeProvider(RestaurantProvider):
+    def __init__(self, results=(), delay=0.0):
+        self.results = list(results)
+        self.delay = delay
+        self.deadlines = []
+        self.finished = threading.Event()
+
+    def search_restaurants(self, query, location, criteria, latitude=None, longitude=None, deadline=None):
+        self.deadlines.append(deadline)
+        try:
+            # Honours the deadline like the real plugins do
+            if deadline is not None and deadline.remaining() < self.delay:
+                time.sleep(deadline.remaining())
+                raise DeadlineExceeded("too slow")
+            time.sleep(self.delay)
+            return [dict(r) for r in self.results]
+        finally:
+            self.finished.set()
+
+def _place(name, lat=-37.8, lon=144.96, **fields):
+    return dict(name=name, latitude=lat, longitude=lon, rating=4.5, review_count=10, id=name, **fields)
+
+def _search(multi, deadline=None):
+    return multi.search_restaurants("lunch", "", {}, latitude=-37.8, longitude=144.96, deadline=deadline)
+
+def test_members_get_the_shared_deadline_without_a_caller_deadline():
+    provider = FakeProvider([_place("A")])
+    multi = MultiProvider(providers={"a": provider}, deadline_seconds=2.0, match_distance_m=100)
+    _search(multi)
+    (deadline,) = provider.deadlines
+    assert isinstance(deadline, Deadline)
+    assert 0 < deadline.remaining() <= 2.0
+
+def test_members_get_the_shorter_of_both_deadlines():
+    provider = FakeProvider([_place("A")])
+    multi = MultiProvider(providers={"a": provider}, deadline_seconds=5.0, match_distance_m=100)
+    _search(multi, Deadline(0.5))
+    assert provider.deadlines[0].seconds <= 0.5
+
+def test_late_provider_is_skipped_and_stops_at_the_deadline():
+    fast = FakeProvider([_place("Fast")])
+    slow = FakeProvider([_place("Slow")], delay=30.0)
+    multi = MultiProvider(providers={"fast": fast, "slow": slow}, deadline_seconds=0.3, match_distance_m=100)
+    started = time.monotonic()
+    results = _search(multi)
+    assert [r["name"] for r in results] == ["Fast"]
+    assert time.monotonic() - started < 2.0
+    # The straggler gives up around the deadline instead of holding its worker
+    assert slow.finished.wait(2.0)
+
+def test_duplicate_listings_are_merged():
+    a = FakeProvider([_place("The Laksa King", reviews=["good"])])
+    b = FakeProvider([_place("Laksa King Restaurant", lat=-37.80001, reviews=["great"])])
+    multi = MultiProvider(providers={"a": a, "b": b}, deadline_seconds=2.0, match_distance_m=100)
+    (merged,) = _search(multi)
+    assert merged["source_ids"] == {"a": "The Laksa King", "b": "Laksa King Restaurant"}
+    assert merged["reviews"] == ["good", "great"]
@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from lunchgenie.ranking import Ranker, cuisine_match, top_k_indices
+
+def _candidates(n, seed=7):
+    rng = random.Random(seed)
+    return [{
+        "name": f"Place {i}",
+        "rating": rng.choice([3.5, 4.0, 4.5, 4.5, 5.0]),
+        "review_count": rng.randint(1, 2000),
+        "distance_m": rng.randint(0, 1500),
+        "categories": [rng.choice(["Thai", "Indian", "Chinese"])],
+    } for i in range(n)]
+
+def test_top_k_indices_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+    assert top_k_indices(scores, 2).tolist() == [1, 3]
+
+def test_top_k_indices_keeps_input_order_for_ties():
+    scores = np.array([1.0, 2.0, 1.0, 2.0, 1.0, 2.0])
+    assert top_k_indices(scores, 6).tolist() == [1, 3, 5, 0, 2, 4]
+
+def test_top_k_indices_ties_at_the_kth_place_are_stable():
+    scores = np.array([3.0, 1.0, 2.0, 1.0, 2.0, 2.0])
+    # Three candidates tie for 2nd place; the first two in input order win
+    assert top_k_indices(scores, 3).tolist() == [0, 2, 4]
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_top_k_indices_empty_for_non_positive_k(k):
+    assert top_k_indices(np.array([1.0, 2.0]), k).tolist() == []
+
+def test_top_k_indices_k_beyond_length_returns_all():
+    assert top_k_indices(np.array([1.0, 3.0, 2.0]), 10).tolist() == [1, 2, 0]
+
+@pytest.mark.parametrize("k", [1, 5, 37, 200])
+def test_default_weights_match_stable_sort_by_rating(k):
+    candidates = _candidates(200)
+    expected = sorted(candidates, key=lambda c: c["rating"], reverse=True)[:k]
+    assert Ranker().top_k(candidates, k) == expected
+
+def test_iter_ranked_matches_full_stable_sort():
+    candidates = _candidates(100)
+    expected = sorted(candidates, key=lambda c: c["rating"], reverse=True)
+    assert list(Ranker().iter_ranked(candidates, first=3)) == expected
+
+def test_missing_ratings_rank_last():
+    candidates = [{"name": "a"}, {"name": "b", "rating": 4.0}, {"name": "c", "rating": None}]
+    assert [c["name"] for c in Ranker().top_k(candidates, 3)] == ["b", "a", "c"]
+
+def test_prior_pulls_sparse_ratings_towards_the_mean():
+    candidates = [{"name": "few", "rating": 5.0, "review_count": 3},
+                  {"name": "many", "rating": 4.7, "review_count": 2000}]
+    ranker = Ranker(prior_count=50, prior_mean=3.5)
+    assert [c["name"] for c in ranker.top_k(candidates, 2)] == ["many", "few"]
+
+def test_cuisine_match_checks_name_and_categories():
+    candidates = [{"name": "Thai Palace", "categories": []},
+                  {"name": "Curry House", "categories": ["Indian"]},
+                  {"name": "Burger Bar", "categories": ["Burgers"]}]
+    assert cuisine_match(candidates, ["thai", "indian"]).tolist() == [1.0, 1.0, 0.0]
+
+def test_cuisine_match_tolerates_missing_names_and_non_string_categories():
+    candidates = [{"name": None, "categories": ["Thai"]},
+                  {"categories": [1, 2]},
+                  {"name": "İstanbul Grill", "categories": ["Turkish"]},
+                  {"name": "Indian Spice"}]
+    assert cuisine_match(candidates, ["thai", "indian"]).tolist() == [1.0, 0.0, 0.0, 1.0]
+
+def test_junk_ratings_score_as_zero():
+    candidates = [{"rating": "4.5"}, {"rating": "n/a"}, {"rating": 3}]
+    assert Ranker().score(candidates).tolist() == pytest.approx([0.9, 0.0, 0.6])
+
+def test_weighted_ranking_uses_distance_and_cuisine():
+    candidates = [{"name": "Far Burger", "rating": 4.8, "distance_m": 3000, "categories": ["Burgers"]},
+                  {"name": "Near Thai", "rating": 4.5, "distance_m": 100, "categories": ["Thai"]}]
+    ranker = Ranker(distance_weight=0.3, cuisine_weight=0.2)
+    assert [c["name"] for c in ranker.top_k(candidates, 2, cuisines=["thai"])] == ["Near Thai", "Far Burger"]
@@ -0,0 +1,112 @@
+import pytest
+
+from lunchgenie import rate_limiter
+from lunchgenie.rate_limiter import CircuitOpenError, RateLimiter, RateLimitError, parse_retry_after
+
+class FakeTime:
+    """Stands in for the time module: a clock that only moves when slept or advanced."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+def test_burst_is_served_without_waiting(clock):
+    limiter = RateLimiter(rates={"yelp": (1.0, 3)})
+    for _ in range(3):
+        limiter.acquire("yelp")
+    assert clock.slept == []
+
+def test_empty_bucket_waits_for_the_next_token(clock):
+    limiter = RateLimiter(rates={"yelp": (2.0, 1)})
+    limiter.acquire("yelp")
+    limiter.acquire("yelp")
+    assert clock.slept == [pytest.approx(0.5)]
+
+def test_tokens_refill_over_time(clock):
+    limiter = RateLimiter(rates={"yelp": (1.0, 2)})
+    limiter.acquire("yelp")
+    limiter.acquire("yelp")
+    clock.now += 2
+    assert limiter.state("yelp")["tokens"] == pytest.approx(2)
+
+def test_wait_beyond_max_wait_raises(clock):
+    limiter = RateLimiter(rates={"yelp": (0.1, 1)}, max_wait_seconds=30)
+    limiter.acquire("yelp")
+    with pytest.raises(RateLimitError):
+        limiter.acquire("yelp", max_wait=1.0)
+
+def test_upstream_without_rate_is_not_limited(clock):
+    limiter = RateLimiter()
+    for _ in range(100):
+        limiter.acquire("google")
+    assert clock.slept == []
+
+def test_429_blocks_the_upstream_for_retry_after(clock):
+    limiter = RateLimiter(rates={"yelp": (100.0, 10)})
+    limiter.report("yelp", 429, retry_after="3")
+    limiter.acquire("yelp")
+    assert sum(clock.slept) >= 3
+
+def test_429_without_retry_after_uses_the_default(clock):
+    limiter = RateLimiter(default_retry_after=5.0)
+    limiter.report("yelp", 429)
+    assert limiter.state("yelp")["blocked_until"] == pytest.approx(clock.now + 5)
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    limiter = RateLimiter(failure_threshold=3, cooldown_seconds=30)
+    for status in (503, None, 500):
+        limiter.acquire("google")
+        limiter.report("google", status)
+    with pytest.raises(CircuitOpenError):
+        limiter.acquire("google")
+
+def test_success_resets_the_failure_count(clock):
+    limiter = RateLimiter(failure_threshold=3)
+    limiter.report("google", 503)
+    limiter.report("google", 503)
+    limiter.report("google", 200)
+    limiter.report("google", 503)
+    limiter.acquire("google")
+    assert limiter.state("google")["failures"] == 1
+
+def test_breaker_lets_calls_through_after_the_cooldown_and_closes_on_success(clock):
+    limiter = RateLimiter(failure_threshold=1, cooldown_seconds=30)
+    limiter.report("google", 503)
+    with pytest.raises(CircuitOpenError):
+        limiter.acquire("google")
+    clock.now += 31
+    limiter.acquire("google")
+    limiter.report("google", 200)
+    state = limiter.state("google")
+    assert (state["failures"], state["open_until"]) == (0, 0.0)
+
+def test_client_errors_do_not_count_as_failures(clock):
+    limiter = RateLimiter(failure_threshold=1)
+    limiter.report("google", 404)
+    limiter.acquire("google")
+
+def test_state_is_shared_through_the_file(clock, tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    RateLimiter(path, failure_threshold=1).report("google", 503)
+    with pytest.raises(CircuitOpenError):
+        RateLimiter(path, failure_threshold=1).acquire("google")
+
+@pytest.mark.parametrize("value, expected", [("2", 2.0), ("-1", 0.0), ("", None), (None, None), ("soon", None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
@@ -0,0 +1,198 @@
+import json
+import os
+import re
+import time
+
+import pytest
+
+from lunchgenie.config import Config
+from lunchgenie.deadline import Deadline, DeadlineExceeded
+from lunchgenie.rate_limiter import RateLimiter
+from lunchgenie.review_analyzer import PARSE_ERROR_VERDICT, ReviewAnalyzer, merge_review_verdicts
+
+class Reply:
+    def __init__(self, content):
+        self.content = content
+
+class FakeLLM:
+    def __init__(self, content='{"red_flags": [], "safe": true, "summary": "ok"}', delay=0.0, error=None):
+        self.content = content
+        self.delay = delay
+        self.error = error
+        self.prompts = []
+
+    def invoke(self, prompt, timeout=None):
+        self.prompts.append(prompt)
+        time.sleep(self.delay if timeout is None else min(self.delay, timeout))
+        if self.error is not None:
+            raise self.error
+        return Reply(self.content)
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    for name in ("ANALYSIS_CACHE_PATH", "RATE_LIMIT_PATH"):
+        monkeypatch.setenv(name, "")
+    monkeypatch.setenv("REVIEW_PRESCREEN", "false")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    analyzer = ReviewAnalyzer(Config(env_path=os.devnull))
+    analyzer.rate_limiter = RateLimiter(failure_threshold=1)
+    return analyzer
+
+def test_llm_timeout_at_the_deadline_raises_deadline_exceeded_not_a_breaker_failure(analyzer):
+    analyzer.llm = FakeLLM(delay=1.0, error=TimeoutError("request timed out"))
+    with pytest.raises(DeadlineExceeded):
+        analyzer.detect_red_flags(["Nice food."], deadline=Deadline(0.1))
+    assert analyzer.rate_limiter.state("openai")["failures"] == 0
+
+def test_llm_failure_without_deadline_is_a_breaker_failure(analyzer):
+    analyzer.llm = FakeLLM(error=ConnectionError("connection refused"))
+    with pytest.raises(ConnectionError):
+        analyzer.detect_red_flags(["Nice food."])
+    assert analyzer.rate_limiter.state("openai")["failures"] == 1
+
+def test_llm_error_before_the_deadline_is_raised_as_is(analyzer):
+    analyzer.llm = FakeLLM(error=ConnectionError("connection refused"))
+    with pytest.raises(ConnectionError):
+        analyzer.detect_red_flags(["Nice food."], deadline=Deadline(5.0))
+
+def test_unparseable_answer_is_not_cached_as_a_verdict(analyzer):
+    analyzer.llm = FakeLLM(content="not json")
+    verdict = analyzer.detect_red_flags(["Nice food."])
+    assert verdict["safe"] is False
+    assert "parse error" in verdict["summary"]
+
+class FakeJudge:
+    """Judges single reviews ("Review V1:" sections): flags those mentioning a cockroach."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt, timeout=None):
+        self.prompts.append(prompt)
+        sections = re.findall(r"Review (V\d+):\n(.*?)(?=\n\nReview V|\Z)", prompt, re.S)
+        return Reply(json.dumps({
+            label: {"flagged": "cockroach" in text.lower(),
+                    "quote": text.strip() if "cockroach" in text.lower() else "",
+                    "issue": "pests" if "cockroach" in text.lower() else ""}
+            for label, text in sections
+        }))
+
+@pytest.fixture
+def incremental(monkeypatch, tmp_path):
+    monkeypatch.setenv("ANALYSIS_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("RATE_LIMIT_PATH", "")
+    monkeypatch.setenv("REVIEW_PRESCREEN", "false")
+    monkeypatch.setenv("ANALYSIS_INCREMENTAL", "true")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    analyzer = ReviewAnalyzer(Config(env_path=os.devnull))
+    analyzer.rate_limiter = RateLimiter()
+    analyzer.llm = FakeJudge()
+    return analyzer
+
+def test_incremental_analysis_is_off_by_default(monkeypatch, tmp_path):
+    monkeypatch.setenv("ANALYSIS_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("ANALYSIS_INCREMENTAL", raising=False)
+    assert ReviewAnalyzer(Config(env_path=os.devnull)).review_store is None
+
+def test_only_a_new_review_goes_to_the_llm(incremental):
+    clean = ["Great laksa.", "Friendly staff."]
+    assert incremental.detect_red_flags(clean, restaurant_id="yelp:1")["safe"]
+    verdict = incremental.detect_red_flags(["Saw a cockroach by the door."] + clean, restaurant_id="yelp:1")
+    assert len(incremental.llm.prompts) == 2
+    assert "cockroach" in incremental.llm.prompts[1] and "laksa" not in incremental.llm.prompts[1]
+    assert not verdict["safe"]
+    assert verdict["red_flags"] == ["Saw a cockroach by the door."]
+
+def test_removed_reviews_are_dropped_without_an_llm_call(incremental):
+    incremental.detect_red_flags(["Saw a cockroach by the door.", "Great laksa."], restaurant_id="yelp:1")
+    verdict = incremental.detect_red_flags(["Great laksa."], restaurant_id="yelp:1")
+    assert len(incremental.llm.prompts) == 1
+    assert verdict["safe"]
+    assert len(incremental.review_store.get(incremental._store_key("yelp:1"))) == 1
+
+def test_merged_verdict_lists_the_flagged_reviews():
+    verdict = merge_review_verdicts([
+        {"flagged": False, "quote": "", "issue": ""},
+        {"flagged": True, "quote": "Saw a cockroach.", "issue": "pests"},
+        {"flagged": True, "quote": "", "issue": "food poisoning"},
+    ])
+    assert not verdict["safe"]
+    assert verdict["red_flags"] == ["Saw a cockroach.", "food poisoning"]
+    assert verdict["summary"] == "2 of 3 recent reviews raise concerns: pests; food poisoning."
+
+def test_merged_verdict_of_clean_reviews_is_safe():
+    verdict = merge_review_verdicts([{"flagged": False, "quote": "", "issue": ""}] * 2)
+    assert verdict == {"red_flags": [], "safe": True,
+                       "summary": "No red flags found in the 2 most recent reviews; it seems safe."}
+
+class FakeAuditor:
+    """
+    Judges review sets ("Restaurant R1:" sections, or a single "Reviews:" block): unsafe when
+    they mention a cockroach. Sets mentioning a word in omit are left out of multi-restaurant
+    answers; those mentioning a word in garble get an unparseable answer even on their own.
+    """
+
+    def __init__(self, name, omit=(), garble=()):
+        self.name = name
+        self.omit = omit
+        self.garble = garble
+        self.prompts = []
+
+    def _verdict(self, text):
+        unsafe = "cockroach" in text.lower()
+        return {"red_flags": [text.strip()] if unsafe else [], "safe": not unsafe, "summary": f"{self.name} verdict"}
+
+    def invoke(self, prompt, timeout=None):
+        self.prompts.append(prompt)
+        sections = re.findall(r"Restaurant (R\d+):\n(.*?)(?=\n\nRestaurant R|\Z)", prompt, re.S)
+        if sections:
+            return Reply(json.dumps({label: self._verdict(text) for label, text in sections
+                                     if not any(w in text for w in self.omit + self.garble)}))
+        text = prompt.split("Reviews:\n", 1)[1]
+        if any(w in text for w in self.garble):
+            return Reply("not json")
+        return Reply(json.dumps(self._verdict(text)))
+
+@pytest.fixture
+def cascade(monkeypatch):
+    for name in ("ANALYSIS_CACHE_PATH", "RATE_LIMIT_PATH"):
+        monkeypatch.setenv(name, "")
+    monkeypatch.setenv("REVIEW_PRESCREEN", "false")
+    monkeypatch.setenv("ANALYSIS_CASCADE", "true")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    analyzer = ReviewAnalyzer(Config(env_path=os.devnull))
+    analyzer.rate_limiter = RateLimiter()
+    return analyzer
+
+def _models(analyzer, **strong):
+    fast, strong = FakeAuditor("fast"), FakeAuditor("strong", **strong)
+    analyzer._llms[analyzer.fast_model] = fast
+    analyzer._llms[analyzer.strong_model] = strong
+    return fast, strong
+
+def test_cascade_keeps_safe_fast_verdicts(cascade):
+    fast, strong = _models(cascade)
+    verdicts = cascade.detect_red_flags_batch({"a": ["Great laksa."], "b": ["Nice curry."]})
+    assert [v["summary"] for v in verdicts.values()] == ["fast verdict", "fast verdict"]
+    assert all(v["safe"] for v in verdicts.values())
+    assert strong.prompts == []
+
+def test_cascade_escalates_flagged_sets_to_the_strong_model(cascade):
+    fast, strong = _models(cascade)
+    verdicts = cascade.detect_red_flags_batch({"a": ["Saw a cockroach."], "b": ["Nice curry."]})
+    assert (verdicts["a"]["summary"], verdicts["a"]["safe"]) == ("strong verdict", False)
+    assert verdicts["b"]["summary"] == "fast verdict"
+    assert len(strong.prompts) == 1
+
+def test_cascade_retries_strong_entries_missing_from_a_batch_answer(cascade):
+    fast, strong = _models(cascade, omit=("mice",))
+    verdicts = cascade.detect_red_flags_batch({"a": ["Saw a cockroach."], "b": ["A cockroach and mice."]})
+    assert verdicts["b"]["summary"] == "strong verdict"
+    assert len(strong.prompts) == 2
+
+def test_cascade_unparseable_strong_answer_is_a_parse_error(cascade):
+    fast, strong = _models(cascade, garble=("rat",))
+    verdicts = cascade.detect_red_flags_batch({"a": ["Saw a cockroach."], "b": ["A cockroach and a rat."]})
+    assert verdicts["a"]["summary"] == "strong verdict"
+    assert verdicts["b"] == PARSE_ERROR_VERDICT
@@ -0,0 +1,25 @@
+import pytest
+
+from lunchgenie.review_prescreen import ReviewPrescreener
+
+@pytest.mark.parametrize("review", [
+    "My whole family got sick the next day.",
+    "Kitchen looked dirty.",
+    "Found a hair on my plate",
+    "Saw a cockroach near the counter.",
+    "The waiter was rude to us.",
+])
+def test_any_red_flag_term_is_escalated(review):
+    assert not ReviewPrescreener().is_clearly_clean(["Lovely laksa.", review])
+
+def test_clean_reviews_are_cleared():
+    screener = ReviewPrescreener()
+    assert screener.is_clearly_clean(["Lovely laksa, friendly staff.", "Great value lunch special."])
+    assert screener.stats()["cleared"] == 1
+
+def test_strong_terms_outweigh_weak_ones():
+    screener = ReviewPrescreener()
+    assert screener.score(["Food poisoning after the buffet."]) > screener.score(["A bit greasy."]) > 0
+
+def test_terms_match_whole_words_only():
+    assert ReviewPrescreener().score(["Great pesto and a rather illustrious menu."]) == 0
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from lunchgenie.singleflight import SingleFlight
+
+def test_first_claim_owns_the_key():
+    flight = SingleFlight()
+    future, owner = flight.claim("k")
+    other, other_owner = flight.claim("k")
+    assert owner is True
+    assert other_owner is False
+    assert other is future
+
+def test_resolve_wakes_waiters_and_forgets_the_key():
+    flight = SingleFlight()
+    future, _ = flight.claim("k")
+    waiter, _ = flight.claim("k")
+    flight.resolve("k", 42)
+    assert future.result(timeout=1) == 42
+    assert waiter.result(timeout=1) == 42
+    _, owner = flight.claim("k")
+    assert owner is True
+
+def test_keep_results_memoizes_successes():
+    flight = SingleFlight(keep_results=True)
+    flight.claim("k")
+    flight.resolve("k", "value")
+    future, owner = flight.claim("k")
+    assert owner is False
+    assert future.result(timeout=1) == "value"
+
+def test_fail_propagates_and_is_not_memoized():
+    flight = SingleFlight(keep_results=True)
+    future, _ = flight.claim("k")
+    flight.fail("k", RuntimeError("boom"))
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
+    _, owner = flight.claim("k")
+    assert owner is True
+
+class CountingFlight(SingleFlight):
+    def __init__(self, expected_claims):
+        super().__init__()
+        self.expected_claims = expected_claims
+        self.claims = 0
+        self.all_claimed = threading.Event()
+        self._count_lock = threading.Lock()
+
+    def claim(self, key):
+        result = super().claim(key)
+        with self._count_lock:
+            self.claims += 1
+            if self.claims == self.expected_claims:
+                self.all_claimed.set()
+        return result
+
+def test_do_runs_overlapping_calls_once():
+    flight = CountingFlight(expected_claims=4)
+    calls = []
+
+    def work():
+        calls.append(1)
+        flight.all_claimed.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert calls == [1]
+    assert results == ["result"] * 4
+
+def test_do_reraises_for_the_owner():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "retried") == "retried"
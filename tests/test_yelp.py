@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from lunchgenie.config import Config
+from lunchgenie.metrics import metrics
+from tools.base import PluginError
+from tools.yelp import YelpPlugin
+
+class FakeResponse:
+    def __init__(self, status, businesses=()):
+        self.status_code = status
+        self.businesses = list(businesses)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code} error")
+
+    def json(self):
+        return {"businesses": self.businesses}
+
+class FakeTransport:
+    """Answers each category's search with the response scripted for it."""
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    def get(self, url, params=None, **kwargs):
+        return self.answers[params["categories"]]
+
+@pytest.fixture
+def plugin(monkeypatch, private_http):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("YELP_API_KEY", "test-key")
+    metrics.reset()
+    yield YelpPlugin(Config(env_path=os.devnull))
+    metrics.reset()
+
+def _errors(stage):
+    counters, _ = metrics.snapshot()
+    return sum(v for (name, labels), v in counters.items() if name == "errors_total" and ("stage", stage) in labels)
+
+def test_failed_category_is_counted_once_and_the_rest_kept(plugin):
+    plugin.http = FakeTransport({"thai": FakeResponse(200, [{"id": "a", "name": "A", "rating": 4.5}]),
+                                 "indian": FakeResponse(500)})
+    results = plugin.search_restaurants("lunch", criteria={"categories": "thai,indian"})
+    assert [r["id"] for r in results] == ["a"]
+    assert _errors("yelp_search") == 1
+
+def test_every_category_failing_raises(plugin):
+    plugin.http = FakeTransport({"thai": FakeResponse(500)})
+    with pytest.raises(PluginError):
+        plugin.search_restaurants("lunch", criteria={"categories": "thai"})
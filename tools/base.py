@@ -28,7 +28,8 @@ class PluginBase(ABC):
         location: str = '', 
         criteria: Dict[str, Any] = None, 
         latitude: float = None, 
-        longitude: float = None
+        longitude: float = None,
+        deadline=None
     ) -> List[Dict[str, Any]]:
         """
         Query for restaurants given user constraints.
@@ -38,7 +39,9 @@ class PluginBase(ABC):
         :param criteria: Dict of filtering constraints (rating, cuisine, distance, etc.)
         :param latitude: Optional latitude for search center
         :param longitude: Optional longitude for search center
+        :param deadline: Optional lunchgenie.deadline.Deadline capping every request's timeout
         :return: List of restaurant dicts (standard schema with at least name, address, rating, url)
         :raises PluginError: for API/key issues, quota, or validation errors
+        :raises DeadlineExceeded: when the deadline passes before the search completes
         """
         pass
@@ -2,15 +2,20 @@
 GooglePlacesPlugin: Fetch restaurants from Google Places API and filter results to match LunchGenie's expected output schema.
 """
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Any, Optional
-import requests
 import os
+import time
 
 from lunchgenie.config import Config
+from lunchgenie.deadline import DeadlineExceeded, remaining
+from lunchgenie.http_transport import get_transport
+from lunchgenie.location_utils import haversine_m
+from lunchgenie.metrics import metrics
 from tools.base import PluginBase, PluginError
 
-GOOGLE_PLACES_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-GOOGLE_PLACES_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+GOOGLE_PLACES_SEARCH_PATH = "/maps/api/place/nearbysearch/json"
+GOOGLE_PLACES_DETAILS_PATH = "/maps/api/place/details/json"
 
 class GooglePlacesPlugin(PluginBase):
     @property
@@ -22,6 +27,38 @@ class GooglePlacesPlugin(PluginBase):
         self.api_key = self.config.google_places_api_key or os.getenv("GOOGLE_PLACES_API_KEY")
         if not self.api_key:
             raise PluginError("Missing Google Places API key in config/environment.")
+        self.details_concurrency = max(1, self.config.google_details_concurrency)
+        self.max_pages = max(1, self.config.google_max_pages)
+        self.max_details = max(1, self.config.google_max_details)
+        self.page_token_delay = self.config.google_page_token_delay
+        # Shared pooled keep-alive transport (size HTTP_POOL_MAXSIZE >= the Details concurrency)
+        self.http = get_transport(self.config)
+        self.search_url = self.config.google_places_api_base_url + GOOGLE_PLACES_SEARCH_PATH
+        self.details_url = self.config.google_places_api_base_url + GOOGLE_PLACES_DETAILS_PATH
+
+    def _fetch_details(self, place_id: str, deadline=None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch Place Details for one place; returns {} on any failure, or None when the
+        deadline passed first.
+        """
+        detail_params = {
+            "key": self.api_key,
+            "place_id": place_id,
+            # Rating, counts, types and geometry come from nearbysearch
+            "fields": "name,reviews,formatted_address,url"
+        }
+        try:
+            with metrics.span("google_details"):
+                detail_resp = self.http.get(self.details_url, params=detail_params, timeout=7, deadline=deadline)
+                detail_resp.raise_for_status()
+                detail_data = detail_resp.json()
+            detail_status = detail_data.get("status")
+            if detail_status != "OK":
+                metrics.inc("errors_total", stage="google_details")
+                return {}
+            return detail_data.get("result", {})
+        except Exception:
+            return None if deadline is not None and deadline.expired() else {}
 
     def search_restaurants(
         self,
@@ -29,10 +66,14 @@ class GooglePlacesPlugin(PluginBase):
         location: str = "",
         criteria: Dict[str, Any] = None,
         latitude: float = None,
-        longitude: float = None
+        longitude: float = None,
+        deadline=None
     ) -> List[Dict[str, Any]]:
         """
         Search for restaurants with Google Places API. Supports searching by lat/lng or text location.
+        criteria may set 'limit', the maximum number of places (and Details calls) returned.
+        With a deadline, further pages are skipped when there is no time left for them, and
+        places whose Details have not arrived by the deadline are dropped.
         """
         criteria = criteria or {}
         # Determine coordinates
@@ -62,31 +103,6 @@ class GooglePlacesPlugin(PluginBase):
             cuisine_query = categories.replace(",", " ")
             params["keyword"] = f"{params['keyword']} {cuisine_query}".strip()
 
-        try:
-            resp = requests.get(GOOGLE_PLACES_SEARCH_URL, params=params, timeout=7)
-            resp.raise_for_status()
-            data = resp.json()
-            status = data.get("status")
-            if status != "OK":
-                message = data.get("error_message", "")
-                raise PluginError(f"Google Places API error: {status}. {message}")
-            places = data.get("results", [])
-        except Exception as e:
-            raise PluginError(f"Google Places API request failed: {e}")
-
-        import math
-
-        # Helper: Haversine distance
-        def haversine(lat1, lon1, lat2, lon2):
-            R = 6371000  # meters
-            phi1, phi2 = math.radians(lat1), math.radians(lat2)
-            d_phi = math.radians(lat2 - lat1)
-            d_lambda = math.radians(lon2 - lon1)
-            a = (math.sin(d_phi / 2) ** 2 +
-                 math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-            return R * c
-
         # Parse center point for distance calculation
         if latitude is not None and longitude is not None:
             center_lat = float(latitude)
@@ -94,54 +110,120 @@ class GooglePlacesPlugin(PluginBase):
         else:
             center_lat, center_lon = -37.816375, 144.960934  # Default CBD Melbourne
 
+        # Candidates are filtered on the nearbysearch payload; Details are fetched only for
+        # the best-rated survivors, up to the details limit
+        limit = int(criteria.get("limit") or self.max_details)
+        survivors = []
+        for page in self._iter_candidate_pages(params, center_lat, center_lon, radius, min_rating, deadline):
+            survivors.extend(page)
+            if len(survivors) >= limit:
+                break
+        survivors.sort(key=lambda c: c[0].get("rating", 0), reverse=True)
+        survivors = survivors[:limit]
+
+        # Get Place details for more info (address, url, reviews, etc.) concurrently
+        place_ids = [p.get("place_id") for p, _, _, _ in survivors]
+        workers = min(self.details_concurrency, len(place_ids))
+        if workers > 1:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            futures = [pool.submit(self._fetch_details, place_id, deadline) for place_id in place_ids]
+            # Stragglers still running at the deadline are abandoned
+            wait(futures, timeout=remaining(deadline))
+            pool.shutdown(wait=False, cancel_futures=True)
+            details = [f.result() if f.done() and not f.cancelled() else None for f in futures]
+        else:
+            details = [
+                None if deadline is not None and deadline.expired() else self._fetch_details(place_id, deadline)
+                for place_id in place_ids
+            ]
+
         results = []
-        for p in places:
-            rating = p.get('rating', 0)
-            if rating < min_rating:
+        for (p, distance, lat2, lon2), place_id, detail in zip(survivors, place_ids, details):
+            if detail is None:
+                metrics.inc("errors_total", stage="google_details_deadline")
                 continue
-            place_id = p.get("place_id")
-            # Get Place details for more info (address, url, reviews, etc.)
-            detail_params = {
-                "key": self.api_key,
-                "place_id": place_id,
-                "fields": "name,rating,user_ratings_total,reviews,formatted_address,geometry,url,types"
-            }
-            try:
-                detail_resp = requests.get(GOOGLE_PLACES_DETAILS_URL, params=detail_params, timeout=7)
-                detail_resp.raise_for_status()
-                detail_data = detail_resp.json()
-                detail_status = detail_data.get("status")
-                if detail_status != "OK":
-                    detail = {}
-                else:
-                    detail = detail_data.get("result", {})
-            except Exception:
-                detail = {}
-
-            # Calculate distance from center to place (if geometry present)
-            try:
-                loc = detail.get("geometry", {}).get("location", {}) or p.get("geometry", {}).get("location", {})
-                lat2 = float(loc.get("lat", center_lat))
-                lon2 = float(loc.get("lng", center_lon))
-                distance = int(haversine(center_lat, center_lon, lat2, lon2))
-            except Exception:
-                distance = 0
-
             # Get reviews (Google returns a list with 'text')
             reviews_data = detail.get("reviews", [])
             reviews = [rv.get("text", "") for rv in reviews_data if rv.get("text")]
-
-            # Only keep if within search radius
-            if distance <= radius:
-                results.append({
-                    "name": p.get("name", detail.get("name")),
-                    "address": detail.get("formatted_address", ""),
-                    "rating": rating,
-                    "review_count": p.get("user_ratings_total", detail.get("user_ratings_total", 0)),
-                    "categories": p.get("types", []),
-                    "url": detail.get("url", ""),
-                    "distance_m": distance,
-                    "id": place_id,
-                    "reviews": reviews
-                })
+            results.append({
+                "name": p.get("name", detail.get("name")),
+                "address": detail.get("formatted_address", "") or p.get("vicinity", ""),
+                "rating": p.get('rating', 0),
+                "review_count": p.get("user_ratings_total", 0),
+                "categories": p.get("types", []),
+                "url": detail.get("url", ""),
+                "distance_m": distance,
+                "latitude": lat2,
+                "longitude": lon2,
+                "id": place_id,
+                "reviews": reviews
+            })
         return results
+
+    def _fetch_page(self, params: Dict[str, Any], page: int, deadline=None) -> Dict[str, Any]:
+        """
+        Fetch one nearbysearch page. A next_page_token only becomes valid a short while after
+        it is issued, so a page request answered INVALID_REQUEST is retried after a pause.
+        """
+        attempts = 1 if page == 0 else 3
+        for attempt in range(attempts):
+            if page > 0:
+                if deadline is not None and deadline.remaining() <= self.page_token_delay:
+                    raise DeadlineExceeded("No time left for another nearbysearch page")
+                time.sleep(self.page_token_delay)
+            try:
+                with metrics.span("google_nearbysearch"):
+                    resp = self.http.get(self.search_url, params=params, timeout=7, deadline=deadline)
+                    resp.raise_for_status()
+                    data = resp.json()
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded(f"Google nearbysearch did not finish within {deadline.seconds:.1f}s")
+                raise PluginError(f"Google Places API request failed: {e}")
+            status = data.get("status")
+            if status in ("OK", "ZERO_RESULTS"):
+                return data
+            if not (page > 0 and status == "INVALID_REQUEST"):
+                break
+        message = data.get("error_message", "")
+        raise PluginError(f"Google Places API error: {status}. {message}")
+
+    def _iter_candidate_pages(self, params, center_lat, center_lon, radius, min_rating, deadline=None):
+        """
+        Yields, per nearbysearch page, the [(place, distance_m, latitude, longitude)] within the
+        radius and at or above min_rating, following next_page_token up to GOOGLE_MAX_PAGES.
+        Later pages are only requested while the caller keeps consuming.
+        """
+        page_params = params
+        for page in range(self.max_pages):
+            try:
+                data = self._fetch_page(page_params, page, deadline)
+            except (PluginError, DeadlineExceeded):
+                if page == 0:
+                    raise
+                # Keep the candidates of the pages already read
+                return
+            metrics.inc("google_candidates_total", len(data.get("results", [])))
+            survivors = []
+            for p in data.get("results", []):
+                if p.get("rating", 0) < min_rating:
+                    continue
+                # Calculate distance from center to place (if geometry present)
+                try:
+                    loc = p.get("geometry", {}).get("location", {})
+                    lat2 = float(loc.get("lat", center_lat))
+                    lon2 = float(loc.get("lng", center_lon))
+                    distance = int(haversine_m(center_lat, center_lon, lat2, lon2))
+                except Exception:
+                    lat2 = lon2 = None
+                    distance = 0
+                # Only keep if within search radius
+                if distance <= radius:
+                    survivors.append((p, distance, lat2, lon2))
+            yield survivors
+            token = data.get("next_page_token")
+            if not token:
+                return
+            page_params = {"key": self.api_key, "pagetoken": token}
@@ -1,14 +1,22 @@
 """
 YelpPlugin: Fetch restaurants from Yelp Fusion API, filter with supplied criteria.
+Each category is searched on its own, concurrently, so one popular cuisine cannot crowd
+the others out of the candidates; further offset pages are requested only while too few
+candidates pass the rating filter.
 """
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Any, Optional
-import requests
 
 from lunchgenie.config import Config
+from lunchgenie.deadline import DeadlineExceeded, remaining
+from lunchgenie.http_transport import get_transport
+from lunchgenie.metrics import metrics
 from tools.base import PluginBase, PluginError
 
-YELP_API_URL = "https://api.yelp.com/v3/businesses/search"
+YELP_SEARCH_PATH = "/v3/businesses/search"
+# Yelp serves at most 50 businesses per request
+YELP_MAX_PAGE_SIZE = 50
 
 class YelpPlugin(PluginBase):
     @property
@@ -20,6 +28,27 @@ class YelpPlugin(PluginBase):
         if not self.config.yelp_api_key:
             raise PluginError("Missing Yelp API key in config/environment.")
         self.api_key = self.config.yelp_api_key
+        self.search_concurrency = max(1, self.config.yelp_search_concurrency)
+        self.page_size = min(YELP_MAX_PAGE_SIZE, max(1, self.config.yelp_page_size))
+        self.max_pages = max(1, self.config.yelp_max_pages)
+        self.max_results = max(1, self.config.yelp_max_results)
+        # Shared pooled keep-alive transport (size HTTP_POOL_MAXSIZE >= the search concurrency)
+        self.http = get_transport(self.config)
+        self.search_url = self.config.yelp_api_base_url + YELP_SEARCH_PATH
+
+    def _fetch_page(self, params: Dict[str, Any], deadline=None) -> List[Dict[str, Any]]:
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        try:
+            with metrics.span("yelp_search"):
+                resp = self.http.get(self.search_url, headers=headers, params=params, timeout=8, deadline=deadline)
+                resp.raise_for_status()
+                return resp.json().get("businesses", [])
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(f"Yelp search did not finish within {deadline.seconds:.1f}s")
+            raise PluginError(f"Yelp API request failed: {e}")
 
     def search_restaurants(
         self, 
@@ -27,45 +56,101 @@ class YelpPlugin(PluginBase):
         location: str = '', 
         criteria: Dict[str, Any] = None,
         latitude: float = None,
-        longitude: float = None
+        longitude: float = None,
+        deadline=None
     ) -> List[Dict[str, Any]]:
         """
         Search restaurants on Yelp. If latitude and longitude are provided, they override location.
+        Every category in criteria['categories'] gets its own requests, page by page (up to
+        YELP_MAX_PAGES of YELP_PAGE_SIZE), all running concurrently. Businesses are merged by id
+        and further pages stop once criteria.get('limit') (default YELP_MAX_RESULTS) of them pass
+        min_rating; the candidates are then picked from the categories in turn, best-rated first.
+        With a deadline, pages not answered in time are dropped.
         """
         criteria = criteria or {}
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        params = {
+        base_params = {
             "term": query or "restaurants",
-            "categories": criteria.get("categories", ""),  # e.g. "indian,malaysian,chinese"
             "radius": criteria.get("radius", 1200),        # meters; default ~15-min walk
             "sort_by": "rating",
-            "limit": 10
+            "limit": self.page_size
         }
         if latitude is not None and longitude is not None:
-            params["latitude"] = latitude
-            params["longitude"] = longitude
+            base_params["latitude"] = latitude
+            base_params["longitude"] = longitude
         else:
-            params["location"] = location or "Melbourne"
+            base_params["location"] = location or "Melbourne"
         # Yelp's best rating filter done post-query since the API does not filter by rating directly
         min_rating = criteria.get("min_rating", 0)
+        limit = int(criteria.get("limit") or self.max_results)
+        # e.g. "indian,malaysian,chinese"; no categories is a single search over all of them
+        categories = list(dict.fromkeys(c.strip() for c in criteria.get("categories", "").split(",") if c.strip()))
+        categories = categories or [""]
 
+        passed = {category: [] for category in categories}
+        open_categories = list(categories)
+        pool = ThreadPoolExecutor(max_workers=min(self.search_concurrency, len(categories)))
         try:
-            resp = requests.get(YELP_API_URL, headers=headers, params=params, timeout=8)
-            resp.raise_for_status()
-            businesses = resp.json().get("businesses", [])
-        except Exception as e:
-            raise PluginError(f"Yelp API request failed: {e}")
+            for page in range(self.max_pages):
+                if not open_categories or (deadline is not None and deadline.expired()):
+                    break
+                futures = {
+                    pool.submit(self._fetch_page, dict(base_params, categories=category,
+                                                       offset=page * self.page_size), deadline): category
+                    for category in open_categories
+                }
+                # Pages still running at the deadline are abandoned
+                done, late = wait(futures, timeout=remaining(deadline))
+                if late:
+                    metrics.inc("errors_total", len(late), stage="yelp_search_deadline")
+                open_categories, errors = [], []
+                for future in done:
+                    category = futures[future]
+                    try:
+                        businesses = future.result()
+                    except (PluginError, DeadlineExceeded) as err:
+                        errors.append(err)
+                        continue
+                    metrics.inc("yelp_candidates_total", len(businesses))
+                    passed[category].extend(b for b in businesses if b.get('rating', 0) >= min_rating)
+                    # Results are sorted by rating, so a short page or one ending below the
+                    # rating floor means the category has nothing more to offer
+                    if len(businesses) == self.page_size and businesses[-1].get("rating", 0) >= min_rating:
+                        open_categories.append(category)
+                if page == 0 and len(errors) + len(late) == len(futures):
+                    # Nothing to fall back on
+                    if errors and not late:
+                        raise errors[0]
+                    raise DeadlineExceeded(f"Yelp search did not finish within {deadline.seconds:.1f}s")
+                if len({b.get("id") for found in passed.values() for b in found}) >= limit:
+                    break
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        # Take the categories' best-rated businesses in turn, so each cuisine is represented
+        picked = {}
+        queues = [list(found) for found in passed.values()]
+        while queues and len(picked) < limit:
+            for queue in queues:
+                while queue and queue[0].get("id") in picked:
+                    queue.pop(0)
+                if queue and len(picked) < limit:
+                    b = queue.pop(0)
+                    picked[b.get("id")] = b
+            queues = [queue for queue in queues if queue]
+        businesses = sorted(picked.values(), key=lambda b: b.get("rating", 0), reverse=True)
+
         results = []
         for b in businesses:
-            if b.get('rating', 0) >= min_rating:
-                results.append({
-                    "name": b.get("name"),
-                    "address": " ".join(b.get("location", {}).get("display_address", [])),
-                    "rating": b.get("rating"),
-                    "review_count": b.get("review_count"),
-                    "categories": [cat["title"] for cat in b.get("categories", [])],
-                    "url": b.get("url"),
-                    "distance_m": int(b.get("distance", 0)),
-                    "id": b.get("id"),
-                })
+            results.append({
+                "name": b.get("name"),
+                "address": " ".join(b.get("location", {}).get("display_address", [])),
+                "rating": b.get("rating"),
+                "review_count": b.get("review_count"),
+                "categories": [cat["title"] for cat in b.get("categories", [])],
+                "url": b.get("url"),
+                "distance_m": int(b.get("distance", 0)),
+                "latitude": b.get("coordinates", {}).get("latitude"),
+                "longitude": b.get("coordinates", {}).get("longitude"),
+                "id": b.get("id"),
+            })
         return results